@@ -0,0 +1,334 @@
+"""
+Benchmarks for the zappy elements and example networks.
+
+Every case is timed through the phases of a Problem (setup, final_setup, run_model,
+linearize and compute_totals) for a sweep of num_nodes, and the peak memory allocated
+in each phase is measured in a separate pass with tracemalloc. The results are saved
+as JSON so that two runs can be compared::
+
+    PYTHONPATH=. python benchmarks/bench_zappy.py -o baseline.json
+    PYTHONPATH=. python benchmarks/bench_zappy.py -o new.json --compare baseline.json
+
+Use --nodes to change the sweep (the default goes up to 1e5 nodes, which takes a while
+for the networks) and --cases to only run the cases whose name contains a substring.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import openmdao
+from openmdao.api import Problem
+
+NODES = [1, 10, 100, 1000, 10000, 100000]
+
+
+class Case(object):
+    """
+    A benchmark case: a function that adds the model to a Problem for a given number of
+    nodes, the input values to set before running it and the of/wrt of compute_totals
+    (None to skip that phase). Cases with fixed_nodes only run at that size.
+    """
+    def __init__(self, name, build, values=None, of=None, wrt=None, fixed_nodes=None):
+        self.name = name
+        self.build = build
+        self.values = values or {}
+        self.of = of
+        self.wrt = wrt
+        self.fixed_nodes = fixed_nodes
+
+    def sizes(self, nodes):
+        return [self.fixed_nodes] if self.fixed_nodes is not None else nodes
+
+    def phases(self, nn):
+        """
+        Yields (phase, function) pairs that run one Problem through all phases.
+        """
+        prob = Problem(reports=None)
+
+        def setup():
+            self.build(prob.model, nn)
+            # totals are taken for the first node only, the way a driver would ask for them,
+            # so the phase measures the cost of a linear solve rather than num_nodes of them
+            if self.of is not None:
+                for name in self.wrt:
+                    prob.model.add_design_var(name, indices=[0], flat_indices=True)
+                for name in self.of:
+                    prob.model.add_constraint(name, indices=[0], flat_indices=True)
+            prob.set_solver_print(level=-1)
+            prob.setup(check=False)
+
+        def final_setup():
+            prob.final_setup()
+            for name, val in self.values.items():
+                prob[name] = val
+
+        yield 'setup', setup
+        yield 'final_setup', final_setup
+        yield 'run_model', prob.run_model
+        yield 'linearize', prob.model.run_linearize
+        if self.of is not None:
+            yield 'compute_totals', lambda: prob.driver._compute_totals(return_format='array')
+
+
+def component(comp):
+    """
+    Returns a build function for a Case that holds a single component.
+    """
+    def build(model, nn):
+        model.add_subsystem('comp', comp(nn), promotes=['*'])
+    return build
+
+
+def element_cases():
+    from zappy.LF_elements.bus import ACbus, DCbus
+    from zappy.LF_elements.line import ACline, DCline
+    from zappy.LF_elements.generator import ACgenerator, DCgenerator
+    from zappy.LF_elements.load import ACload, DCload
+    from zappy.LF_elements.converter import Converter
+    from zappy.LF_elements.line_bank import AClineBank, DClineBank
+    from zappy.LF_elements.network import ACNetwork
+
+    V = {'Vr_in': 4160., 'Vi_in': 0., 'Vr_out': 4100., 'Vi_out': -50.}
+    branches = [(str(i), str(i+1), 0.2, 0.3) for i in range(1, 10)]
+
+    return [
+        Case('ACbus', component(lambda nn: ACbus(num_nodes=nn, lines=['L1', 'L2'])),
+             {'L1:Ir': 10., 'L1:Ii': 1., 'L2:Ir': -9., 'L2:Ii': -2.}),
+        Case('DCbus', component(lambda nn: DCbus(num_nodes=nn, lines=['L1', 'L2'])),
+             {'L1:I': 10., 'L2:I': -9.}),
+        Case('ACline', component(lambda nn: ACline(num_nodes=nn)), dict(V, R=0.2, X=0.3),
+             of=['Ir_in', 'P_loss'], wrt=['R', 'Vr_in']),
+        Case('DCline', component(lambda nn: DCline(num_nodes=nn)), {'R': 0.25, 'V_in': 6800., 'V_out': 6750.},
+             of=['I_in', 'P_loss'], wrt=['R', 'V_in']),
+        Case('AClineBank', component(lambda nn: AClineBank(num_nodes=nn, num_lines=10)), dict(V, R=0.2, X=0.3),
+             of=['Ir_in', 'P_loss'], wrt=['R', 'Vr_in']),
+        Case('DClineBank', component(lambda nn: DClineBank(num_nodes=nn, num_lines=10)),
+             {'R': 0.25, 'V_in': 6800., 'V_out': 6750.}, of=['I_in', 'P_loss'], wrt=['R', 'V_in']),
+        Case('ACNetwork', component(lambda nn: ACNetwork(num_nodes=nn, buses=[str(i) for i in range(1, 11)], branches=branches)),
+             dict(('Vr_{}'.format(i), 4160.-10*i) for i in range(1, 11)), of=['LN1:Ir', 'LN5:Ii'], wrt=['Vr_1', 'Vr_5']),
+        Case('ACgenerator:Slack', component(lambda nn: ACgenerator(num_nodes=nn, mode='Slack')),
+             {'Vm_bus': 4368., 'Vr_out': 4368., 'P_guess': -1.0e6}),
+        Case('ACgenerator:P-V', component(lambda nn: ACgenerator(num_nodes=nn, mode='P-V')),
+             {'Vm_bus': 4160., 'P_bus': -1.0e6, 'Vr_out': 4160., 'Vi_out': -100.}),
+        Case('DCgenerator', component(lambda nn: DCgenerator(num_nodes=nn)),
+             {'V_bus': 6800., 'V_out': 6800., 'P_guess': -1.0e6}),
+        Case('ACload', component(lambda nn: ACload(num_nodes=nn)), {'P': 1.0e6, 'Q': 0.2e6, 'Vr_in': 4160., 'Vi_in': -50.},
+             of=['Ir_in', 'Ii_in'], wrt=['P', 'Vr_in']),
+        Case('DCload', component(lambda nn: DCload(num_nodes=nn)), {'P': 1.0e6, 'V_in': 6800.},
+             of=['I_in'], wrt=['P', 'V_in']),
+        Case('Converter', component(lambda nn: Converter(num_nodes=nn)),
+             {'Vr_ac': 4160., 'Vi_ac': -100., 'V_dc': 6800., 'M': 0.99, 'Ksc': 0.611764706, 'eff': 0.98, 'PF': 0.95,
+              'P_ac_guess': 0.2e6, 'P_dc_guess': -0.2e6}),
+    ]
+
+
+def nv_element_cases():
+    from zappy.NV_elements.node import Node
+    from zappy.NV_elements.resistor import Resistor
+    from zappy.NV_elements.thermal_mass import ThermalMass
+    from zappy.NV_elements.thermal_transient import ThermalTransient
+    from zappy.NV_elements.wire import Wire
+    from zappy.NV_elements.resistor_network import ResistorNetwork
+
+    # a 30x30 mesh grounded at one corner
+    grid = lambda i, j: '{}_{}'.format(i, j)
+    mesh = [(grid(i, j), grid(i+1, j)) for i in range(29) for j in range(30)]
+    mesh += [(grid(i, j), grid(i, j+1)) for i in range(30) for j in range(29)]
+    mesh_nodes = [grid(i, j) for i in range(30) for j in range(30) if i or j]
+
+    wire = {'length': 1.0, 'dia': 0.01, 'density': 8960., 'I_in': 20., 'V_in': 50., 'P_in': 1000.,
+            'rho': 1.72e-8, 'T_b': 400., 'h': 7., 'c_p': 385.}
+    return [
+        Case('Node', component(lambda nn: Node(num_nodes=nn)), {'in:I': 1.0, 'out:I': -1.0}),
+        Case('Resistor', component(lambda nn: Resistor(num_nodes=nn)), {'V_in': 10., 'V_out': 9., 'R': 5.},
+             of=['I_in'], wrt=['V_in', 'R']),
+        Case('ThermalMass', component(lambda nn: ThermalMass(num_nodes=nn)), {'h': 10., 'T_b': 350., 'Qdot_in': 100.},
+             of=['dTdt'], wrt=['h', 'Qdot_in']),
+        Case('ThermalTransient', component(lambda nn: ThermalTransient(num_nodes=nn, method='trapezoidal')),
+             {'h': 7., 'mass': 5., 'c_p': 48., 'Qdot_in': 100.}, of=['T'], wrt=['T_initial', 'h']),
+        Case('Wire', component(lambda nn: Wire(num_nodes=nn)), wire, of=['V_out', 'dTdt'], wrt=['dia', 'I_in']),
+        Case('ResistorNetwork', component(lambda nn: ResistorNetwork(num_nodes=nn, nodes=mesh_nodes, fixed=['0_0'],
+                                                                     resistors=mesh)),
+             {'R': 0.1, 'I': 1.0e-3}, of=['V'], wrt=['R']),
+    ]
+
+
+def network_cases():
+    from zappy.LF_elements.builder import LoadFlowNetwork
+    from zappy.LF_examples.topology_example import TOPOLOGY, Vacbase, Vdcbase
+
+    def example(module):
+        Example = importlib.import_module('zappy.LF_examples.'+module).Example
+        def build(model, n):
+            model.add_subsystem('sys', Example(num_nodes=n), promotes=['*'])
+        return build
+
+    def topology(ac_network, **options):
+        def build(model, nn):
+            model.add_subsystem('sys', LoadFlowNetwork(num_nodes=nn, topology=TOPOLOGY, ac_network=ac_network, **options),
+                                promotes=['*'])
+        return build
+
+    per_unit = {'Vr_1': 1.05, 'Vr_2': 1.0, 'Vr_3': 1.0}
+    hybrid = {'Gen1.P_guess': -5.0e6, 'Gen3.P_guess': -2.0e6,
+              'TX10.P_ac_guess': 0.2e6, 'TX10.P_dc_guess': -0.2e6, 'TX11.P_ac_guess': 0.2e6, 'TX11.P_dc_guess': -0.2e6,
+              'TX12.P_ac_guess': -0.2e6, 'TX12.P_dc_guess': 0.2e6, 'TX13.P_ac_guess': -0.2e6, 'TX13.P_dc_guess': 0.2e6}
+    hybrid.update(('Vr_'+b, Vacbase) for b, s in TOPOLOGY['buses'].items() if s['type'] == 'AC')
+    hybrid.update(('V_'+b, Vdcbase) for b, s in TOPOLOGY['buses'].items() if s['type'] == 'DC')
+
+    # the example groups add scalar parameters, so they only run at the size they were written for
+    return [
+        Case('load_flow_example1', example('load_flow_example1'), per_unit, of=['Vr_2', 'Vi_3'], wrt=['P2', 'Q3'],
+             fixed_nodes=3),
+        Case('load_flow_example2', example('load_flow_example2'), per_unit, of=['Vr_2', 'Vi_3'], wrt=['P2', 'P3'],
+             fixed_nodes=1),
+        Case('13bus_example', example('13bus_example'), hybrid, of=['Vr_2', 'V_4'], wrt=['P2', 'P4'], fixed_nodes=1),
+        Case('LoadFlowNetwork', topology(False), of=['Vr_2', 'V_4'], wrt=['Load2:P', 'Load4:P']),
+        Case('LoadFlowNetwork:ac_network', topology(True), of=['Vr_2', 'V_4'], wrt=['Load2:P', 'Load4:P']),
+        Case('LoadFlowNetwork:chord', topology(False, reuse_jacobian=True), of=['Vr_2', 'V_4'], wrt=['Load2:P', 'Load4:P']),
+    ]
+
+
+class SolverCase(object):
+    """
+    Times the standalone load flow solver on the 13-bus topology: building the
+    LoadFlowSystem, one Newton solve of the stacked system and a batched solve.
+    """
+    name = 'LoadFlowSystem'
+    fixed_nodes = None
+
+    def sizes(self, nodes):
+        return nodes
+
+    def phases(self, nn):
+        from zappy.LF_solvers.system import LoadFlowSystem
+        from zappy.LF_solvers.newton import newton_solve, batched_newton_solve
+        from zappy.LF_examples.topology_example import TOPOLOGY
+
+        state = {}
+        def setup():
+            state['system'] = LoadFlowSystem(TOPOLOGY, num_nodes=nn)
+
+        yield 'setup', setup
+        yield 'run_model', lambda: newton_solve(state['system'])
+        yield 'run_batched', lambda: batched_newton_solve(state['system'])
+
+
+def measure(case, nn, repeat, memory):
+    """
+    Returns a dict with the best wall time and the peak traced memory of every phase.
+    """
+    results = {}
+    for i in range(repeat):
+        for phase, func in case.phases(nn):
+            st = time.perf_counter()
+            func()
+            dt = time.perf_counter() - st
+            results.setdefault(phase, {'time': dt})
+            results[phase]['time'] = min(results[phase]['time'], dt)
+
+    if memory:
+        tracemalloc.start()
+        try:
+            for phase, func in case.phases(nn):
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                func()
+                results[phase]['peak_memory'] = tracemalloc.get_traced_memory()[1] - base
+        finally:
+            tracemalloc.stop()
+
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                         cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': commit, 'python': platform.python_version(),
+            'numpy': np.__version__, 'openmdao': openmdao.__version__, 'machine': platform.machine(),
+            'processor': platform.processor()}
+
+
+def run(cases, nodes, repeat=3, memory=True, out_stream=sys.stdout):
+    """
+    Runs the cases over the node sweep and returns a list of result records.
+    A case that fails at some size is recorded with its error and skipped.
+    """
+    records = []
+    for case in cases:
+        for nn in case.sizes(nodes):
+            try:
+                results = measure(case, nn, repeat, memory)
+            except Exception as err:
+                records.append({'case': case.name, 'num_nodes': nn, 'error': '{}: {}'.format(type(err).__name__, err)})
+                if out_stream is not None:
+                    print('{:30s} {:>7d}  failed: {}'.format(case.name, nn, records[-1]['error']), file=out_stream)
+                continue
+
+            for phase, res in results.items():
+                records.append(dict(res, case=case.name, num_nodes=nn, phase=phase))
+            if out_stream is not None:
+                print('{:30s} {:>7d}  '.format(case.name, nn) +
+                      '  '.join('{} {:.3g}s'.format(phase, res['time']) for phase, res in results.items()),
+                      file=out_stream)
+    return records
+
+
+def compare(records, baseline, out_stream=sys.stdout):
+    """
+    Prints the time and peak memory of every record relative to the matching record of an earlier run.
+    """
+    old = dict(((r['case'], r['num_nodes'], r['phase']), r) for r in baseline if 'phase' in r)
+
+    print('{:30s} {:>7s} {:>15s} {:>11s} {:>11s} {:>7s} {:>7s}'.format(
+          'case', 'nodes', 'phase', 'old time', 'new time', 'time', 'memory'), file=out_stream)
+    for r in records:
+        key = (r['case'], r['num_nodes'], r.get('phase'))
+        if key not in old:
+            continue
+        o = old[key]
+        mem = '-'
+        if r.get('peak_memory') and o.get('peak_memory'):
+            mem = '{:.2f}'.format(r['peak_memory']/o['peak_memory'])
+        print('{:30s} {:>7d} {:>15s} {:>11.4g} {:>11.4g} {:>7.2f} {:>7s}'.format(
+              r['case'], r['num_nodes'], r['phase'], o['time'], r['time'], r['time']/o['time'], mem), file=out_stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('-o', '--output', default='bench_results.json', help='File the results are written to')
+    parser.add_argument('--compare', help='Results of an earlier run to compare against')
+    parser.add_argument('--nodes', type=int, nargs='+', default=NODES, help='Values of num_nodes to sweep')
+    parser.add_argument('--cases', nargs='+', help='Only run the cases whose name contains one of these strings')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timing runs, the best one is kept')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc pass')
+    args = parser.parse_args(argv)
+
+    cases = element_cases() + nv_element_cases() + network_cases() + [SolverCase()]
+    if args.cases:
+        cases = [c for c in cases if any(s in c.name for s in args.cases)]
+
+    records = run(cases, args.nodes, repeat=args.repeat, memory=not args.no_memory)
+
+    with open(args.output, 'w') as f:
+        json.dump({'environment': environment(), 'results': records}, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(records, json.load(f)['results'])
+
+
+if __name__ == "__main__":
+    main()
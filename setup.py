@@ -32,6 +32,8 @@ setup(name='Zappy',
       packages=[ 
         'zappy/LF_elements',
         'zappy/LF_examples',
+        'zappy/LF_solvers',
+        'zappy/utils',
         'zappy/NV_elements',
         ],
       install_requires=[
@@ -0,0 +1,386 @@
+import json
+from functools import lru_cache
+
+import numpy as np
+
+from openmdao.api import Group, IndepVarComp
+from openmdao.api import DirectSolver, BoundsEnforceLS, NewtonSolver
+
+from zappy.LF_elements.bus import ACbus, DCbus
+from zappy.LF_elements.line import ACline, DCline
+from zappy.LF_elements.generator import ACgenerator, DCgenerator
+from zappy.LF_elements.load import ACload, DCload
+from zappy.LF_elements.converter import Converter
+from zappy.LF_elements.network import ACNetwork, bus_indices
+from zappy.LF_elements.thermal_line import ThermalACline, ThermalDCline
+from zappy.LF_solvers.chord import ChordNewtonSolver
+
+ELEMENTS = {'ACbus': ACbus, 'DCbus': DCbus, 'ACline': ACline, 'DCline': DCline,
+            'ACgenerator': ACgenerator, 'DCgenerator': DCgenerator, 'ACload': ACload, 'DCload': DCload,
+            'Converter': Converter, 'ACNetwork': ACNetwork, 'ThermalACline': ThermalACline, 'ThermalDCline': ThermalDCline}
+
+# elements whose guess_nonlinear keeps the previous solution unless told otherwise
+WARM_START = ('ACbus', 'DCbus', 'ACgenerator', 'DCgenerator', 'Converter')
+POWER_OUTPUTS = ('ACline', 'DCline', 'ACgenerator', 'DCgenerator', 'Converter')
+
+# (input name, topology key, units, default) of the values each element takes from the IndepVarComp.
+# A default of None means the value is required, a string means "use this option of the element".
+PARAMS = {
+    'ACline': [('R', 'R', 'ohm', None), ('X', 'X', 'ohm', None)],
+    'DCline': [('R', 'R', 'ohm', None)],
+    'ThermalACline': [('X', 'X', 'ohm', None), ('length', 'length', 'm', None), ('dia', 'dia', 'm', None),
+                      ('rho', 'rho', 'ohm*m', 1.72e-8), ('alpha', 'alpha', '1/K', 0.00393), ('T_ref', 'T_ref', 'K', 293.15),
+                      ('h', 'h', 'W/(m**2*K)', 10.0), ('T_f', 'T_f', 'K', 300.0)],
+    'ThermalDCline': [('length', 'length', 'm', None), ('dia', 'dia', 'm', None),
+                      ('rho', 'rho', 'ohm*m', 1.72e-8), ('alpha', 'alpha', '1/K', 0.00393), ('T_ref', 'T_ref', 'K', 293.15),
+                      ('h', 'h', 'W/(m**2*K)', 10.0), ('T_f', 'T_f', 'K', 300.0)],
+    'Slack': [('Vm_bus', 'Vm', 'V', 'Vbase'), ('thetaV_bus', 'thetaV', 'deg', 0.0), ('P_guess', 'P_guess', 'W', -1.0e6)],
+    'P-V': [('Vm_bus', 'Vm', 'V', 'Vbase'), ('P_bus', 'P', 'W', None)],
+    'DCgenerator': [('V_bus', 'V', 'V', 'Vbase'), ('P_guess', 'P_guess', 'W', -1.0e6)],
+    'ACload': [('P', 'P', 'W', 0.0), ('Q', 'Q', 'V*A', 0.0)],
+    'DCload': [('P', 'P', 'W', 0.0)],
+    'Converter': [('M', 'M', None, 1.0), ('Ksc', 'Ksc', None, 1.0), ('eff', 'eff', None, 1.0), ('PF', 'PF', None, 1.0),
+                  ('P_ac_guess', 'P_ac_guess', 'W', -1.0e6), ('P_dc_guess', 'P_dc_guess', 'W', -1.0e6)],
+}
+
+VALUE_KEYS = set(p[1] for params in PARAMS.values() for p in params)
+
+def load_topology(filename):
+    """
+    Reads a topology description from a JSON file.
+    """
+    with open(filename) as f:
+        return json.load(f)
+
+def topology_key(topology, ac_network=False):
+    """
+    Returns a string that identifies the structure of a topology. Topologies that only
+    differ in parameter values (line impedances, loads, set points) share the same key.
+    """
+    def strip(section):
+        return [dict((k, v) for k, v in item.items() if k not in VALUE_KEYS) for item in topology.get(section, [])]
+
+    structure = {
+        'Vbase': topology.get('Vbase', 5000.0),
+        'Vdcbase': topology.get('Vdcbase', topology.get('Vbase', 5000.0)),
+        'Sbase': topology.get('Sbase', 10.0E6),
+        'buses': topology['buses'],
+        'lines': strip('lines'),
+        'generators': strip('generators'),
+        'loads': strip('loads'),
+        'converters': strip('converters'),
+        'ac_network': ac_network,
+    }
+    return json.dumps(structure, sort_keys=True)
+
+def build_layout(topology, ac_network=False):
+    """
+    Returns the (cached) layout of the load flow model described by a topology.
+    """
+    return _layout(topology_key(topology, ac_network))
+
+@lru_cache(maxsize=256)
+def _layout(key):
+    """
+    Generates the layout of a load flow model from a structural topology key.
+
+    The layout holds everything needed to build the Group except for parameter values:
+    the list of subsystems with their options and promotions, the parameters that
+    must be added to the IndepVarComp (with a reference to where the value lives
+    in the topology) and the buses with their connected currents.
+    """
+    topo = json.loads(key)
+    Sbase = topo['Sbase']
+
+    buses = {}
+    for name, spec in topo['buses'].items():
+        kind = spec.get('type', 'AC')
+        if kind not in ('AC', 'DC'):
+            raise ValueError("bus type must be 'AC' or 'DC', but '{}' was given for bus '{}'.".format(kind, name))
+        Vbase = spec.get('Vbase', topo['Vbase'] if kind == 'AC' else topo['Vdcbase'])
+        buses[name] = {'type': kind, 'Vbase': Vbase, 'lines': []}
+
+    def bus(name, kind=None):
+        if name not in buses:
+            raise ValueError("bus '{}' is not defined in the topology.".format(name))
+        if kind is not None and buses[name]['type'] != kind:
+            raise ValueError("bus '{}' is not of type '{}'.".format(name, kind))
+        return buses[name]
+
+    def voltage(name):
+        if buses[name]['type'] == 'AC':
+            return ['Vr_'+name, 'Vi_'+name]
+        return ['V_'+name]
+
+    subsystems = []
+    params = []
+    names = set()
+    network = []
+
+    def unique(name):
+        base, i = name, 2
+        while name in names:
+            name = '{}_{}'.format(base, i)
+            i += 1
+        names.add(name)
+        return name
+
+    def add(kind, name, options, promotes, section, index, param_kind, defaults):
+        for inp, key, units, default in PARAMS[param_kind]:
+            if isinstance(default, str):
+                default = defaults[default]
+            params.append((name+':'+inp, units, section, index, key, default))
+            promotes.append((inp, name+':'+inp))
+        subsystems.append((kind, name, options, promotes))
+
+    for i, line in enumerate(topo['lines']):
+        f, t = line['from'], line['to']
+        kind = bus(f)['type']
+        bus(t, kind)
+        name = unique(line.get('name', 'Line{}_{}'.format(f, t)))
+        I_in, I_out = unique('L{}_{}'.format(f, t)), unique('L{}_{}'.format(t, f))
+
+        thermal = 'Thermal' if line.get('thermal', False) else ''
+        if kind == 'AC' and topo['ac_network'] and not thermal:
+            network.append((i, f, t))
+            continue
+
+        if kind == 'AC':
+            promotes = [('Vr_in', 'Vr_'+f), ('Vi_in', 'Vi_'+f), ('Vr_out', 'Vr_'+t), ('Vi_out', 'Vi_'+t),
+                        ('Ir_in', I_in+':Ir'), ('Ii_in', I_in+':Ii'), ('Ir_out', I_out+':Ir'), ('Ii_out', I_out+':Ii')]
+        else:
+            promotes = [('V_in', 'V_'+f), ('V_out', 'V_'+t), ('I_in', I_in+':I'), ('I_out', I_out+':I')]
+
+        add(thermal+kind+'line', name, {}, promotes, 'lines', i, thermal+kind+'line', {})
+        buses[f]['lines'].append(I_in)
+        buses[t]['lines'].append(I_out)
+
+    for i, gen in enumerate(topo['generators']):
+        b = bus(gen['bus'])
+        name = unique(gen.get('name', 'Gen{}'.format(i+1)))
+        current = unique('LG{}'.format(i+1))
+        options = {'Vbase': b['Vbase'], 'Sbase': Sbase}
+
+        if b['type'] == 'AC':
+            mode = gen.get('mode', 'Slack')
+            options.update(mode=mode, Q_min=gen.get('Q_min'), Q_max=gen.get('Q_max'))
+            promotes = [('Vr_out', 'Vr_'+gen['bus']), ('Vi_out', 'Vi_'+gen['bus']),
+                        ('Ir_out', current+':Ir'), ('Ii_out', current+':Ii')]
+            add('ACgenerator', name, options, promotes, 'generators', i, mode, b)
+        else:
+            options.update(P_min=gen.get('P_min'), P_max=gen.get('P_max'))
+            promotes = [('V_out', 'V_'+gen['bus']), ('I_out', current+':I')]
+            add('DCgenerator', name, options, promotes, 'generators', i, 'DCgenerator', b)
+        b['lines'].append(current)
+
+    for i, load in enumerate(topo['loads']):
+        b = bus(load['bus'])
+        name = unique(load.get('name', 'Load{}'.format(load['bus'])))
+        current = unique('LL{}'.format(load['bus']))
+
+        if b['type'] == 'AC':
+            promotes = [('Vr_in', 'Vr_'+load['bus']), ('Vi_in', 'Vi_'+load['bus']),
+                        ('Ir_in', current+':Ir'), ('Ii_in', current+':Ii')]
+        else:
+            promotes = [('V_in', 'V_'+load['bus']), ('I_in', current+':I')]
+
+        add(b['type']+'load', name, {}, promotes, 'loads', i, b['type']+'load', b)
+        b['lines'].append(current)
+
+    for i, conv in enumerate(topo['converters']):
+        ac, dc = conv['ac_bus'], conv['dc_bus']
+        bus(ac, 'AC')
+        b_dc = bus(dc, 'DC')
+        name = unique(conv.get('name', 'TX{}'.format(ac)))
+        I_ac, I_dc = unique('LC{}'.format(ac)), unique('LC{}'.format(dc))
+
+        options = {'mode': conv.get('mode', 'Lead'), 'Vdcbase': b_dc['Vbase'], 'Sbase': Sbase}
+        promotes = [('Vr_ac', 'Vr_'+ac), ('Vi_ac', 'Vi_'+ac), ('V_dc', 'V_'+dc),
+                    ('Ir_ac', I_ac+':Ir'), ('Ii_ac', I_ac+':Ii'), ('I_dc', I_dc+':I')]
+        add('Converter', name, options, promotes, 'converters', i, 'Converter', b_dc)
+        buses[ac]['lines'].append(I_ac)
+        buses[dc]['lines'].append(I_dc)
+
+    if network:
+        net_buses = []
+        for i, f, t in network:
+            for b in (f, t):
+                if b not in net_buses:
+                    net_buses.append(b)
+                    buses[b]['lines'].append('LN'+b)
+
+        # the currents are connected to the buses in LoadFlowNetwork.setup
+        promotes = [v for b in net_buses for v in voltage(b)]
+        subsystems.append(('ACNetwork', unique('Net'), {'buses': net_buses}, promotes))
+
+    # buses go first so that the element guesses see the bus voltage guesses
+    bus_subsystems = []
+    for name, b in buses.items():
+        if not b['lines']:
+            raise ValueError("bus '{}' is not connected to any element.".format(name))
+        options = {'lines': b['lines'], 'Vbase': b['Vbase'], 'Sbase': Sbase}
+        if b['type'] == 'AC':
+            promotes = [('Vr', 'Vr_'+name), ('Vi', 'Vi_'+name)]
+            promotes += [line+':*' for line in b['lines']]
+            bus_subsystems.append(('ACbus', unique('Bus'+name), options, promotes))
+        else:
+            promotes = [('V', 'V_'+name)] + [line+':*' for line in b['lines']]
+            bus_subsystems.append(('DCbus', unique('Bus'+name), options, promotes))
+
+    return {'subsystems': bus_subsystems + subsystems, 'params': params, 'network': network,
+            'buses': dict((name, {'type': b['type'], 'Vbase': b['Vbase'], 'lines': list(b['lines'])})
+                          for name, b in buses.items())}
+
+class LoadFlowNetwork(Group):
+    """
+    Builds a load flow model from a topology description.
+
+    The topology is a dict (or the contents of a JSON file) of the form::
+
+        {'Vbase': 4160., 'Vdcbase': 6800., 'Sbase': 10.0e6,
+         'buses': {'1': {'type': 'AC'}, '4': {'type': 'DC'}, ...},
+         'lines': [{'from': '1', 'to': '2', 'R': 0.22, 'X': 0.36}, ...],
+         'generators': [{'bus': '1', 'mode': 'Slack', 'Vm': 4368., 'P_guess': -5.0e6}, ...],
+         'loads': [{'bus': '2', 'P': 2.0e6, 'Q': 0.4e6}, ...],
+         'converters': [{'ac_bus': '10', 'dc_bus': '10dc', 'mode': 'Lead', 'M': 0.99, ...}, ...]}
+
+    All values are in SI units. Bus voltages are promoted as Vr_<bus>, Vi_<bus> (AC) and
+    V_<bus> (DC) and element parameters as <element name>:<input>, e.g. Line1_2:R or
+    Load2:P. A line with 'thermal': True is a ThermalACline or ThermalDCline, whose
+    resistance follows the temperature of its conductor: it takes 'length' and 'dia' and
+    optionally 'rho', 'alpha', 'T_ref', 'h' and 'T_f' instead of 'R', and its temperature
+    is the output <line name>.T. Thermal lines require initializer='flat' and are not
+    included in powers(). The generated layout is cached on the structure of the topology,
+    so variants that only differ in parameter values are cheap to rebuild.
+
+    With warm_start (the default) the buses, generators and converters only take their
+    flat guess on the first run; later runs start from the previous solution wherever it
+    is not worse than the guess. Call force_flat_start(model) to start over. With
+    initializer='linear' a cold run starts from LoadFlowSystem.linear_guess instead, a
+    linear approximation of the network solved with the current parameter values, and with
+    initializer='sweep' from a few backward/forward sweeps for a radial feeder (see
+    radial_feeder) or the linear guess otherwise.
+
+    With power_outputs=False the lines, generators and converters leave out their power
+    and loss outputs, which are not needed by the load flow, and only the currents are
+    solved for, except for the Q_out or P_out of generators with Q_min/Q_max or
+    P_min/P_max, which carry those bounds. powers() computes them from the solution
+    afterwards.
+    """
+    def initialize(self):
+        self.options.declare('num_nodes', types=int)
+        self.options.declare('topology', types=dict, desc='Description of the buses, lines, generators, loads and converters')
+        self.options.declare('ac_network', default=False, types=bool, desc='Model all AC lines with a single ACNetwork')
+        self.options.declare('warm_start', default=True, types=bool,
+                             desc='Start every run after the first from the previous solution (see force_flat_start)')
+        self.options.declare('reuse_jacobian', default=False, types=bool,
+                             desc='Solve with ChordNewtonSolver, which reuses the factorized Jacobian until convergence stalls')
+        self.options.declare('initializer', default='flat', values=['flat', 'linear', 'sweep'],
+                             desc='Start of a cold run: the flat guess of the elements, a linear approximation of the network or radial sweeps')
+        self.options.declare('power_outputs', default=True, types=bool,
+                             desc='Include the power outputs of the lines, generators and converters in the solve')
+
+    def setup(self):
+
+        nn = self.options['num_nodes']
+        topology = self.options['topology']
+        layout = build_layout(topology, self.options['ac_network'])
+        self._cold_start = True
+        self._linear_system = None
+
+        # LoadFlowSystem, which the initializers and powers() are built on, has no thermal lines
+        self._thermal = [name for kind, name, options, promotes in layout['subsystems'] if kind.startswith('Thermal')]
+        if self._thermal and self.options['initializer'] != 'flat':
+            raise ValueError("initializer '{}' does not support thermal lines ({}), use initializer='flat' "
+                             "instead.".format(self.options['initializer'], ', '.join(self._thermal)))
+
+        IVC = self.add_subsystem('IVC', IndepVarComp(), promotes=['*'])
+        for name, units, section, index, key, default in layout['params']:
+            val = topology[section][index].get(key, default)
+            if val is None:
+                raise ValueError("'{}' must be given for {}[{}].".format(key, section, index))
+            IVC.add_output(name, val*np.ones(nn), units=units)
+
+        for kind, name, options, promotes in layout['subsystems']:
+            options = dict(options)
+            if kind == 'ACNetwork':
+                lines = topology['lines']
+                for i, f, t in layout['network']:
+                    for key in ('R', 'X'):
+                        if lines[i].get(key) is None:
+                            raise ValueError("'{}' must be given for lines[{}] from bus '{}' to bus '{}'."
+                                             .format(key, i, f, t))
+                options['branches'] = [(f, t, lines[i]['R'], lines[i]['X']) for i, f, t in layout['network']]
+            if kind in WARM_START:
+                options['warm_start'] = self.options['warm_start']
+            if kind in POWER_OUTPUTS:
+                options['power_outputs'] = self.options['power_outputs']
+            self.add_subsystem(name, ELEMENTS[kind](num_nodes=nn, **options), promotes=list(promotes))
+            if kind == 'ACNetwork':
+                nb = len(options['buses'])
+                for k, b in enumerate(options['buses']):
+                    for part in ('Ir', 'Ii'):
+                        self.connect(name+'.'+part, 'LN'+b+':'+part, src_indices=bus_indices(nn, nb, k),
+                                     flat_src_indices=True)
+
+        newton = self.nonlinear_solver = ChordNewtonSolver() if self.options['reuse_jacobian'] else NewtonSolver()
+        newton.options['atol'] = 1e-4
+        newton.options['rtol'] = 1e-4
+        newton.options['iprint'] = 2
+        newton.options['maxiter'] = 10
+        newton.options['solve_subsystems'] = True
+        newton.options['max_sub_solves'] = 3
+
+        newton.linesearch = BoundsEnforceLS()
+        newton.linesearch.options['bound_enforcement'] = 'scalar'
+        newton.linesearch.options['print_bound_enforce'] = True
+        newton.linesearch.options['iprint'] = -1
+
+        self.linear_solver = DirectSolver(assemble_jac=True)
+
+    def _system(self):
+        """
+        Returns the LoadFlowSystem of the topology, built on first use.
+        """
+        if self._linear_system is None:
+            # imported here, the standalone system is built from the layout of this module
+            from zappy.LF_solvers.system import LoadFlowSystem
+            self._linear_system = LoadFlowSystem(self.options['topology'], self.options['num_nodes'])
+        return self._linear_system
+
+    def powers(self):
+        """
+        Returns the powers and losses of the lines, generators and converters at the present
+        solution, e.g. powers['Line1_2.P_loss'] or powers['Gen1.Q_out'], computed in one
+        pass from the voltages and currents, whether or not they are outputs of the model.
+        It does not support thermal lines.
+        """
+        if self._thermal:
+            raise ValueError('powers() does not support thermal lines ({}), use the power outputs of the '
+                             'model instead.'.format(', '.join(self._thermal)))
+        system = self._system()
+        for name in system.params:
+            system.params[name] = self.get_val(name).copy()
+        x = np.array([self.get_val(name) for name in system.names]).T
+        return dict((name, val) for name, val in system.values(x).items() if '.' in name)
+
+    def guess_nonlinear(self, inputs, outputs, resids):
+
+        cold = self._cold_start or not self.options['warm_start']
+        self._cold_start = False
+        if not cold or self.options['initializer'] == 'flat':
+            return
+
+        system = self._system()
+        for name in system.params:
+            if name in outputs:
+                system.params[name] = outputs[name].copy()
+
+        if self.options['initializer'] == 'linear':
+            x = system.linear_guess()
+        else:
+            from zappy.LF_solvers.sweep import sweep_guess
+            x = sweep_guess(system)
+        for name, val in system.values(x).items():
+            if name in outputs:
+                outputs[name] = val
@@ -14,6 +14,8 @@ class ACbus(ImplicitComponent):
         self.options.declare('lines', default=['1', '2'], desc='Names of electrical lines connecting to the bus')
         self.options.declare('Vbase', default=5000.0, desc='Base voltage in units of volts')
         self.options.declare('Sbase', default=10.0E6, desc='Base power in units of watts')
+        self.options.declare('warm_start', default=True, types=bool,
+                             desc='Keep the previous voltage instead of the flat guess after the first run')
 
     def setup(self):
 
@@ -21,6 +23,7 @@ class ACbus(ImplicitComponent):
         lines = self.options['lines']
         Ibase = self.options['Sbase']/self.options['Vbase']
         ar = np.arange(nn)
+        self._cold_start = True
 
         self.add_output('Vr', val=np.ones(nn), units='V', desc='Voltage (real) of the bus',
                                 res_ref=Ibase, res_units='A')
@@ -36,8 +39,18 @@ class ACbus(ImplicitComponent):
 
     def guess_nonlinear(self, inputs, outputs, resids):
 
-        outputs['Vr'] = self.options['Vbase']
-        outputs['Vi'] = 0.0
+        Vbase = self.options['Vbase']
+
+        # the residual of a bus does not depend on its own voltage, so the previous
+        # voltage is kept at every node where it is finite and has not collapsed
+        if self._cold_start or not self.options['warm_start']:
+            flat = np.ones(len(outputs['Vr']), dtype=bool)
+        else:
+            flat = ~(abs(outputs['Vr'] + outputs['Vi']*1j) > 1.0e-3*Vbase)
+
+        outputs['Vr'] = np.where(flat, Vbase, outputs['Vr'])
+        outputs['Vi'] = np.where(flat, 0.0, outputs['Vi'])
+        self._cold_start = False
 
     def apply_nonlinear(self, inputs, outputs, resids):
 
@@ -63,6 +76,8 @@ class DCbus(ImplicitComponent):
         self.options.declare('lines', default=['1', '2'], desc='names of electrical lines connecting to the bus')
         self.options.declare('Vbase', default=5000.0, desc='Base voltage in units of volts')
         self.options.declare('Sbase', default=10.0E6, desc='Base power in units of watts')
+        self.options.declare('warm_start', default=True, types=bool,
+                             desc='Keep the previous voltage instead of the flat guess after the first run')
 
     def setup(self):
 
@@ -70,6 +85,7 @@ class DCbus(ImplicitComponent):
         lines = self.options['lines']
         Ibase = self.options['Sbase']/self.options['Vbase']
         ar = np.arange(nn)
+        self._cold_start = True
 
         self.add_output('V', val=np.ones(nn), units='V', desc='Voltage of the bus',
                                 res_ref=Ibase, res_units='A')
@@ -81,7 +97,15 @@ class DCbus(ImplicitComponent):
 
     def guess_nonlinear(self, inputs, outputs, resids):
 
-        outputs['V'] = self.options['Vbase']
+        Vbase = self.options['Vbase']
+
+        if self._cold_start or not self.options['warm_start']:
+            flat = np.ones(len(outputs['V']), dtype=bool)
+        else:
+            flat = ~(abs(outputs['V']) > 1.0e-3*Vbase)
+
+        outputs['V'] = np.where(flat, Vbase, outputs['V'])
+        self._cold_start = False
 
     def apply_nonlinear(self, inputs, outputs, resids):
 
@@ -3,6 +3,8 @@ import numpy as np
 
 from openmdao.api import ImplicitComponent
 
+from zappy.LF_elements.warm_start import apply_guess
+
 class Converter(ImplicitComponent):
     """
     Determines the flow through a converter
@@ -13,6 +15,10 @@ class Converter(ImplicitComponent):
 
         self.options.declare('Vdcbase', default=5000.0, desc='Base voltage in units of volts')
         self.options.declare('Sbase', default=10.0E6, desc='Base power in units of watts')
+        self.options.declare('warm_start', default=True, types=bool,
+                             desc='Keep the previous solution where it is better than the guess after the first run')
+        self.options.declare('power_outputs', default=True, types=bool,
+                             desc='Solve for the power outputs, the load flow only needs the currents')
 
     def setup(self):
 
@@ -20,6 +26,7 @@ class Converter(ImplicitComponent):
         ar = np.arange(nn)
         Vbase = self.options['Vdcbase']
         Sbase = self.options['Sbase']
+        self._cold_start = True
 
         self.add_input('V_dc', val=np.ones(nn), units='V', desc='Voltage on the DC side of the converter')
         self.add_input('Vr_ac', val=np.ones(nn), units='V', desc='Voltage (real) on the AC side of the converter')
@@ -36,12 +43,13 @@ class Converter(ImplicitComponent):
                                 res_ref=Sbase, res_units='W')
         self.add_output('Ii_ac', val=np.ones(nn), units='A', desc='Current (imaginary) sent to the AC bus')
 
-        self.add_output('P_dc', val=np.zeros(nn), units='W', desc='Power entering the DC bus',
-                                res_ref=Sbase, res_units='W')
-        self.add_output('P_ac', val=np.zeros(nn), units='W', desc='Real power entering the AC bus',
-                                res_ref=Sbase, res_units='W')
-        self.add_output('Q_ac', val=np.zeros(nn), units='V*A', desc='Reactive power entering the AC bus',
-                                res_ref=Sbase, res_units='W')
+        if self.options['power_outputs']:
+            self.add_output('P_dc', val=np.zeros(nn), units='W', desc='Power entering the DC bus',
+                                    res_ref=Sbase, res_units='W')
+            self.add_output('P_ac', val=np.zeros(nn), units='W', desc='Real power entering the AC bus',
+                                    res_ref=Sbase, res_units='W')
+            self.add_output('Q_ac', val=np.zeros(nn), units='V*A', desc='Reactive power entering the AC bus',
+                                    res_ref=Sbase, res_units='W')
 
         self.add_input('P_ac_guess', val=-1.0e6*np.ones(nn), units='W', desc='Guess for AC power')
         self.add_input('P_dc_guess', val=-1.0e6*np.ones(nn), units='W', desc='Guess for DC power')
@@ -64,6 +72,9 @@ class Converter(ImplicitComponent):
         self.declare_partials('Ii_ac', 'Ii_ac', rows=ar, cols=ar)
         self.declare_partials('Ii_ac', 'PF', rows=ar, cols=ar)
 
+        if not self.options['power_outputs']:
+            return
+
         self.declare_partials('P_dc', 'V_dc', rows=ar, cols=ar)
         self.declare_partials('P_dc', 'I_dc', rows=ar, cols=ar)
         self.declare_partials('P_dc', 'P_dc', rows=ar, cols=ar, val=-1.0)
@@ -85,9 +96,10 @@ class Converter(ImplicitComponent):
         S_ac = V_ac * I_ac.conjugate()
         P_dc = inputs['V_dc'] * outputs['I_dc']
 
-        resids['P_dc'] = P_dc - outputs['P_dc']
-        resids['P_ac'] = S_ac.real - outputs['P_ac']
-        resids['Q_ac'] = S_ac.imag - outputs['Q_ac']
+        if self.options['power_outputs']:
+            resids['P_dc'] = P_dc - outputs['P_dc']
+            resids['P_ac'] = S_ac.real - outputs['P_ac']
+            resids['Q_ac'] = S_ac.imag - outputs['Q_ac']
 
         resids['I_dc'] = abs(V_ac) - inputs['Ksc'] * inputs['M'] * inputs['V_dc']
         # print(self.pathname, resids['I_dc'], abs(V_ac) - inputs['Ksc'] * inputs['M'] * inputs['V_dc'])
@@ -99,15 +111,14 @@ class Converter(ImplicitComponent):
         # print(self.pathname, theta, np.arctan2(S_ac.imag,S_ac.real))
         resids['Ii_ac'] = theta - np.arctan2(S_ac.imag,S_ac.real)
 
-        if abs(S_ac.real) > abs(P_dc): # power from from AC to DC
-            resids['Ir_ac'] = S_ac.real * inputs['eff'] + P_dc 
-            # print(self.pathname, 'AC to DC', S_ac.real, inputs['eff'], P_dc[0], resids['Ir_ac'][0])
-
-        else: # power from from DC to AC
-            resids['Ir_ac'] = S_ac.real + P_dc * inputs['eff']
-            # print('DC to AC', S_ac.real, P_dc[0])
+        # the direction of the power flow is picked for each node
+        ac_to_dc = abs(S_ac.real) > abs(P_dc)
+        resids['Ir_ac'] = np.where(ac_to_dc, S_ac.real * inputs['eff'] + P_dc, # power from from AC to DC
+                                             S_ac.real + P_dc * inputs['eff']) # power from from DC to AC
 
     def solve_nonlinear(self, inputs, outputs):
+        if not self.options['power_outputs']:
+            return
         V_ac = inputs['Vr_ac'] + inputs['Vi_ac']*1j
         I_ac = outputs['Ir_ac'] + outputs['Ii_ac']*1j
         S_ac = V_ac * I_ac.conjugate()
@@ -123,9 +134,13 @@ class Converter(ImplicitComponent):
         V_ac = inputs['Vr_ac'] + inputs['Vi_ac']*1j
         I_ac = (S_guess/V_ac).conjugate()
 
-        outputs['Ir_ac'] = I_ac.real
-        outputs['Ii_ac'] = I_ac.imag
-        outputs['I_dc'] = inputs['P_dc_guess']/inputs['V_dc']
+        Sbase = self.options['Sbase']
+        guess = {'Ir_ac': I_ac.real, 'Ii_ac': I_ac.imag, 'I_dc': inputs['P_dc_guess']/inputs['V_dc']}
+        refs = {'I_dc': self.options['Vdcbase'], 'Ir_ac': Sbase, 'Ii_ac': 1.0}
+        if self.options['power_outputs']:
+            refs.update(P_dc=Sbase, P_ac=Sbase, Q_ac=Sbase)
+
+        apply_guess(self, inputs, outputs, guess, refs)
 
     def linearize(self, inputs, outputs, J):
 
@@ -135,21 +150,22 @@ class Converter(ImplicitComponent):
         Sm_ac = abs(S_ac)
         P_dc = inputs['V_dc'] * outputs['I_dc']
 
-        J['P_dc', 'V_dc'] = outputs['I_dc']
-        J['P_dc', 'I_dc'] = inputs['V_dc']
-        # J['P_dc', 'P_dc'] = -1.0
+        if self.options['power_outputs']:
+            J['P_dc', 'V_dc'] = outputs['I_dc']
+            J['P_dc', 'I_dc'] = inputs['V_dc']
+            # J['P_dc', 'P_dc'] = -1.0
 
-        J['P_ac', 'Vr_ac'] = (I_ac.conjugate()).real
-        J['P_ac', 'Vi_ac'] = (1j*I_ac.conjugate()).real
-        J['P_ac', 'Ir_ac'] = V_ac.real
-        J['P_ac', 'Ii_ac'] = (-1j*V_ac).real
-        # J['P_ac', 'P_ac'] = -1.0
+            J['P_ac', 'Vr_ac'] = (I_ac.conjugate()).real
+            J['P_ac', 'Vi_ac'] = (1j*I_ac.conjugate()).real
+            J['P_ac', 'Ir_ac'] = V_ac.real
+            J['P_ac', 'Ii_ac'] = (-1j*V_ac).real
+            # J['P_ac', 'P_ac'] = -1.0
 
-        J['Q_ac', 'Vr_ac'] = (I_ac.conjugate()).imag
-        J['Q_ac', 'Vi_ac'] = (1j*I_ac.conjugate()).imag
-        J['Q_ac', 'Ir_ac'] = V_ac.imag
-        J['Q_ac', 'Ii_ac'] = (-1j*V_ac).imag
-        # J['Q_ac', 'Q_ac'] = -1.0
+            J['Q_ac', 'Vr_ac'] = (I_ac.conjugate()).imag
+            J['Q_ac', 'Vi_ac'] = (1j*I_ac.conjugate()).imag
+            J['Q_ac', 'Ir_ac'] = V_ac.imag
+            J['Q_ac', 'Ii_ac'] = (-1j*V_ac).imag
+            # J['Q_ac', 'Q_ac'] = -1.0
 
         J['I_dc', 'Vr_ac'] = inputs['Vr_ac'] / abs(V_ac)
         J['I_dc', 'Vi_ac'] = inputs['Vi_ac'] / abs(V_ac)
@@ -157,23 +173,20 @@ class Converter(ImplicitComponent):
         J['I_dc', 'M'] = -inputs['Ksc'] * inputs['V_dc']
         J['I_dc', 'V_dc'] = -inputs['Ksc'] * inputs['M']
 
-        # Partials change basd on which way the power is flowing
-        if abs(S_ac.real) > abs(P_dc): # power from from AC to DC
-            J['Ir_ac', 'Vr_ac'] = (I_ac.conjugate()).real * inputs['eff']
-            J['Ir_ac', 'Vi_ac'] = (1j*I_ac.conjugate()).real * inputs['eff']
-            J['Ir_ac', 'Ir_ac'] = V_ac.real * inputs['eff']
-            J['Ir_ac', 'Ii_ac'] = (-1j*V_ac).real * inputs['eff']
-            J['Ir_ac', 'V_dc'] = outputs['I_dc']
-            J['Ir_ac', 'I_dc'] = inputs['V_dc']
-            J['Ir_ac', 'eff'] = S_ac.real
-        else: # resids['Ir_ac'] = S_ac.real + inputs['V_dc'] * outputs['I_dc'] * inputs['eff'] 
-            J['Ir_ac', 'Vr_ac'] = (I_ac.conjugate()).real
-            J['Ir_ac', 'Vi_ac'] = (1j*I_ac.conjugate()).real
-            J['Ir_ac', 'Ir_ac'] = V_ac.real
-            J['Ir_ac', 'Ii_ac'] = (-1j*V_ac).real 
-            J['Ir_ac', 'V_dc'] = outputs['I_dc'] * inputs['eff'] 
-            J['Ir_ac', 'I_dc'] = inputs['V_dc'] * inputs['eff']
-            J['Ir_ac', 'eff'] = inputs['V_dc'] * outputs['I_dc']
+        # Partials change basd on which way the power is flowing at each node
+        ac_to_dc = abs(S_ac.real) > abs(P_dc)
+        # AC to DC: resids['Ir_ac'] = S_ac.real * inputs['eff'] + P_dc
+        # DC to AC: resids['Ir_ac'] = S_ac.real + inputs['V_dc'] * outputs['I_dc'] * inputs['eff']
+        eff_ac = np.where(ac_to_dc, inputs['eff'], 1.0)
+        eff_dc = np.where(ac_to_dc, 1.0, inputs['eff'])
+
+        J['Ir_ac', 'Vr_ac'] = (I_ac.conjugate()).real * eff_ac
+        J['Ir_ac', 'Vi_ac'] = (1j*I_ac.conjugate()).real * eff_ac
+        J['Ir_ac', 'Ir_ac'] = V_ac.real * eff_ac
+        J['Ir_ac', 'Ii_ac'] = (-1j*V_ac).real * eff_ac
+        J['Ir_ac', 'V_dc'] = outputs['I_dc'] * eff_dc
+        J['Ir_ac', 'I_dc'] = inputs['V_dc'] * eff_dc
+        J['Ir_ac', 'eff'] = np.where(ac_to_dc, S_ac.real, P_dc)
 
         # J['Ii_ac', 'Vr_ac'] = outputs['Ir_ac'] - inputs['PF'] * 0.5 / Sm_ac * (2 * inputs['Vr_ac'] * (outputs['Ir_ac']**2 + outputs['Ii_ac']**2))
         # J['Ii_ac', 'Vi_ac'] = outputs['Ii_ac'] - inputs['PF'] * 0.5 / Sm_ac * (2 * inputs['Vi_ac'] * (outputs['Ir_ac']**2 + outputs['Ii_ac']**2))
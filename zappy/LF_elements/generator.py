@@ -3,6 +3,8 @@ import numpy as np
 
 from openmdao.api import ImplicitComponent
 
+from zappy.LF_elements.warm_start import apply_guess
+
 class ACgenerator(ImplicitComponent):
     """
     Determines the current supplied by an AC generator
@@ -17,6 +19,10 @@ class ACgenerator(ImplicitComponent):
 
         self.options.declare('Vbase', default=5000.0, desc='Base voltage in units of volts')
         self.options.declare('Sbase', default=10.0E6, desc='Base power in units of watts')
+        self.options.declare('warm_start', default=True, types=bool,
+                             desc='Keep the previous solution where it is better than the guess after the first run')
+        self.options.declare('power_outputs', default=True, types=bool,
+                             desc='Solve for the power outputs, the load flow only needs the currents (a bounded Q_out is kept)')
 
     def setup(self):
 
@@ -28,6 +34,11 @@ class ACgenerator(ImplicitComponent):
 
         Vbase = self.options['Vbase']
         Sbase = self.options['Sbase']
+        # the bounds of Q_out keep the iterates of the Newton solver in range, so a bounded
+        # Q_out is solved for even without the power outputs
+        bounded = self.options['Q_min'] is not None or self.options['Q_max'] is not None
+        self._powers = ['P_out', 'Q_out'] if self.options['power_outputs'] else ['Q_out'] if bounded else []
+        self._cold_start = True
 
         self.add_input('Vm_bus', val=np.ones(nn), units='V', desc='Voltage magnitude of the generator')
         self.add_input('Vr_out', val=np.ones(nn), units='V', desc='Voltage (real) of the bus receiving power')
@@ -38,22 +49,20 @@ class ACgenerator(ImplicitComponent):
 
         # self.add_output('Ii_out', val=1.0, units='A', desc='Current (imaginary) sent to the bus')
 
-        self.add_output('P_out', val=-np.ones(nn), units='W', desc='Real (active) power entering the line',
-                                res_ref=Sbase, res_units='W')
-        self.add_output('Q_out', val=-np.ones(nn), units='V*A', lower=self.options['Q_min'],
-                                upper=self.options['Q_max'], desc='Reactive power entering the line',
-                                res_ref=Sbase, res_units='W')
-
-        self.declare_partials('P_out', 'Vr_out', rows=ar, cols=ar)
-        self.declare_partials('P_out', 'Vi_out', rows=ar, cols=ar)
-        self.declare_partials('P_out', 'Ir_out', rows=ar, cols=ar)
-        self.declare_partials('P_out', 'Ii_out', rows=ar, cols=ar)
-        self.declare_partials('P_out', 'P_out', rows=ar, cols=ar, val=-1.0)
-        self.declare_partials('Q_out', 'Vr_out', rows=ar, cols=ar)
-        self.declare_partials('Q_out', 'Vi_out', rows=ar, cols=ar)
-        self.declare_partials('Q_out', 'Ir_out', rows=ar, cols=ar)
-        self.declare_partials('Q_out', 'Ii_out', rows=ar, cols=ar)
-        self.declare_partials('Q_out', 'Q_out', rows=ar, cols=ar, val=-1.0)
+        if 'P_out' in self._powers:
+            self.add_output('P_out', val=-np.ones(nn), units='W', desc='Real (active) power entering the line',
+                                    res_ref=Sbase, res_units='W')
+        if 'Q_out' in self._powers:
+            self.add_output('Q_out', val=-np.ones(nn), units='V*A', lower=self.options['Q_min'],
+                                    upper=self.options['Q_max'], desc='Reactive power entering the line',
+                                    res_ref=Sbase, res_units='W')
+
+        for name in self._powers:
+            self.declare_partials(name, 'Vr_out', rows=ar, cols=ar)
+            self.declare_partials(name, 'Vi_out', rows=ar, cols=ar)
+            self.declare_partials(name, 'Ir_out', rows=ar, cols=ar)
+            self.declare_partials(name, 'Ii_out', rows=ar, cols=ar)
+            self.declare_partials(name, name, rows=ar, cols=ar, val=-1.0)
 
         if mode == 'Slack':
             self.add_input('thetaV_bus', val=np.zeros(nn), units='deg', desc='Voltage phase angle of the generator')
@@ -95,8 +104,9 @@ class ACgenerator(ImplicitComponent):
 
         resids['Ir_out'] = inputs['Vm_bus'] - abs(V_out)
 
-        resids['P_out'] = S_out.real - outputs['P_out']
-        resids['Q_out'] = S_out.imag - outputs['Q_out']
+        S = {'P_out': S_out.real, 'Q_out': S_out.imag}
+        for name in self._powers:
+            resids[name] = S[name] - outputs[name]
 
         if mode == 'Slack':
             resids['Ii_out'] = inputs['thetaV_bus'] - np.degrees(np.arctan2(V_out.imag, V_out.real))
@@ -106,14 +116,18 @@ class ACgenerator(ImplicitComponent):
 
     def solve_nonlinear(self, inputs, outputs):
 
+        if not self._powers:
+            return
+
         # mode = self.options['mode']
 
         V_out = inputs['Vr_out'] + inputs['Vi_out']*1j
         I_out = outputs['Ir_out'] + outputs['Ii_out']*1j
         S_out = V_out*I_out.conjugate()
 
-        outputs['P_out'] = S_out.real
-        outputs['Q_out'] = S_out.imag
+        S = {'P_out': S_out.real, 'Q_out': S_out.imag}
+        for name in self._powers:
+            outputs[name] = S[name]
 
         # if mode == 'P-V':
         #     outputs['Ii_out'] = inputs['P_bus']/complex(inputs['Vr_out'], inputs['Vi_out'])
@@ -131,10 +145,16 @@ class ACgenerator(ImplicitComponent):
         V_out = inputs['Vr_out'] + inputs['Vi_out']*1j
         I = (S_guess/V_out).conjugate()
 
-        outputs['Ir_out'] = I.real
-        outputs['Ii_out'] = I.imag
-        outputs['P_out'] = S_guess.real
-        outputs['Q_out'] = S_guess.imag
+        Vbase = self.options['Vbase']
+        Sbase = self.options['Sbase']
+        guess = {'Ir_out': I.real, 'Ii_out': I.imag}
+        refs = {'Ir_out': Vbase, 'Ii_out': Sbase if mode == 'P-V' else 1.0}
+        S = {'P_out': S_guess.real, 'Q_out': S_guess.imag}
+        for name in self._powers:
+            guess[name] = S[name]
+            refs[name] = Sbase
+
+        apply_guess(self, inputs, outputs, guess, refs)
 
     def linearize(self, inputs, outputs, J):
 
@@ -146,17 +166,12 @@ class ACgenerator(ImplicitComponent):
         J['Ir_out', 'Vr_out'] = -inputs['Vr_out']/abs(V_out)
         J['Ir_out', 'Vi_out'] = -inputs['Vi_out']/abs(V_out)
 
-        J['P_out', 'Vr_out'] = (I_out.conjugate()).real
-        J['P_out', 'Vi_out'] = (1j*I_out.conjugate()).real
-        J['P_out', 'Ir_out'] = V_out.real
-        J['P_out', 'Ii_out'] = (-1j*V_out).real
-        J['P_out', 'P_out'] = -1.0
-
-        J['Q_out', 'Vr_out'] = (I_out.conjugate()).imag
-        J['Q_out', 'Vi_out'] = (1j*I_out.conjugate()).imag
-        J['Q_out', 'Ir_out'] = V_out.imag
-        J['Q_out', 'Ii_out'] = (-1j*V_out).imag
-        J['Q_out', 'Q_out'] = -1.0
+        dS = {'Vr_out': I_out.conjugate(), 'Vi_out': 1j*I_out.conjugate(), 'Ir_out': V_out, 'Ii_out': -1j*V_out}
+        for name in self._powers:
+            part = np.real if name == 'P_out' else np.imag
+            for wrt, val in dS.items():
+                J[name, wrt] = part(val)
+            J[name, name] = -1.0
 
         if mode == 'Slack':
             J['Ii_out', 'Vr_out'] = np.degrees(inputs['Vi_out']/abs(V_out)**2)
@@ -180,6 +195,10 @@ class DCgenerator(ImplicitComponent):
 
         self.options.declare('Vbase', default=5000.0, desc='Base voltage in units of volts')
         self.options.declare('Sbase', default=10.0E6, desc='Base power in units of watts')
+        self.options.declare('warm_start', default=True, types=bool,
+                             desc='Keep the previous solution where it is better than the guess after the first run')
+        self.options.declare('power_outputs', default=True, types=bool,
+                             desc='Solve for the power outputs, the load flow only needs the currents (a bounded P_out is kept)')
 
     def setup(self):
 
@@ -187,6 +206,10 @@ class DCgenerator(ImplicitComponent):
         ar = np.arange(nn)
         Vbase = self.options['Vbase']
         Sbase = self.options['Sbase']
+        # a bounded P_out is solved for even without the power outputs, see ACgenerator
+        bounded = self.options['P_min'] is not None or self.options['P_max'] is not None
+        self._power = power = self.options['power_outputs'] or bounded
+        self._cold_start = True
 
         self.add_input('V_bus', val=np.ones(nn), units='V', desc='Voltage magnitude of the generator')
         self.add_input('V_out', val=np.ones(nn), units='V', desc='Voltage of the bus receiving power')
@@ -194,37 +217,47 @@ class DCgenerator(ImplicitComponent):
         self.add_output('I_out', val=-np.ones(nn), units='A', desc='Current sent to the bus',
                                 res_ref=Vbase, res_units='V')
 
-        self.add_output('P_out', val=-np.ones(nn), units='W', lower=self.options['P_min'],
-                                upper=self.options['P_max'], desc='Real (active) power entering the line',
-                                res_ref=Sbase, res_units='W')
+        if power:
+            self.add_output('P_out', val=-np.ones(nn), units='W', lower=self.options['P_min'],
+                                    upper=self.options['P_max'], desc='Real (active) power entering the line',
+                                    res_ref=Sbase, res_units='W')
 
         self.add_input('P_guess', val=-1.0e6*np.ones(nn), units='W', desc='Guess for power output of generator')
 
         self.declare_partials('I_out', 'V_bus', rows=ar, cols=ar, val=1.0)
         self.declare_partials('I_out', 'V_out', rows=ar, cols=ar, val=-1.0)
-        self.declare_partials('P_out', 'V_out', rows=ar, cols=ar)
-        self.declare_partials('P_out', 'I_out', rows=ar, cols=ar)
-        self.declare_partials('P_out', 'P_out', rows=ar, cols=ar, val=-1.0)
+        if power:
+            self.declare_partials('P_out', 'V_out', rows=ar, cols=ar)
+            self.declare_partials('P_out', 'I_out', rows=ar, cols=ar)
+            self.declare_partials('P_out', 'P_out', rows=ar, cols=ar, val=-1.0)
 
 
     def apply_nonlinear(self, inputs, outputs, resids):
 
         resids['I_out'] = inputs['V_bus'] - inputs['V_out']
-        resids['P_out'] = inputs['V_out'] * outputs['I_out'] - outputs['P_out']
+        if self._power:
+            resids['P_out'] = inputs['V_out'] * outputs['I_out'] - outputs['P_out']
 
     def solve_nonlinear(self, inputs, outputs):
 
-        outputs['P_out'] = inputs['V_out'] * outputs['I_out']
+        if self._power:
+            outputs['P_out'] = inputs['V_out'] * outputs['I_out']
 
     def guess_nonlinear(self, inputs, outputs, resids):
 
-        outputs['I_out'] = inputs['P_guess'] / inputs['V_out']
-        outputs['P_out'] = inputs['P_guess']
+        guess = {'I_out': inputs['P_guess'] / inputs['V_out']}
+        refs = {'I_out': self.options['Vbase']}
+        if self._power:
+            guess['P_out'] = inputs['P_guess']
+            refs['P_out'] = self.options['Sbase']
+
+        apply_guess(self, inputs, outputs, guess, refs)
 
     def linearize(self, inputs, outputs, J):
 
-        J['P_out', 'V_out'] = outputs['I_out']
-        J['P_out', 'I_out'] = inputs['V_out']
+        if self._power:
+            J['P_out', 'V_out'] = outputs['I_out']
+            J['P_out', 'I_out'] = inputs['V_out']
 
 if __name__ == "__main__":
     from openmdao.api import Problem, Group, IndepVarComp
@@ -9,6 +9,8 @@ class ACline(ExplicitComponent):
     """
     def initialize(self):
         self.options.declare('num_nodes', types=int)
+        self.options.declare('power_outputs', default=True, types=bool,
+                             desc='Compute the power and loss outputs, the load flow only needs the currents')
 
     def setup(self):
 
@@ -25,12 +27,13 @@ class ACline(ExplicitComponent):
         self.add_output('Ii_in', val=np.ones(nn), units='A', desc='Current (imaginary) entering the line')
         self.add_output('Ir_out', val=np.ones(nn), units='A', desc='Current (real) exiting the line')
         self.add_output('Ii_out', val=np.ones(nn), units='A', desc='Current (imaginary) exiting the line')
-        self.add_output('P_in', val=np.zeros(nn), units='W', desc='Real (active) power entering the line')
-        self.add_output('P_out', val=np.zeros(nn), units='W', desc='Real (active) power exiting the line')
-        self.add_output('P_loss', val=np.zeros(nn), units='W', desc='Real (active) power lost in the line')
-        self.add_output('Q_in', val=np.zeros(nn), units='V*A', desc='Reactive power entering the line')
-        self.add_output('Q_out', val=np.zeros(nn), units='V*A', desc='Reactive power exiting the line')
-        self.add_output('Q_loss', val=np.zeros(nn), units='V*A', desc='Reactive power lost in the line')
+        if self.options['power_outputs']:
+            self.add_output('P_in', val=np.zeros(nn), units='W', desc='Real (active) power entering the line')
+            self.add_output('P_out', val=np.zeros(nn), units='W', desc='Real (active) power exiting the line')
+            self.add_output('P_loss', val=np.zeros(nn), units='W', desc='Real (active) power lost in the line')
+            self.add_output('Q_in', val=np.zeros(nn), units='V*A', desc='Reactive power entering the line')
+            self.add_output('Q_out', val=np.zeros(nn), units='V*A', desc='Reactive power exiting the line')
+            self.add_output('Q_loss', val=np.zeros(nn), units='V*A', desc='Reactive power lost in the line')
 
         ar = np.arange(nn)
 
@@ -63,6 +66,9 @@ class ACline(ExplicitComponent):
         self.declare_partials('Ii_out','Vr_out', rows=ar, cols=ar)
         self.declare_partials('Ii_out','Vi_out', rows=ar, cols=ar)
 
+        if not self.options['power_outputs']:
+            return
+
         self.declare_partials('P_in', 'R', rows=ar, cols=ar)
         self.declare_partials('Q_in', 'R', rows=ar, cols=ar)
 
@@ -126,9 +132,6 @@ class ACline(ExplicitComponent):
         # Compute complex values for currents and powers
         I_in = Y*(V_in-V_out)
         I_out = Y*(V_out-V_in)
-        S_in = V_in*I_in.conjugate()
-        S_out = V_out*I_out.conjugate()
-        S_loss = S_in+S_out
 
         # Convert computed complex values to required outputs
         outputs['Ir_in'] = I_in.real
@@ -136,6 +139,13 @@ class ACline(ExplicitComponent):
         outputs['Ir_out'] = I_out.real
         outputs['Ii_out'] = I_out.imag
 
+        if not self.options['power_outputs']:
+            return
+
+        S_in = V_in*I_in.conjugate()
+        S_out = V_out*I_out.conjugate()
+        S_loss = S_in+S_out
+
         outputs['P_in'] = S_in.real
         outputs['Q_in'] = S_in.imag
         outputs['P_out'] = S_out.real
@@ -185,6 +195,9 @@ class ACline(ExplicitComponent):
         J['Ii_out','Vr_out'] = -J['Ii_in','Vr_out']
         J['Ii_out','Vi_out'] = -J['Ii_in','Vi_out']
 
+        if not self.options['power_outputs']:
+            return
+
         J['P_in', 'R'] = (-V_in*(V_in-V_out).conjugate()*Yconj**2).real
         J['Q_in', 'R'] = (-V_in*(V_in-V_out).conjugate()*Yconj**2).imag
 
@@ -246,6 +259,8 @@ class DCline(ExplicitComponent):
 
     def initialize(self):
         self.options.declare('num_nodes', types=int)
+        self.options.declare('power_outputs', default=True, types=bool,
+                             desc='Compute the power and loss outputs, the load flow only needs the currents')
 
     def setup(self):
 
@@ -257,9 +272,10 @@ class DCline(ExplicitComponent):
 
         self.add_output('I_in', val=np.ones(nn), units='A', desc='Current entering the line')
         self.add_output('I_out', val=np.ones(nn), units='A', desc='Current exiting the line')
-        self.add_output('P_in', val=np.zeros(nn), units='W', desc='Power entering the line')
-        self.add_output('P_out', val=np.zeros(nn), units='W', desc='Power exiting the line')
-        self.add_output('P_loss', val=np.zeros(nn), units='W', desc='Power lost in the line')
+        if self.options['power_outputs']:
+            self.add_output('P_in', val=np.zeros(nn), units='W', desc='Power entering the line')
+            self.add_output('P_out', val=np.zeros(nn), units='W', desc='Power exiting the line')
+            self.add_output('P_loss', val=np.zeros(nn), units='W', desc='Power lost in the line')
 
         ar = np.arange(nn)
 
@@ -271,6 +287,9 @@ class DCline(ExplicitComponent):
         self.declare_partials('I_out','V_in', rows=ar, cols=ar)
         self.declare_partials('I_out','V_out', rows=ar, cols=ar)
 
+        if not self.options['power_outputs']:
+            return
+
         self.declare_partials('P_in', 'R', rows=ar, cols=ar)
         self.declare_partials('P_in', 'V_out', rows=ar, cols=ar)
         self.declare_partials('P_in', 'V_in', rows=ar, cols=ar)
@@ -290,6 +309,9 @@ class DCline(ExplicitComponent):
         outputs['I_in'] =  Y*(inputs['V_in']-inputs['V_out'])
         outputs['I_out'] = Y*(inputs['V_out']-inputs['V_in'])
 
+        if not self.options['power_outputs']:
+            return
+
         outputs['P_in'] = inputs['V_in']*outputs['I_in']
         outputs['P_out'] = inputs['V_out']*outputs['I_out']
         outputs['P_loss'] = outputs['P_in']+outputs['P_out']
@@ -307,6 +329,9 @@ class DCline(ExplicitComponent):
         J['I_out','V_in'] = -J['I_in','V_in']
         J['I_out','V_out'] = -J['I_in','V_out']
 
+        if not self.options['power_outputs']:
+            return
+
         J['P_in', 'R'] = -inputs['V_in']*(inputs['V_in']-inputs['V_out'])*Y**2
         J['P_in', 'V_out'] = -inputs['V_in']*Y
         J['P_in', 'V_in'] = Y*(2*inputs['V_in']-inputs['V_out'])
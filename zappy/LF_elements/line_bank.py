@@ -0,0 +1,201 @@
+import numpy as np
+
+from openmdao.api import ExplicitComponent
+
+class AClineBank(ExplicitComponent):
+    """
+    Calculates the current and power in a bank of AC lines in a single vectorized component.
+    Each variable has shape (num_nodes, num_lines) and column j holds the values of line j.
+    """
+    def initialize(self):
+        self.options.declare('num_nodes', types=int)
+        self.options.declare('num_lines', types=int, desc='Number of lines in the bank')
+
+    def setup(self):
+
+        nn = self.options['num_nodes']
+        nl = self.options['num_lines']
+        shape = (nn, nl)
+
+        self.add_input('R', val=np.ones(shape), units='ohm', desc='Resistance of each line')
+        self.add_input('X', val=np.ones(shape), units='ohm', desc='Reactance of each line')
+        self.add_input('Vr_in', val=np.ones(shape), units='V', desc='Voltage (real) entering each line')
+        self.add_input('Vi_in', val=np.ones(shape), units='V', desc='Voltage (imaginary) entering each line')
+        self.add_input('Vr_out', val=np.ones(shape), units='V', desc='Voltage (real) exiting each line')
+        self.add_input('Vi_out', val=np.ones(shape), units='V', desc='Voltage (imaginary) exiting each line')
+
+        self.add_output('Ir_in', val=np.ones(shape), units='A', desc='Current (real) entering each line')
+        self.add_output('Ii_in', val=np.ones(shape), units='A', desc='Current (imaginary) entering each line')
+        self.add_output('Ir_out', val=np.ones(shape), units='A', desc='Current (real) exiting each line')
+        self.add_output('Ii_out', val=np.ones(shape), units='A', desc='Current (imaginary) exiting each line')
+        self.add_output('P_in', val=np.zeros(shape), units='W', desc='Real (active) power entering each line')
+        self.add_output('P_out', val=np.zeros(shape), units='W', desc='Real (active) power exiting each line')
+        self.add_output('P_loss', val=np.zeros(shape), units='W', desc='Real (active) power lost in each line')
+        self.add_output('Q_in', val=np.zeros(shape), units='V*A', desc='Reactive power entering each line')
+        self.add_output('Q_out', val=np.zeros(shape), units='V*A', desc='Reactive power exiting each line')
+        self.add_output('Q_loss', val=np.zeros(shape), units='V*A', desc='Reactive power lost in each line')
+
+        # every line only depends on its own inputs, so all partials are diagonal
+        ar = np.arange(nn*nl)
+        outs = ['Ir_in', 'Ii_in', 'Ir_out', 'Ii_out', 'P_in', 'Q_in', 'P_out', 'Q_out', 'P_loss', 'Q_loss']
+        ins = ['R', 'X', 'Vr_in', 'Vi_in', 'Vr_out', 'Vi_out']
+        for out in outs:
+            for name in ins:
+                self.declare_partials(out, name, rows=ar, cols=ar)
+
+    def compute(self, inputs, outputs):
+
+        V_in = inputs['Vr_in'] + inputs['Vi_in']*1j
+        V_out = inputs['Vr_out'] + inputs['Vi_out']*1j
+        Y = 1.0/(inputs['R'] + inputs['X']*1j)
+
+        I_in = Y*(V_in-V_out)
+        I_out = -I_in
+        S_in = V_in*I_in.conjugate()
+        S_out = V_out*I_out.conjugate()
+        S_loss = S_in+S_out
+
+        outputs['Ir_in'] = I_in.real
+        outputs['Ii_in'] = I_in.imag
+        outputs['Ir_out'] = I_out.real
+        outputs['Ii_out'] = I_out.imag
+
+        outputs['P_in'] = S_in.real
+        outputs['Q_in'] = S_in.imag
+        outputs['P_out'] = S_out.real
+        outputs['Q_out'] = S_out.imag
+        outputs['P_loss'] = S_loss.real
+        outputs['Q_loss'] = S_loss.imag
+
+    def compute_partials(self, inputs, J):
+
+        V_in = (inputs['Vr_in'] + inputs['Vi_in']*1j).ravel()
+        V_out = (inputs['Vr_out'] + inputs['Vi_out']*1j).ravel()
+        Y = 1.0/(inputs['R'] + inputs['X']*1j).ravel()
+        Yconj = Y.conjugate()
+        dV = V_in-V_out
+
+        # complex derivatives of the line current and of the power at each end
+        dI = {'R': -dV*Y**2, 'X': -1j*dV*Y**2,
+              'Vr_in': Y, 'Vi_in': 1j*Y, 'Vr_out': -Y, 'Vi_out': -1j*Y}
+
+        dS_in = {'R': -V_in*dV.conjugate()*Yconj**2,
+                 'X': 1j*V_in*dV.conjugate()*Yconj**2,
+                 'Vr_in': Yconj*(2*V_in.real-V_out.conjugate()),
+                 'Vi_in': Yconj*(2*V_in.imag-1j*V_out.conjugate()),
+                 'Vr_out': -V_in*Yconj,
+                 'Vi_out': 1j*V_in*Yconj}
+
+        dS_out = {'R': -V_out*(-dV).conjugate()*Yconj**2,
+                  'X': 1j*V_out*(-dV).conjugate()*Yconj**2,
+                  'Vr_in': -V_out*Yconj,
+                  'Vi_in': 1j*V_out*Yconj,
+                  'Vr_out': Yconj*(2*V_out.real-V_in.conjugate()),
+                  'Vi_out': Yconj*(2*V_out.imag-1j*V_in.conjugate())}
+
+        for name in dI:
+            J['Ir_in', name] = dI[name].real
+            J['Ii_in', name] = dI[name].imag
+            J['Ir_out', name] = -dI[name].real
+            J['Ii_out', name] = -dI[name].imag
+
+            J['P_in', name] = dS_in[name].real
+            J['Q_in', name] = dS_in[name].imag
+            J['P_out', name] = dS_out[name].real
+            J['Q_out', name] = dS_out[name].imag
+            J['P_loss', name] = (dS_in[name]+dS_out[name]).real
+            J['Q_loss', name] = (dS_in[name]+dS_out[name]).imag
+
+class DClineBank(ExplicitComponent):
+    """
+    Calculates the current and power in a bank of DC lines in a single vectorized component.
+    Each variable has shape (num_nodes, num_lines) and column j holds the values of line j.
+    """
+    def initialize(self):
+        self.options.declare('num_nodes', types=int)
+        self.options.declare('num_lines', types=int, desc='Number of lines in the bank')
+
+    def setup(self):
+
+        nn = self.options['num_nodes']
+        nl = self.options['num_lines']
+        shape = (nn, nl)
+
+        self.add_input('R', val=np.ones(shape), units='ohm', desc='Resistance of each line')
+        self.add_input('V_in', val=np.ones(shape), units='V', desc='Voltage entering each line')
+        self.add_input('V_out', val=np.ones(shape), units='V', desc='Voltage exiting each line')
+
+        self.add_output('I_in', val=np.ones(shape), units='A', desc='Current entering each line')
+        self.add_output('I_out', val=np.ones(shape), units='A', desc='Current exiting each line')
+        self.add_output('P_in', val=np.zeros(shape), units='W', desc='Power entering each line')
+        self.add_output('P_out', val=np.zeros(shape), units='W', desc='Power exiting each line')
+        self.add_output('P_loss', val=np.zeros(shape), units='W', desc='Power lost in each line')
+
+        ar = np.arange(nn*nl)
+        for out in ['I_in', 'I_out', 'P_in', 'P_out', 'P_loss']:
+            for name in ['R', 'V_in', 'V_out']:
+                self.declare_partials(out, name, rows=ar, cols=ar)
+
+    def compute(self, inputs, outputs):
+
+        Y = 1.0/inputs['R']
+
+        outputs['I_in'] = Y*(inputs['V_in']-inputs['V_out'])
+        outputs['I_out'] = -outputs['I_in']
+
+        outputs['P_in'] = inputs['V_in']*outputs['I_in']
+        outputs['P_out'] = inputs['V_out']*outputs['I_out']
+        outputs['P_loss'] = outputs['P_in']+outputs['P_out']
+
+    def compute_partials(self, inputs, J):
+
+        V_in = inputs['V_in'].ravel()
+        V_out = inputs['V_out'].ravel()
+        Y = 1.0/inputs['R'].ravel()
+        dV = V_in-V_out
+
+        J['I_in', 'R'] = -dV*Y**2
+        J['I_in', 'V_in'] = Y
+        J['I_in', 'V_out'] = -Y
+
+        J['I_out', 'R'] = dV*Y**2
+        J['I_out', 'V_in'] = -Y
+        J['I_out', 'V_out'] = Y
+
+        J['P_in', 'R'] = -V_in*dV*Y**2
+        J['P_in', 'V_in'] = Y*(2*V_in-V_out)
+        J['P_in', 'V_out'] = -V_in*Y
+
+        J['P_out', 'R'] = V_out*dV*Y**2
+        J['P_out', 'V_in'] = -V_out*Y
+        J['P_out', 'V_out'] = Y*(2*V_out-V_in)
+
+        J['P_loss', 'R'] = -dV**2*Y**2
+        J['P_loss', 'V_in'] = 2*dV*Y
+        J['P_loss', 'V_out'] = -2*dV*Y
+
+if __name__ == "__main__":
+    from openmdao.api import Problem, Group, IndepVarComp
+
+    p = Problem()
+    p.model = Group()
+    des_vars = p.model.add_subsystem('des_vars', IndepVarComp(), promotes=['*'])
+
+    des_vars.add_output('R', np.array([[0.02, 0.01], [0.015, 0.03]]), units='ohm')
+    des_vars.add_output('X', np.array([[0.04, 0.05], [0.03, 0.02]]), units='ohm')
+    des_vars.add_output('Vr_in', 1.05*np.ones((2, 2)), units='V')
+    des_vars.add_output('Vi_in', np.zeros((2, 2)), units='V')
+    des_vars.add_output('Vr_out', 0.98*np.ones((2, 2)), units='V')
+    des_vars.add_output('Vi_out', -0.06*np.ones((2, 2)), units='V')
+
+    p.model.add_subsystem('aclines', AClineBank(num_nodes=2, num_lines=2), promotes_inputs=['*'])
+
+    des_vars.add_output('V_in', 1.05*np.ones((2, 2)), units='V')
+    des_vars.add_output('V_out', 0.98*np.ones((2, 2)), units='V')
+
+    p.model.add_subsystem('dclines', DClineBank(num_nodes=2, num_lines=2), promotes_inputs=['*'])
+
+    p.setup(check=False)
+    p.run_model()
+
+    p.check_partials(compact_print=True)
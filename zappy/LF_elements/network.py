@@ -0,0 +1,105 @@
+import numpy as np
+import scipy.sparse as sp
+
+from openmdao.api import ExplicitComponent
+
+def admittance_matrix(buses, branches):
+    """
+    Builds the sparse complex bus admittance matrix (Ybus) from a list of
+    (from_bus, to_bus, R, X) branches.
+    """
+    idx = dict((name, i) for i, name in enumerate(buses))
+    nb = len(buses)
+
+    f = np.array([idx[b[0]] for b in branches], dtype=int)
+    t = np.array([idx[b[1]] for b in branches], dtype=int)
+    y = 1.0/(np.array([b[2] for b in branches], dtype=float) + 1j*np.array([b[3] for b in branches], dtype=float))
+
+    rows = np.concatenate([f, t, f, t])
+    cols = np.concatenate([f, t, t, f])
+    vals = np.concatenate([y, y, -y, -y])
+
+    return sp.coo_matrix((vals, (rows, cols)), shape=(nb, nb), dtype=complex).tocsr()
+
+def bus_indices(num_nodes, num_buses, k):
+    """
+    Returns the flat src_indices of the current of the k-th bus in the Ir and Ii outputs
+    of an ACNetwork, to connect them to the inputs of that bus.
+    """
+    return np.arange(num_nodes)*num_buses + k
+
+class ACNetwork(ExplicitComponent):
+    """
+    Calculates the current flowing from every AC bus into the network of lines
+    using the bus admittance matrix, I = Ybus*V. Replaces one ACline per branch.
+
+    The currents are the outputs Ir and Ii of shape (num_nodes, number of buses), in the
+    order of the buses option, so the partials with respect to the voltage of a bus are
+    one declaration each with the (constant) column of Ybus of that bus. Connect them to
+    the buses with the src_indices of bus_indices.
+    """
+    def initialize(self):
+        self.options.declare('num_nodes', types=int)
+        self.options.declare('buses', types=list, desc='Names of the buses connected by the network')
+        self.options.declare('branches', types=list, desc='List of (from_bus, to_bus, R, X) tuples, R and X in ohms')
+
+    def setup(self):
+
+        nn = self.options['num_nodes']
+        buses = self.options['buses']
+        nb = len(buses)
+
+        self.Ybus = Y = admittance_matrix(buses, self.options['branches'])
+
+        for b in buses:
+            self.add_input('Vr_'+b, val=np.ones(nn), units='V', desc='Voltage (real) of bus '+b)
+            self.add_input('Vi_'+b, val=np.zeros(nn), units='V', desc='Voltage (imaginary) of bus '+b)
+
+        self.add_output('Ir', val=np.zeros((nn, nb)), units='A', desc='Current (real) from every bus into the network')
+        self.add_output('Ii', val=np.zeros((nn, nb)), units='A', desc='Current (imaginary) from every bus into the network')
+
+        # the partials are the (constant) Ybus entries, so they are only set here
+        Ycsc = Y.tocsc()
+        k = np.arange(nn)[:, np.newaxis]
+        for j, b in enumerate(buses):
+            i = Ycsc.indices[Ycsc.indptr[j]:Ycsc.indptr[j+1]]
+            y = np.tile(Ycsc.data[Ycsc.indptr[j]:Ycsc.indptr[j+1]], nn)
+            rows = (i + nb*k).ravel()
+            cols = np.repeat(np.arange(nn), len(i))
+
+            self.declare_partials('Ir', 'Vr_'+b, rows=rows, cols=cols, val=y.real)
+            self.declare_partials('Ir', 'Vi_'+b, rows=rows, cols=cols, val=-y.imag)
+            self.declare_partials('Ii', 'Vr_'+b, rows=rows, cols=cols, val=y.imag)
+            self.declare_partials('Ii', 'Vi_'+b, rows=rows, cols=cols, val=y.real)
+
+    def compute(self, inputs, outputs):
+
+        buses = self.options['buses']
+
+        V = np.array([inputs['Vr_'+b] + inputs['Vi_'+b]*1j for b in buses])
+        I = self.Ybus.dot(V).T
+
+        outputs['Ir'] = I.real
+        outputs['Ii'] = I.imag
+
+if __name__ == "__main__":
+    from openmdao.api import Problem, Group, IndepVarComp
+
+    p = Problem()
+    p.model = Group()
+    des_vars = p.model.add_subsystem('des_vars', IndepVarComp(), promotes=['*'])
+
+    des_vars.add_output('Vr_1', 1.05*np.ones(3), units='V')
+    des_vars.add_output('Vi_1', np.zeros(3), units='V')
+    des_vars.add_output('Vr_2', 0.98*np.ones(3), units='V')
+    des_vars.add_output('Vi_2', -0.06*np.ones(3), units='V')
+    des_vars.add_output('Vr_3', 1.0*np.ones(3), units='V')
+    des_vars.add_output('Vi_3', -0.05*np.ones(3), units='V')
+
+    branches = [('1', '2', 0.02, 0.04), ('1', '3', 0.01, 0.03), ('2', '3', 0.0125, 0.025)]
+    p.model.add_subsystem('net', ACNetwork(num_nodes=3, buses=['1', '2', '3'], branches=branches), promotes_inputs=['*'])
+
+    p.setup(check=False)
+    p.run_model()
+
+    p.check_partials(compact_print=True)
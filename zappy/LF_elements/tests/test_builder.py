@@ -0,0 +1,158 @@
+import unittest
+import copy
+import importlib
+
+import numpy as np
+
+from openmdao.api import Problem
+
+from zappy.LF_elements.builder import LoadFlowNetwork, build_layout
+from zappy.LF_examples.topology_example import TOPOLOGY, Vacbase, Vdcbase
+
+
+def solve_13bus_example():
+
+    Example = importlib.import_module('zappy.LF_examples.13bus_example').Example
+
+    prob = Problem(reports=None)
+    prob.model.add_subsystem('sys', Example(num_nodes=1), promotes=['*'])
+    prob.set_solver_print(level=-1)
+    prob.setup(check=False)
+
+    for bus, spec in TOPOLOGY['buses'].items():
+        if spec['type'] == 'AC':
+            prob['Vr_'+bus] = Vacbase
+            prob['Vi_'+bus] = 0.0
+        else:
+            prob['V_'+bus] = Vdcbase
+
+    prob['Gen1.P_guess'] = -5.0e6
+    prob['Gen3.P_guess'] = -2.0e6
+    for name, sign in [('TX10', 1.), ('TX11', 1.), ('TX12', -1.), ('TX13', -1.)]:
+        prob[name+'.P_ac_guess'] = sign*0.2e6
+        prob[name+'.P_dc_guess'] = -sign*0.2e6
+
+    prob.run_model()
+    return prob
+
+
+class LoadFlowNetworkTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ref = solve_13bus_example()
+
+    def build(self, topology, ac_network=False, initializer='flat', power_outputs=True):
+        prob = Problem(reports=None)
+        prob.model.add_subsystem('sys', LoadFlowNetwork(num_nodes=1, topology=topology, ac_network=ac_network,
+                                                        initializer=initializer, power_outputs=power_outputs),
+                                 promotes=['*'])
+        prob.set_solver_print(level=-1)
+        prob.setup(check=False)
+        return prob
+
+    def assert_same_voltages(self, prob):
+        for bus, spec in TOPOLOGY['buses'].items():
+            names = ['Vr_'+bus, 'Vi_'+bus] if spec['type'] == 'AC' else ['V_'+bus]
+            for name in names:
+                np.testing.assert_allclose(prob[name], self.ref[name], rtol=1e-6, atol=1e-6)
+
+    def test_13bus(self):
+
+        prob = self.build(TOPOLOGY)
+        prob.run_model()
+        self.assert_same_voltages(prob)
+
+        np.testing.assert_allclose(prob['Line1_2.P_loss'], self.ref['Line1_2.P_loss'], rtol=1e-6)
+        np.testing.assert_allclose(prob['TX12.P_ac'], self.ref['TX12.P_ac'], rtol=1e-6)
+
+    def test_13bus_ac_network(self):
+
+        prob = self.build(TOPOLOGY, ac_network=True)
+        prob.run_model()
+        self.assert_same_voltages(prob)
+
+    def test_13bus_linear_initializer(self):
+
+        flat = self.build(TOPOLOGY)
+        flat.run_model()
+
+        for ac_network in (False, True):
+            prob = self.build(TOPOLOGY, ac_network=ac_network, initializer='linear')
+            prob.run_model()
+            for name in ['Vr_7', 'Vi_7', 'V_12dc']:
+                np.testing.assert_allclose(prob[name], self.ref[name], rtol=1e-4)
+            self.assertLess(prob.model.sys.nonlinear_solver._iter_count, flat.model.sys.nonlinear_solver._iter_count)
+
+    def test_13bus_power_outputs(self):
+
+        unbounded = copy.deepcopy(TOPOLOGY)
+        for gen in unbounded['generators']:
+            for key in ('Q_min', 'Q_max', 'P_min', 'P_max'):
+                gen.pop(key, None)
+
+        full = self.build(unbounded)
+        full.run_model()
+        prob = self.build(unbounded, power_outputs=False)
+        prob.run_model()
+
+        self.assertNotIn('sys.Line1_2.P_loss', prob.model._var_allprocs_abs2meta['output'])
+        self.assertIn('sys.Line1_2.P_loss', full.model._var_allprocs_abs2meta['output'])
+        for name in ['Vr_7', 'Vi_7', 'V_12dc']:
+            np.testing.assert_allclose(prob[name], full[name], rtol=1e-6)
+
+        powers = prob.model.sys.powers()
+        for name in ['Line1_2.P_loss', 'Gen1.Q_out', 'TX12.P_ac']:
+            np.testing.assert_allclose(powers[name], full[name], rtol=1e-5)
+
+        # the bounded generator powers are kept, with their bounds
+        prob = self.build(TOPOLOGY, power_outputs=False)
+        prob.run_model()
+        outputs = prob.model._var_allprocs_abs2meta['output']
+        for name in ['sys.Gen2.Q_out', 'sys.Gen3.P_out', 'sys.Gen4.Q_out']:
+            self.assertIn(name, outputs)
+        for name in ['sys.Gen1.Q_out', 'sys.Gen2.P_out', 'sys.Line1_2.P_loss']:
+            self.assertNotIn(name, outputs)
+        self.assertEqual(outputs['sys.Gen2.Q_out']['upper'], -0.1e6)
+        self.assertTrue(prob.model.sys.nonlinear_solver._iter_count < 10)
+        self.assert_same_voltages(prob)
+        np.testing.assert_allclose(prob['Gen2.Q_out'], self.ref['Gen2.Q_out'], rtol=1e-5)
+
+    def test_layout_cache(self):
+
+        variant = copy.deepcopy(TOPOLOGY)
+        variant['loads'][0]['P'] = 1.5e6
+        variant['lines'][0]['R'] = 0.3
+
+        self.assertIs(build_layout(TOPOLOGY), build_layout(variant))
+
+        prob = self.build(variant)
+        self.assertEqual(prob['Load2:P'][0], 1.5e6)
+        self.assertEqual(prob['Line1_2:R'][0], 0.3)
+
+        variant['loads'][0]['bus'] = '3'
+        self.assertIsNot(build_layout(TOPOLOGY), build_layout(variant))
+
+    def test_bad_topology(self):
+
+        variant = copy.deepcopy(TOPOLOGY)
+        variant['lines'].append({'from': '1', 'to': '4', 'R': 0.1, 'X': 0.1})
+
+        with self.assertRaises(ValueError) as cm:
+            build_layout(variant)
+        self.assertEqual(str(cm.exception), "bus '4' is not of type 'AC'.")
+
+        variant['lines'][-1]['to'] = '42'
+        with self.assertRaises(ValueError) as cm:
+            build_layout(variant)
+        self.assertEqual(str(cm.exception), "bus '42' is not defined in the topology.")
+
+        variant = copy.deepcopy(TOPOLOGY)
+        del variant['lines'][1]['X']
+        with self.assertRaises(ValueError) as cm:
+            self.build(variant, ac_network=True)
+        self.assertEqual(str(cm.exception), "'X' must be given for lines[1] from bus '1' to bus '9'.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,8 @@
 import unittest
-# import numpy as np
+import numpy as np
 
 from openmdao.api import Problem, Group, IndepVarComp
-from openmdao.utils.assert_utils import assert_rel_error
+from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
 from openmdao.api import DirectSolver, BoundsEnforceLS, NewtonSolver, NonlinearBlockGS
 
 from zappy.LF_elements.bus import ACbus, DCbus
@@ -210,6 +210,75 @@ class ConverterTestCase2(unittest.TestCase):
         assert_rel_error(self, self.prob['Conv.Q_ac'], -0.1011*1e6, tol)
         assert_rel_error(self, self.prob['Conv.P_dc'], 0.31367*1e6, tol)
 
+class ConverterVectorizedTestCase(unittest.TestCase):
+
+    """Power flows DC to AC at the first node and AC to DC at the second"""
+    def build(self, nn, P, PF):
+        prob = Problem()
+
+        par = prob.model.add_subsystem('par', IndepVarComp(), promotes=['*'])
+        par.add_output('ac_line:Ir', np.zeros(nn), units='A')
+        par.add_output('ac_line:Ii', np.zeros(nn), units='A')
+        par.add_output('Ksc', 0.611764706*np.ones(nn), units=None)
+        par.add_output('M', 0.97*np.ones(nn), units=None)
+        par.add_output('eff', 0.98*np.ones(nn), units=None)
+        par.add_output('PF', PF, units=None)
+        par.add_output('P', P, units='MW')
+
+        prob.model.add_subsystem('dc_load', DCload(num_nodes=nn), promotes=['P', ('V_in','V'), ('I_in','dc_line:I')])
+        prob.model.add_subsystem('Conv', Converter(num_nodes=nn, mode='Lag'), promotes=[('V_dc','V'), ('Vr_ac','Vr'), ('Vi_ac','Vi'),
+                                                        ('I_dc','dc_side:I'), ('Ir_ac', 'ac_side:Ir'), ('Ii_ac', 'ac_side:Ii'),
+                                                        'Ksc', 'M', 'eff', 'PF'])
+        prob.model.add_subsystem('ac_bus', ACbus(num_nodes=nn, lines=['ac_line', 'ac_side']), promotes=['Vr', 'Vi', 'ac_line:*', 'ac_side:*'])
+        prob.model.add_subsystem('dc_bus', DCbus(num_nodes=nn, lines=['dc_line', 'dc_side']), promotes=['V', 'dc_line:*', 'dc_side:*'])
+
+        newton = prob.model.nonlinear_solver = NewtonSolver()
+        newton.options['atol'] = 1e-10
+        newton.options['rtol'] = 1e-10
+        newton.options['maxiter'] = 20
+        newton.options['solve_subsystems'] = True
+        newton.linesearch = BoundsEnforceLS()
+        newton.linesearch.options['bound_enforcement'] = 'scalar'
+        prob.model.linear_solver = DirectSolver()
+
+        prob.set_solver_print(level=-1)
+        prob.setup(check=False)
+
+        # the AC bus is held by a fixed line current, the DC side supplies or absorbs the load
+        prob['ac_line:Ir'] = np.where(P < 0, 151.172584807581, -100.0)
+        prob['ac_line:Ii'] = np.where(P < 0, -64.7258926104048, 30.0)
+        prob['Vr'] = 4160.0
+        prob['V'] = 6800.0
+        prob['ac_side:Ir'] = -prob['ac_line:Ir']
+        prob['ac_side:Ii'] = -prob['ac_line:Ii']
+        prob['dc_side:I'] = -prob['P']*1e6/6800.0
+        return prob
+
+    def test_mixed_directions(self):
+
+        P = np.array([-0.63398, 0.4])
+        PF = np.array([-0.95, 0.95])
+
+        prob = self.build(2, P, PF)
+        prob.run_model()
+
+        self.assertLess(prob['Conv.P_ac'][0], 0.0)
+        self.assertGreater(prob['Conv.P_ac'][1], 0.0)
+
+        for i in range(2):
+            single = self.build(1, P[i:i+1], PF[i:i+1])
+            single.run_model()
+            for name in ['Vr', 'Vi', 'V', 'Conv.P_ac', 'Conv.Q_ac', 'Conv.P_dc']:
+                assert_rel_error(self, prob[name][i], single[name][0], 1e-8)
+
+        # power balance of the converter picks the efficiency on the right side at each node
+        assert_rel_error(self, prob['Conv.P_ac'][0], -0.98*prob['Conv.P_dc'][0], 1e-8)
+        assert_rel_error(self, 0.98*prob['Conv.P_ac'][1], -prob['Conv.P_dc'][1], 1e-8)
+
+        data = prob.check_partials(out_stream=None, method='fd', form='central', includes=['Conv'])
+        assert_check_partials(data, atol=0.1, rtol=1e-5)
+
+
 if __name__ == "__main__":
     unittest.main()
 
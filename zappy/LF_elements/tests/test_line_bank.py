@@ -0,0 +1,102 @@
+import unittest
+import numpy as np
+
+from openmdao.api import Problem, IndepVarComp
+from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
+
+from zappy.LF_elements.line import ACline, DCline
+from zappy.LF_elements.line_bank import AClineBank, DClineBank
+
+
+class AClineBankTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.prob = Problem(reports=None)
+
+        des_vars = self.prob.model.add_subsystem('des_vars', IndepVarComp(), promotes=['*'])
+
+        des_vars.add_output('R', np.array([[0.2218, 0.2218], [0.1, 0.3]]), units='ohm')
+        des_vars.add_output('X', np.array([[0.3630, 0.3630], [0.2, 0.5]]), units='ohm')
+        des_vars.add_output('Vr_in', np.array([[4368.0, 4368.0], [4300., 4200.]]), units='V')
+        des_vars.add_output('Vi_in', np.array([[0.0, 0.0], [-10., 20.]]), units='V')
+        des_vars.add_output('Vr_out', np.array([[4211.34943357403, 4172.22191365666], [4250., 4210.]]), units='V')
+        des_vars.add_output('Vi_out', np.array([[-151.677930945098, -192.057264384983], [-50., -30.]]), units='V')
+
+        self.prob.model.add_subsystem('bank', AClineBank(num_nodes=2, num_lines=2), promotes_inputs=['*'])
+
+        self.prob.set_solver_print(level=-1)
+        self.prob.setup(check=False)
+
+    def test_matches_acline(self):
+
+        self.prob.run_model()
+
+        tol = 1e-4
+
+        assert_rel_error(self, self.prob['bank.Ir_in'][0, 0], 496.25376022551, tol)
+        assert_rel_error(self, self.prob['bank.Ii_in'][0, 0], -128.323642997125, tol)
+        assert_rel_error(self, self.prob['bank.P_loss'][0, 0], 0.058274568*1e6, tol)
+        assert_rel_error(self, self.prob['bank.Ir_in'][0, 1], 625.20841975576, tol)
+        assert_rel_error(self, self.prob['bank.Q_loss'][0, 1], 0.150875465*1e6, tol)
+
+        line = Problem(reports=None)
+        line.model.add_subsystem('line', ACline(num_nodes=4), promotes=['*'])
+        line.setup(check=False)
+        for name in ['R', 'X', 'Vr_in', 'Vi_in', 'Vr_out', 'Vi_out']:
+            line[name] = self.prob[name].ravel()
+        line.run_model()
+
+        for name in ['Ir_in', 'Ii_in', 'Ir_out', 'Ii_out', 'P_in', 'Q_in', 'P_out', 'Q_out', 'P_loss', 'Q_loss']:
+            assert_rel_error(self, self.prob['bank.'+name].ravel(), line[name], 1e-10)
+
+    def test_partials(self):
+
+        data = self.prob.check_partials(out_stream=None, method='fd', form='central')
+        assert_check_partials(data, atol=0.1, rtol=1e-5)
+
+
+class DClineBankTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.prob = Problem(reports=None)
+
+        des_vars = self.prob.model.add_subsystem('des_vars', IndepVarComp(), promotes=['*'])
+
+        des_vars.add_output('R', np.array([[0.2208, 0.2208, 0.5]]), units='ohm')
+        des_vars.add_output('V_in', np.array([[6779.6, 6800.0, 6700.]]), units='V')
+        des_vars.add_output('V_out', np.array([[6800.0, 6759.2, 6750.]]), units='V')
+
+        self.prob.model.add_subsystem('bank', DClineBank(num_nodes=1, num_lines=3), promotes_inputs=['*'])
+
+        self.prob.set_solver_print(level=-1)
+        self.prob.setup(check=False)
+
+    def test_matches_dcline(self):
+
+        self.prob.run_model()
+
+        tol = 1e-4
+
+        assert_rel_error(self, self.prob['bank.I_in'][0, 0], -92.39130435, tol)
+        assert_rel_error(self, self.prob['bank.P_loss'][0, 0], 0.001884783*1e6, tol)
+        assert_rel_error(self, self.prob['bank.I_in'][0, 1], 184.7826087, tol)
+        assert_rel_error(self, self.prob['bank.P_out'][0, 1], -1.248982609*1e6, tol)
+
+        line = Problem(reports=None)
+        line.model.add_subsystem('line', DCline(num_nodes=3), promotes=['*'])
+        line.setup(check=False)
+        for name in ['R', 'V_in', 'V_out']:
+            line[name] = self.prob[name].ravel()
+        line.run_model()
+
+        for name in ['I_in', 'I_out', 'P_in', 'P_out', 'P_loss']:
+            assert_rel_error(self, self.prob['bank.'+name].ravel(), line[name], 1e-10)
+
+    def test_partials(self):
+
+        data = self.prob.check_partials(out_stream=None, method='fd', form='central')
+        assert_check_partials(data, atol=0.1, rtol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
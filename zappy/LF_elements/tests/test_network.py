@@ -0,0 +1,136 @@
+import unittest
+import numpy as np
+
+from openmdao.api import Problem, Group, IndepVarComp
+from openmdao.api import DirectSolver, BoundsEnforceLS, NewtonSolver
+from openmdao.utils.assert_utils import assert_rel_error, assert_check_partials
+
+from zappy.LF_elements.bus import ACbus
+from zappy.LF_elements.generator import ACgenerator
+from zappy.LF_elements.load import ACload
+from zappy.LF_elements.network import ACNetwork, bus_indices
+from zappy.LF_examples.load_flow_example2 import Example
+
+
+class NetworkExample(Group):
+
+    """load_flow_example2 with the three ACline components replaced by a single ACNetwork"""
+    def setup(self):
+
+        par = self.add_subsystem('par', IndepVarComp(), promotes=['*'])
+        par.add_output('Vm1_bus', 1.05, units='V')
+        par.add_output('thetaV_bus', 0.0, units='deg')
+        par.add_output('P2', 4.0, units='W')
+        par.add_output('Q2', 2.5, units='V*A')
+        par.add_output('P3', -2.0, units='W')
+        par.add_output('Vm3_bus', 1.04, units='V')
+
+        branches = [('1', '2', 0.02, 0.04), ('1', '3', 0.01, 0.03), ('2', '3', 0.0125, 0.025)]
+        self.add_subsystem('Net', ACNetwork(num_nodes=1, buses=['1', '2', '3'], branches=branches), promotes_inputs=['*'])
+
+        self.add_subsystem('Gen1', ACgenerator(num_nodes=1, mode='Slack'), promotes=[('Vm_bus','Vm1_bus'), 'thetaV_bus', ('Vr_out','Vr_1'), ('Vi_out','Vi_1'),
+                                                        ('Ir_out','LG1:Ir'),('Ii_out','LG1:Ii')])
+        self.add_subsystem('Gen3', ACgenerator(num_nodes=1, mode='P-V'), promotes=[('Vm_bus','Vm3_bus'), ('P_bus','P3'), ('Vr_out','Vr_3'), ('Vi_out','Vi_3'),
+                                                        ('Ir_out','LG3:Ir'),('Ii_out','LG3:Ii')])
+        self.add_subsystem('Load2', ACload(num_nodes=1), promotes=[('P','P2'), ('Q','Q2'), ('Vr_in','Vr_2'), ('Vi_in','Vi_2'),
+                                                        ('Ir_in','LL2:Ir'),('Ii_in','LL2:Ii')])
+
+        self.add_subsystem('Bus1', ACbus(num_nodes=1, lines=['LN1', 'LG1']), promotes=[('Vr', 'Vr_1'), ('Vi', 'Vi_1'), 'LN1:*', 'LG1:*'])
+        self.add_subsystem('Bus2', ACbus(num_nodes=1, lines=['LN2', 'LL2']), promotes=[('Vr', 'Vr_2'), ('Vi', 'Vi_2'), 'LN2:*', 'LL2:*'])
+        self.add_subsystem('Bus3', ACbus(num_nodes=1, lines=['LN3', 'LG3']), promotes=[('Vr', 'Vr_3'), ('Vi', 'Vi_3'), 'LN3:*', 'LG3:*'])
+        for k, b in enumerate(['1', '2', '3']):
+            self.connect('Net.Ir', 'LN'+b+':Ir', src_indices=bus_indices(1, 3, k), flat_src_indices=True)
+            self.connect('Net.Ii', 'LN'+b+':Ii', src_indices=bus_indices(1, 3, k), flat_src_indices=True)
+
+        newton = self.nonlinear_solver = NewtonSolver()
+        newton.options['atol'] = 1e-8
+        newton.options['rtol'] = 1e-8
+        newton.options['maxiter'] = 20
+        newton.options['solve_subsystems'] = True
+        newton.options['max_sub_solves'] = 3
+        newton.linesearch = BoundsEnforceLS()
+        newton.linesearch.options['bound_enforcement'] = 'scalar'
+
+        self.linear_solver = DirectSolver(assemble_jac=True)
+
+
+class ACNetworkTestCase(unittest.TestCase):
+
+    def test_currents(self):
+
+        prob = Problem(reports=None)
+        des_vars = prob.model.add_subsystem('des_vars', IndepVarComp(), promotes=['*'])
+        des_vars.add_output('Vr_1', np.array([4368.0, 4300.0]), units='V')
+        des_vars.add_output('Vi_1', np.array([0.0, 10.0]), units='V')
+        des_vars.add_output('Vr_2', np.array([4211.34943357403, 4200.0]), units='V')
+        des_vars.add_output('Vi_2', np.array([-151.677930945098, -120.0]), units='V')
+
+        prob.model.add_subsystem('net', ACNetwork(num_nodes=2, buses=['1', '2'], branches=[('1', '2', 0.2218, 0.3630)]),
+                                 promotes=['*'])
+        prob.setup(check=False)
+        prob.run_model()
+
+        tol = 1e-8
+        self.assertEqual(prob['Ir'].shape, (2, 2))
+        assert_rel_error(self, prob['Ir'][0, 0], 496.25376022551, 1e-4)
+        assert_rel_error(self, prob['Ii'][0, 0], -128.323642997125, 1e-4)
+        assert_rel_error(self, prob['Ir'][:, 0], -prob['Ir'][:, 1], tol)
+        assert_rel_error(self, prob['Ii'][:, 0], -prob['Ii'][:, 1], tol)
+
+        data = prob.check_partials(out_stream=None, method='fd', form='central')
+        assert_check_partials(data, atol=1e-4, rtol=1e-5)
+
+    def test_declarations(self):
+
+        # a meshed network, the partials are declared once per bus voltage and current
+        nb = 60
+        buses = [str(i) for i in range(nb)]
+        branches = [(str(i), str((i+1) % nb), 0.1, 0.2) for i in range(nb)]
+        branches += [(str(i), str((i+7) % nb), 0.3, 0.1) for i in range(0, nb, 2)]
+
+        prob = Problem(reports=None)
+        des_vars = prob.model.add_subsystem('des_vars', IndepVarComp(), promotes=['*'])
+        rng = np.random.RandomState(0)
+        for b in buses:
+            des_vars.add_output('Vr_'+b, 4160.0 + rng.uniform(-50, 50, 3), units='V')
+            des_vars.add_output('Vi_'+b, rng.uniform(-50, 50, 3), units='V')
+        net = prob.model.add_subsystem('net', ACNetwork(num_nodes=3, buses=buses, branches=branches), promotes=['*'])
+        prob.setup(check=False)
+        prob.run_model()
+
+        self.assertEqual(len(net._subjacs_info), 4*nb + 2) # and the identity of Ir and Ii
+        V = np.array([prob['Vr_'+b] + prob['Vi_'+b]*1j for b in buses])
+        I = net.Ybus.dot(V).T
+        np.testing.assert_allclose(prob['Ir'], I.real)
+        np.testing.assert_allclose(prob['Ii'], I.imag)
+
+        data = prob.check_partials(out_stream=None, method='fd', form='central')
+        assert_check_partials(data, atol=1e-4, rtol=1e-5)
+
+    def test_matches_line_model(self):
+
+        lines = Problem(reports=None)
+        lines.model.add_subsystem('sys', Example(num_nodes=1), promotes=['*'])
+
+        net = Problem(reports=None)
+        net.model.add_subsystem('sys', NetworkExample(), promotes=['*'])
+
+        for prob in (lines, net):
+            prob.set_solver_print(level=-1)
+            prob.setup(check=False)
+            prob.final_setup()
+            newton = prob.model.sys.nonlinear_solver
+            newton.options['atol'] = 1e-8
+            newton.options['rtol'] = 1e-8
+            newton.options['maxiter'] = 20
+            prob['Vr_1'] = 1.05
+            prob['Vr_2'] = 1.0
+            prob['Vr_3'] = 1.0
+            prob.run_model()
+
+        for name in ['Vr_1', 'Vi_1', 'Vr_2', 'Vi_2', 'Vr_3', 'Vi_3', 'LG1:Ir', 'LG1:Ii']:
+            np.testing.assert_allclose(net[name], lines[name], rtol=1e-6, atol=1e-10)
+
+
+if __name__ == "__main__":
+    unittest.main()
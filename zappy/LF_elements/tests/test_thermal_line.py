@@ -0,0 +1,130 @@
+import unittest
+import copy
+import numpy as np
+
+from openmdao.api import Problem, IndepVarComp, AnalysisError
+from openmdao.api import DirectSolver, NewtonSolver
+from openmdao.utils.assert_utils import assert_check_partials
+
+from zappy.LF_elements.builder import LoadFlowNetwork
+from zappy.LF_elements.thermal_line import ConductorResistance, ConductorTemperature, ThermalDCline
+from zappy.LF_examples.topology_example import TOPOLOGY
+from zappy.LF_solvers.system import LoadFlowSystem
+
+
+def resistance(T, length, dia, rho=1.72e-8, alpha=0.00393, T_ref=293.15):
+    return 4.0*rho*(1.0 + alpha*(T - T_ref))*length/(np.pi*dia**2)
+
+
+def thermal_topology():
+    """
+    The example topology with line 1-2 replaced by a 2 km thermal line that has the
+    resistance of the original line at T_ref.
+    """
+    topology = copy.deepcopy(TOPOLOGY)
+    line = topology['lines'][0]
+    R = line.pop('R')
+    line.update(thermal=True, length=2000.0, dia=np.sqrt(4.0*1.72e-8*2000.0/(np.pi*R)))
+    return topology
+
+
+def build(topology):
+    prob = Problem(reports=None)
+    prob.model.add_subsystem('sys', LoadFlowNetwork(num_nodes=1, topology=topology), promotes=['*'])
+    prob.set_solver_print(level=-1)
+    prob.setup(check=False)
+    return prob
+
+
+class ThermalLineTestCase(unittest.TestCase):
+
+    def test_partials(self):
+
+        prob = Problem(reports=None)
+        des_vars = prob.model.add_subsystem('des_vars', IndepVarComp(), promotes=['*'])
+        des_vars.add_output('length', np.array([1000.0, 20.0]), units='m')
+        des_vars.add_output('dia', np.array([0.005, 0.02]), units='m')
+        des_vars.add_output('P_loss', np.array([500.0, 2000.0]), units='W')
+        prob.model.add_subsystem('therm', ConductorTemperature(num_nodes=2), promotes=['*'])
+        prob.model.add_subsystem('res', ConductorResistance(num_nodes=2), promotes=['*'])
+        prob.setup(check=False, force_alloc_complex=True)
+        prob.run_model()
+
+        np.testing.assert_allclose(prob['T'], 300.0 + prob['P_loss']/(10.0*np.pi*prob['dia']*prob['length']))
+        np.testing.assert_allclose(prob['R'], resistance(prob['T'], prob['length'], prob['dia']))
+
+        data = prob.check_partials(method='cs', compact_print=True, out_stream=None)
+        assert_check_partials(data, atol=1e-8, rtol=1e-8)
+
+    def test_dc_line(self):
+
+        prob = Problem(reports=None)
+        des_vars = prob.model.add_subsystem('des_vars', IndepVarComp(), promotes=['*'])
+        des_vars.add_output('V_in', 6800.0, units='V')
+        des_vars.add_output('V_out', 6750.0, units='V')
+        des_vars.add_output('length', 1000.0, units='m')
+        des_vars.add_output('dia', 0.01, units='m')
+        prob.model.add_subsystem('line', ThermalDCline(num_nodes=1), promotes=['*'])
+
+        prob.model.nonlinear_solver = NewtonSolver(solve_subsystems=False, atol=1e-10, rtol=1e-10, maxiter=20)
+        prob.model.linear_solver = DirectSolver()
+        prob.set_solver_print(level=-1)
+        prob.setup(check=False)
+        prob.run_model()
+
+        # the temperature at which the heat balance and the resistance agree
+        T = 300.0
+        for i in range(100):
+            T = 300.0 + 50.0**2/resistance(T, 1000.0, 0.01)/(10.0*np.pi*0.01*1000.0)
+        np.testing.assert_allclose(prob['T'], T, rtol=1e-10)
+        np.testing.assert_allclose(prob['I_in'], 50.0/resistance(T, 1000.0, 0.01), rtol=1e-10)
+
+    def test_13bus_coupled(self):
+
+        topology = thermal_topology()
+        line = topology['lines'][0]
+        prob = build(topology)
+        prob.run_model()
+
+        # the outer iteration between the load flow and the heat balance it replaces
+        ref = build(TOPOLOGY)
+        T = 300.0
+        for i in range(30):
+            ref['Line1_2:R'] = resistance(T, line['length'], line['dia'])
+            ref.run_model()
+            T = 300.0 + ref['Line1_2.P_loss'][0]/(10.0*np.pi*line['dia']*line['length'])
+
+        np.testing.assert_allclose(prob['Line1_2.T'], T, rtol=1e-5)
+        np.testing.assert_allclose(prob['Line1_2.R'], ref['Line1_2:R'], rtol=1e-5)
+        for name in ['Vr_7', 'Vi_7', 'V_12dc']:
+            np.testing.assert_allclose(prob[name], ref[name], rtol=1e-5, atol=0.1)
+
+        with self.assertRaises(ValueError):
+            LoadFlowSystem(topology)
+        with self.assertRaisesRegex(ValueError, 'thermal lines'):
+            prob.model.sys.powers()
+
+    def test_runaway(self):
+
+        # the loss of these conductors grows faster with their temperature than the convection
+        for length, dia in [(1000.0, 0.01), (100.0, 0.0032)]:
+            topology = thermal_topology()
+            topology['lines'][0].update(length=length, dia=dia)
+            prob = build(topology)
+            with np.errstate(all='ignore'):
+                with self.assertRaisesRegex(AnalysisError, 'thermal runaway'):
+                    prob.run_model()
+
+    def test_initializer(self):
+
+        for initializer in ['linear', 'sweep']:
+            prob = Problem(reports=None)
+            prob.model.add_subsystem('sys', LoadFlowNetwork(num_nodes=1, topology=thermal_topology(),
+                                                            initializer=initializer), promotes=['*'])
+            with self.assertRaisesRegex(ValueError, "initializer '{}' does not support thermal lines "
+                                        r"\(Line1_2\)".format(initializer)):
+                prob.setup(check=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from openmdao.api import Problem
+
+from zappy.LF_elements.builder import LoadFlowNetwork
+from zappy.LF_elements.warm_start import force_flat_start
+from zappy.LF_examples.topology_example import TOPOLOGY
+
+
+class WarmStartTestCase(unittest.TestCase):
+
+    def setup_problem(self, warm_start):
+        prob = Problem(reports=None)
+        prob.model.add_subsystem('sys', LoadFlowNetwork(num_nodes=2, topology=TOPOLOGY, warm_start=warm_start),
+                                 promotes=['*'])
+        prob.set_solver_print(level=-1)
+        prob.setup(check=False)
+        prob.run_model()
+        return prob
+
+    def test_warm_start(self):
+
+        prob = self.setup_problem(True)
+        newton = prob.model.sys.nonlinear_solver
+        cold = newton._iter_count
+
+        prob['Load2:P'] *= 1.02
+        prob.run_model()
+        self.assertLess(newton._iter_count, cold)
+        V_warm = prob['Vr_2'].copy()
+
+        force_flat_start(prob.model)
+        prob.run_model()
+        self.assertEqual(newton._iter_count, cold)
+        np.testing.assert_allclose(V_warm, prob['Vr_2'], rtol=1e-6)
+
+    def test_flat_start(self):
+
+        prob = self.setup_problem(False)
+        newton = prob.model.sys.nonlinear_solver
+        cold = newton._iter_count
+
+        prob['Load2:P'] *= 1.02
+        prob.run_model()
+        self.assertEqual(newton._iter_count, cold)
+
+    def test_collapsed_voltage(self):
+
+        prob = self.setup_problem(True)
+        prob['Vr_2'] = [np.nan, 0.0]
+        prob['Vi_2'] = 0.0
+        prob.run_model()
+        self.assertTrue(np.all(prob['Vr_2'] > 0.9*TOPOLOGY['Vbase']))
+
+
+if __name__ == "__main__":
+    unittest.main()
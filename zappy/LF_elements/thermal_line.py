@@ -0,0 +1,158 @@
+import numpy as np
+
+from openmdao.api import Group, ExplicitComponent, ImplicitComponent, AnalysisError
+
+from zappy.LF_elements.line import ACline, DCline
+
+class ConductorResistance(ExplicitComponent):
+    """
+    Calculates the resistance of a round conductor at its temperature, the resistance of
+    WirePerf with a linear temperature coefficient:
+    R = 4*rho*(1 + alpha*(T - T_ref))*length/(pi*dia**2).
+
+    A temperature at which the resistance is not positive raises an AnalysisError. The
+    load flow only gets there when the heat balance has no solution, i.e. when the loss
+    grows faster with the temperature than the convection (thermal runaway).
+    """
+    def initialize(self):
+        self.options.declare('num_nodes', types=int)
+
+    def setup(self):
+
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
+        self.add_input('rho', val=1.72e-8*np.ones(nn), units='ohm*m', desc='Resistivity of the conductor at T_ref')
+        self.add_input('alpha', val=0.00393*np.ones(nn), units='1/K', desc='Temperature coefficient of the resistivity')
+        self.add_input('T_ref', val=293.15*np.ones(nn), units='K', desc='Reference temperature of the resistivity')
+        self.add_input('length', val=np.ones(nn), units='m', desc='Length of the conductor')
+        self.add_input('dia', val=0.01*np.ones(nn), units='m', desc='Diameter of the conductor')
+        self.add_input('T', val=293.15*np.ones(nn), units='K', desc='Temperature of the conductor')
+
+        self.add_output('R', val=np.ones(nn), units='ohm', lower=0.0, desc='Resistance of the conductor')
+
+        self.declare_partials('R', '*', rows=ar, cols=ar)
+
+    def compute(self, inputs, outputs):
+
+        k = 4.0*inputs['length']/(np.pi*inputs['dia']**2)
+        f = 1.0 + inputs['alpha']*(inputs['T'] - inputs['T_ref'])
+        if np.any(f.real <= 0.0):
+            raise AnalysisError('{}: no positive resistance at T = {} K, the conductor is in thermal '
+                                'runaway.'.format(self.pathname, inputs['T'][f.real <= 0.0].real))
+        outputs['R'] = inputs['rho']*f*k
+
+    def compute_partials(self, inputs, J):
+
+        k = 4.0*inputs['length']/(np.pi*inputs['dia']**2)
+        f = 1.0 + inputs['alpha']*(inputs['T'] - inputs['T_ref'])
+        R = inputs['rho']*f*k
+
+        J['R', 'rho'] = f*k
+        J['R', 'alpha'] = inputs['rho']*k*(inputs['T'] - inputs['T_ref'])
+        J['R', 'T_ref'] = -inputs['rho']*k*inputs['alpha']
+        J['R', 'T'] = inputs['rho']*k*inputs['alpha']
+        J['R', 'length'] = R/inputs['length']
+        J['R', 'dia'] = -2.0*R/inputs['dia']
+
+class ConductorTemperature(ImplicitComponent):
+    """
+    Determines the steady temperature of a conductor at which convection from its
+    surface removes the power lost in it, h*pi*dia*length*(T - T_f) = P_loss.
+    """
+    def initialize(self):
+        self.options.declare('num_nodes', types=int)
+
+    def setup(self):
+
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
+        self.add_input('P_loss', val=np.zeros(nn), units='W', desc='Power lost in the conductor')
+        self.add_input('h', val=10.0*np.ones(nn), units='W/(m**2*K)', desc='Heat transfer coefficient')
+        self.add_input('T_f', val=300.0*np.ones(nn), units='K', desc='Temperature of the surrounding fluid')
+        self.add_input('length', val=np.ones(nn), units='m', desc='Length of the conductor')
+        self.add_input('dia', val=0.01*np.ones(nn), units='m', desc='Diameter of the conductor')
+
+        # the residual is the temperature error rather than the heat balance, so it is well scaled
+        self.add_output('T', val=300.0*np.ones(nn), units='K', lower=0.0, desc='Temperature of the conductor')
+
+        self.declare_partials('T', 'T', rows=ar, cols=ar, val=1.0)
+        self.declare_partials('T', 'T_f', rows=ar, cols=ar, val=-1.0)
+        self.declare_partials('T', ['P_loss', 'h', 'length', 'dia'], rows=ar, cols=ar)
+
+    def _rise(self, inputs):
+        return inputs['P_loss']/(inputs['h']*np.pi*inputs['dia']*inputs['length'])
+
+    def apply_nonlinear(self, inputs, outputs, resids):
+
+        resids['T'] = outputs['T'] - inputs['T_f'] - self._rise(inputs)
+
+    def solve_nonlinear(self, inputs, outputs):
+
+        outputs['T'] = inputs['T_f'] + self._rise(inputs)
+
+    def linearize(self, inputs, outputs, J):
+
+        rise = self._rise(inputs)
+
+        J['T', 'P_loss'] = -1.0/(inputs['h']*np.pi*inputs['dia']*inputs['length'])
+        J['T', 'h'] = rise/inputs['h']
+        J['T', 'length'] = rise/inputs['length']
+        J['T', 'dia'] = rise/inputs['dia']
+
+class ThermalACline(Group):
+    """
+    ACline whose resistance follows the temperature of its conductor, which in turn
+    follows the power lost in the line. It replaces the R input of ACline with the
+    conductor inputs of ConductorResistance and ConductorTemperature and adds the
+    outputs R and T, so the load flow and the heat balance are solved together by the
+    Newton solver of the enclosing model.
+    """
+    def initialize(self):
+        self.options.declare('num_nodes', types=int)
+
+    def setup(self):
+
+        nn = self.options['num_nodes']
+
+        self.add_subsystem('res', ConductorResistance(num_nodes=nn), promotes=['*'])
+        self.add_subsystem('line', ACline(num_nodes=nn), promotes=['*'])
+        self.add_subsystem('therm', ConductorTemperature(num_nodes=nn), promotes=['*'])
+
+class ThermalDCline(Group):
+    """
+    DCline whose resistance follows the temperature of its conductor, see ThermalACline.
+    """
+    def initialize(self):
+        self.options.declare('num_nodes', types=int)
+
+    def setup(self):
+
+        nn = self.options['num_nodes']
+
+        self.add_subsystem('res', ConductorResistance(num_nodes=nn), promotes=['*'])
+        self.add_subsystem('line', DCline(num_nodes=nn), promotes=['*'])
+        self.add_subsystem('therm', ConductorTemperature(num_nodes=nn), promotes=['*'])
+
+if __name__ == "__main__":
+    from openmdao.api import Problem, IndepVarComp
+
+    p = Problem()
+    p.model = Group()
+    des_vars = p.model.add_subsystem('des_vars', IndepVarComp(), promotes=['*'])
+
+    des_vars.add_output('length', 1000.0*np.ones(2), units='m')
+    des_vars.add_output('dia', 0.005*np.ones(2), units='m')
+    des_vars.add_output('P_loss', np.array([500.0, 2000.0]), units='W')
+
+    p.model.add_subsystem('therm', ConductorTemperature(num_nodes=2), promotes=['*'])
+    p.model.add_subsystem('res', ConductorResistance(num_nodes=2), promotes=['*'])
+
+    p.setup(check=False)
+    p.run_model()
+
+    print('T', p['T'])
+    print('R', p['R'])
+
+    p.check_partials(compact_print=True)
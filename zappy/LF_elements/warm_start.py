@@ -0,0 +1,46 @@
+import numpy as np
+
+def residual_norm(comp, inputs, state, refs):
+    """
+    Returns the residual norm of each node of a component at the given state,
+    with every residual scaled by its reference value.
+    """
+    resids = {}
+    comp.apply_nonlinear(inputs, state, resids)
+    return sum((resids[name]/ref)**2 for name, ref in refs.items())
+
+def apply_guess(comp, inputs, outputs, guess, refs):
+    """
+    Sets the guessed outputs of a component on a cold start (or always, if its
+    warm_start option is False). On a warm start the previous solution is kept at
+    every node where its residual norm is not worse than the one of the guess.
+
+    The power bookkeeping outputs of both states are made consistent with their
+    currents through solve_nonlinear before the residuals are compared, so only the
+    residuals that depend on the currents decide.
+    """
+    comp.solve_nonlinear(inputs, guess)
+
+    if comp._cold_start or not comp.options['warm_start']:
+        for name, val in guess.items():
+            outputs[name] = val
+        comp._cold_start = False
+        return
+
+    current = dict((name, outputs[name].copy()) for name in guess)
+    comp.solve_nonlinear(inputs, current)
+
+    with np.errstate(all='ignore'):
+        keep = residual_norm(comp, inputs, current, refs) <= residual_norm(comp, inputs, guess, refs)
+
+    for name in guess:
+        outputs[name] = np.where(keep, current[name], guess[name])
+
+def force_flat_start(system):
+    """
+    Makes the next guess_nonlinear of every bus, generator and converter in a system
+    start from the flat guess, as if the model had just been set up.
+    """
+    for sub in system.system_iter(include_self=True, recurse=True):
+        if hasattr(sub, '_cold_start'):
+            sub._cold_start = True
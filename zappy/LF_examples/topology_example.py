@@ -0,0 +1,97 @@
+from zappy.LF_elements.builder import LoadFlowNetwork
+
+import math, cmath
+import time
+
+Vacbase = 4160. # base voltage of AC bus
+Vdcbase = 6800. # base voltage of DC bus
+PowerBase = 10.0e6 # base power of system (VA)
+
+# The hybrid AC/DC network of 13bus_example.py, written as a topology description
+TOPOLOGY = {
+    'Vbase': Vacbase,
+    'Vdcbase': Vdcbase,
+    'Sbase': PowerBase,
+
+    'buses': {
+        '1': {'type': 'AC'}, '2': {'type': 'AC'}, '3': {'type': 'AC'},
+        '4': {'type': 'DC'}, '5': {'type': 'DC'}, '6': {'type': 'DC'},
+        '7': {'type': 'AC'}, '8': {'type': 'AC'}, '9': {'type': 'AC'},
+        '10': {'type': 'AC'}, '10dc': {'type': 'DC'},
+        '11': {'type': 'AC'}, '11dc': {'type': 'DC'},
+        '12': {'type': 'AC'}, '12dc': {'type': 'DC'},
+        '13': {'type': 'AC'}, '13dc': {'type': 'DC'},
+    },
+
+    'lines': [
+        {'from': '1', 'to': '2', 'R': 0.218734378, 'X': 0.360978021},
+        {'from': '1', 'to': '9', 'R': 0.224454412, 'X': 0.36093195},
+        {'from': '2', 'to': '3', 'R': 0.892493161, 'X': 1.542190824},
+        {'from': '3', 'to': '10', 'R': 0.056583399, 'X': 0.749529076},
+        {'from': '3', 'to': '11', 'R': 0.040822812, 'X': 0.750680512},
+        {'from': '4', 'to': '5', 'R': 0.25349905},
+        {'from': '4', 'to': '11dc', 'R': 0.509605338},
+        {'from': '5', 'to': '6', 'R': 0.209734086},
+        {'from': '6', 'to': '13dc', 'R': 0.493075443},
+        {'from': '7', 'to': '8', 'R': 0.438930098, 'X': 0.726902905},
+        {'from': '7', 'to': '12', 'R': 0.03336043, 'X': 0.741618427},
+        {'from': '7', 'to': '13', 'R': 0.021166743, 'X': 0.766806199},
+        {'from': '8', 'to': '9', 'R': 0.397894209, 'X': 0.758227135},
+        {'from': '10dc', 'to': '12dc', 'R': 0.892317972},
+    ],
+
+    'generators': [
+        {'bus': '1', 'mode': 'Slack', 'Vm': 1.05*Vacbase, 'thetaV': 0.0, 'P_guess': -5.0e6},
+        {'bus': '3', 'mode': 'P-V', 'Vm': 1.0*Vacbase, 'P': -2.5e6, 'Q_min': -0.75e6, 'Q_max': -0.1e6},
+        {'bus': '5', 'V': 1.0*Vdcbase, 'P_min': -2.0e6, 'P_max': -0.5e6, 'P_guess': -2.0e6},
+        {'bus': '8', 'mode': 'P-V', 'Vm': 1.0*Vacbase, 'P': -2.5e6, 'Q_min': -0.75e6, 'Q_max': -0.1e6},
+    ],
+
+    'loads': [
+        {'bus': '2', 'P': 2.0e6, 'Q': 0.4e6},
+        {'bus': '3', 'P': 1.5e6, 'Q': 0.2e6},
+        {'bus': '4', 'P': 1.0e6},
+        {'bus': '6', 'P': 1.0e6},
+        {'bus': '7', 'P': 2.5e6, 'Q': 0.5e6},
+        {'bus': '8', 'P': 1.0e6, 'Q': 0.1e6},
+        {'bus': '9', 'P': 2.5e6, 'Q': 0.5e6},
+    ],
+
+    'converters': [
+        {'ac_bus': '10', 'dc_bus': '10dc', 'mode': 'Lead', 'M': 0.99, 'Ksc': 0.611764706, 'eff': 0.98, 'PF': 0.95,
+         'P_ac_guess': 0.2e6, 'P_dc_guess': -0.2e6},
+        {'ac_bus': '11', 'dc_bus': '11dc', 'mode': 'Lead', 'M': 0.99, 'Ksc': 0.611764706, 'eff': 0.98, 'PF': 0.95,
+         'P_ac_guess': 0.2e6, 'P_dc_guess': -0.2e6},
+        {'ac_bus': '12', 'dc_bus': '12dc', 'mode': 'Lag', 'M': 0.97, 'Ksc': 0.611764706, 'eff': 0.98, 'PF': -0.95,
+         'P_ac_guess': -0.2e6, 'P_dc_guess': 0.2e6},
+        {'ac_bus': '13', 'dc_bus': '13dc', 'mode': 'Lag', 'M': 0.96, 'Ksc': 0.611764706, 'eff': 0.98, 'PF': -0.95,
+         'P_ac_guess': -0.2e6, 'P_dc_guess': 0.2e6},
+    ],
+}
+
+if __name__ == "__main__":
+    from openmdao.api import Problem
+
+    prob = Problem()
+
+    prob.model.add_subsystem('sys', LoadFlowNetwork(num_nodes=1, topology=TOPOLOGY), promotes=['*'])
+
+    prob.set_solver_print(level=-1)
+    prob.set_solver_print(level=2, depth=2)
+    prob.setup()
+
+    st = time.time()
+
+    prob.run_model()
+
+    def print_phasor(name, x, y):
+      r, phi = cmath.polar(complex(x,y))
+      print(name, r/Vacbase, '<', math.degrees(phi))
+
+    for bus, spec in TOPOLOGY['buses'].items():
+        if spec['type'] == 'AC':
+            print_phasor('V'+bus+':', prob['Vr_'+bus][0], prob['Vi_'+bus][0])
+        else:
+            print('V'+bus+':', prob['V_'+bus][0]/Vdcbase)
+
+    print("time", time.time() - st)
@@ -0,0 +1,111 @@
+import os
+import hashlib
+
+import numpy as np
+
+from zappy.utils.locking import locked
+
+class SolutionCache(object):
+    """
+    On-disk cache of solved load flow cases: the converged unknowns of a LoadFlowSystem
+    are stored in the directory path as <key>.npy, where the key hashes the structure of
+    the topology and the values of all its parameters (see key).
+
+    The least recently used solutions are removed once more than maxsize are stored. Use
+    is tracked by an access counter in the file clock, which is incremented under a lock,
+    and the count of the last use of every solution is stored next to it as <key>.use,
+    so several processes can share a cache directory, whatever the resolution of the
+    modification times of its file system.
+    """
+    def __init__(self, path, maxsize=1000):
+        self.path = path
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(path, exist_ok=True)
+        open(os.path.join(path, 'clock'), 'ab').close()
+
+    @staticmethod
+    def key(system):
+        """
+        Returns the hash of the topology structure and parameter values of a LoadFlowSystem.
+        """
+        h = hashlib.sha1(system.key.encode())
+        h.update(np.int64(system.num_nodes).tobytes())
+        for name in sorted(system.params):
+            h.update(name.encode())
+            h.update(np.ascontiguousarray(system.params[name], dtype=float).tobytes())
+        return h.hexdigest()
+
+    def _file(self, key, ext='.npy'):
+        return os.path.join(self.path, key+ext)
+
+    def _tick(self):
+        """
+        Returns the next count of the access counter of the directory.
+        """
+        with open(os.path.join(self.path, 'clock'), 'r+b') as f, locked(f):
+            data = f.read(8)
+            count = int(np.frombuffer(data, dtype=np.int64)[0]) + 1 if len(data) == 8 else 1
+            f.seek(0)
+            f.write(np.int64(count).tobytes())
+        return count
+
+    def _use(self, key):
+        with open(self._file(key, '.use'), 'wb') as f:
+            f.write(np.int64(self._tick()).tobytes())
+
+    def _last_use(self, key):
+        try:
+            with open(self._file(key, '.use'), 'rb') as f:
+                data = f.read(8)
+        except OSError:
+            return 0
+        return int(np.frombuffer(data, dtype=np.int64)[0]) if len(data) == 8 else 0
+
+    def get(self, system):
+        """
+        Returns the stored solution of a LoadFlowSystem, or None.
+        """
+        key = self.key(system)
+        try:
+            x = np.load(self._file(key))
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self._use(key)
+        self.hits += 1
+        return x
+
+    def put(self, system, x):
+        """
+        Stores the solution x of a LoadFlowSystem and evicts the least recently used
+        solutions above maxsize.
+        """
+        key = self.key(system)
+        file = self._file(key)
+        tmp = '{}.{}.tmp'.format(file, os.getpid())
+        with open(tmp, 'wb') as f:
+            np.save(f, x)
+        os.replace(tmp, file)
+        self._use(key)
+        self._evict()
+
+    def _evict(self):
+        keys = [name[:-4] for name in os.listdir(self.path) if name.endswith('.npy')]
+        entries = sorted((self._last_use(key), key) for key in keys)
+        for _, key in entries[:max(len(entries) - self.maxsize, 0)]:
+            for ext in ('.npy', '.use'):
+                try:
+                    os.remove(self._file(key, ext))
+                except OSError:
+                    pass  # removed by another process
+
+    def clear(self):
+        for name in os.listdir(self.path):
+            if name.endswith('.npy') or name.endswith('.use'):
+                os.remove(os.path.join(self.path, name))
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.path) if name.endswith('.npy'))
@@ -0,0 +1,66 @@
+from openmdao.api import NewtonSolver
+
+class ChordNewtonSolver(NewtonSolver):
+    """
+    Newton's method that keeps the factorization of its linear solver (normally a
+    DirectSolver) across iterations and across solves.
+
+    The Jacobian is only refactorized when an iteration did not reduce the residual
+    norm to refresh_ratio of its previous value, or after max_reuse steps with the same
+    factorization. Every other iteration of NewtonSolver skips the factorization (see
+    _linearize) and only runs the forward/backward substitution with the stored factors.
+    Since the Jacobian of a load flow changes slowly near the solution, this saves most
+    of the factorizations of a solve, and of the successive solves of an optimization or
+    a sweep (reuse_across_solves).
+    """
+    SOLVER = 'NL: Chord Newton'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self._factorized = False
+        self._reused = 0
+        self._last_norm = None
+        self.num_factorizations = 0
+
+    def _declare_options(self):
+        super()._declare_options()
+
+        self.options.declare('refresh_ratio', default=0.5, lower=0.0,
+                             desc='Refresh the Jacobian when an iteration reduces the residual norm by less '
+                                  'than this factor')
+        self.options.declare('max_reuse', default=10, types=int, lower=0,
+                             desc='Maximum number of iterations with the same factorization')
+        self.options.declare('reuse_across_solves', default=True, types=bool,
+                             desc='Keep the factorization of the previous solve for the first iteration of the next')
+
+    def _setup_solvers(self, system, depth):
+        super()._setup_solvers(system, depth)
+        self._factorized = False
+
+    def _iter_initialize(self):
+        if not self.options['reuse_across_solves']:
+            self._factorized = False
+        self._last_norm = None
+        return super()._iter_initialize()
+
+    def _linearize(self):
+        """
+        Factorizes the Jacobian that the iteration of NewtonSolver has just evaluated,
+        unless the previous factorization is reused, whose factors the linear solver then
+        keeps solving with.
+        """
+        norm = self._iter_get_norm()
+        stalled = self._last_norm is not None and norm > self.options['refresh_ratio']*self._last_norm
+        self._last_norm = norm
+
+        if self._factorized and not stalled and self._reused < self.options['max_reuse']:
+            if self.linesearch is not None:
+                self.linesearch._linearize()
+            self._reused += 1
+            return
+
+        super()._linearize()
+        self._factorized = True
+        self._reused = 0
+        self.num_factorizations += 1
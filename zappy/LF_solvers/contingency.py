@@ -0,0 +1,200 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from zappy.LF_solvers.system import LoadFlowSystem
+from zappy.LF_solvers.newton import newton_solve
+
+class Contingency(object):
+    """
+    Post-contingency state of one branch outage.
+
+    V_min and V_max are the extreme bus voltage magnitudes in per unit of the bus Vbase,
+    max_loading the largest |I|/I_max of the rated branches (None without ratings) and
+    severity the sum of the voltage violations in per unit plus the overloads above 1.
+    Outages that island part of the network or do not converge have an infinite severity.
+    """
+    def __init__(self, name, kind, index):
+        self.name = name
+        self.kind = kind
+        self.index = index
+
+        self.islanded = False
+        self.converged = False
+        self.iterations = 0
+        self.norm = np.inf
+        self.x = None
+        self.V = {}
+        self.V_min = self.V_max = np.nan
+        self.loading = {}
+        self.max_loading = None
+        self.severity = np.inf
+
+    def __repr__(self):
+        return '<Contingency {} severity={:.4g}>'.format(self.name, self.severity)
+
+def screen_contingencies(topology, branches=None, V_limits=(0.95, 1.05), ratings=None,
+                         maxiter=8, atol=1e-8, rtol=1e-10):
+    """
+    Runs an N-1 screening of the branches (line names, all AC and DC lines by default)
+    of a topology description and returns the outages ranked by decreasing severity.
+
+    The base case is solved and factorized once. Removing a line changes the Jacobian by
+    a rank 2 (AC) or rank 1 (DC) term, so every outage is solved with up to maxiter chord
+    Newton steps on the base factorization, corrected with the Sherman-Morrison-Woodbury
+    formula, starting from the base solution. All outages are iterated together, so the
+    cost of a step is one multi right hand side solve with the base factors. ratings maps
+    line names to their current limit in A.
+    """
+    ratings = ratings or {}
+    base_system = LoadFlowSystem(topology)
+    base = newton_solve(base_system, atol=atol, rtol=rtol)
+    if not base.converged:
+        raise RuntimeError('The base case did not converge.')
+
+    nx = base_system.num_unknowns
+    lu = base_system.factorize(base_system.jacobian(base.x))
+
+    # (element, U, capacitance) of every outage, with J_outage = J_base + U C U^T
+    lines = []
+    for kind in ['ACline', 'DCline']:
+        for k, (name, options, p) in enumerate(base_system.elements[kind]):
+            if branches is None or name in branches:
+                lines.append((kind, k, name))
+    if branches is not None:
+        missing = set(branches) - set(name for _, _, name in lines)
+        if missing:
+            raise ValueError('Unknown branches: {}.'.format(', '.join(sorted(missing))))
+
+    m = len(lines)
+    system = LoadFlowSystem(topology, num_nodes=m)
+    outages = []
+    U = np.zeros((m, nx, 2))
+    C = np.zeros((m, 2, 2))
+    rank = np.zeros(m, dtype=int)
+    for j, (kind, k, name) in enumerate(lines):
+        outages.append(Contingency(name, kind, k))
+        if kind == 'ACline':
+            fr, fi, tr, ti = [a[k] for a in base_system.acl]
+            Y = 1.0/(base_system.params[base_system.acl_par[0][k]][0] + base_system.params[base_system.acl_par[1][k]][0]*1j)
+            U[j, fr, 0], U[j, tr, 0], U[j, fi, 1], U[j, ti, 1] = 1.0, -1.0, 1.0, -1.0
+            C[j] = -np.array([[Y.real, -Y.imag], [Y.imag, Y.real]])
+            rank[j] = 2
+        else:
+            f, t = [a[k] for a in base_system.dcl]
+            U[j, f, 0], U[j, t, 0] = 1.0, -1.0
+            C[j, 0, 0] = -1.0/base_system.params[base_system.dcl_par[k]][0]
+            rank[j] = 1
+
+    # Woodbury: (J + U C U^T)^-1 = J^-1 - Z S^-1 U^T J^-1 with Z = J^-1 U and S = C^-1 + U^T Z
+    Z = lu.solve(U.transpose(1, 0, 2).reshape(nx, 2*m)).reshape(nx, m, 2).transpose(1, 0, 2)
+    S_inv = np.zeros((m, 2, 2))
+    active = []
+    for j, outage in enumerate(outages):
+        r = rank[j]
+        S = np.linalg.inv(C[j, :r, :r]) + U[j, :, :r].T @ Z[j, :, :r]
+        if _islanded(base_system, outage) or np.linalg.cond(S) > 1.0e10:
+            outage.islanded = True
+            continue
+        S_inv[j, :r, :r] = np.linalg.inv(S)
+        active.append(j)
+    active = np.array(active, dtype=int)
+
+    def residuals(x, nodes):
+        # residuals of the intact network minus the currents of the removed lines
+        r = system.residuals(x, nodes=nodes)
+        dV = np.einsum('jn,jnk->jk', x[nodes], U[nodes])
+        I = np.einsum('jkl,jl->jk', -C[nodes], dV)
+        return r - np.einsum('jnk,jk->jn', U[nodes], I)
+
+    x = np.repeat(base.x, m, axis=0)
+    norm = np.full(m, np.inf)
+    norm0 = np.full(m, np.inf)
+    iterations = np.zeros(m, dtype=int)
+    converged = np.zeros(m, dtype=bool)
+
+    with np.errstate(all='ignore'):
+        if active.size:
+            norm[active] = norm0[active] = np.linalg.norm(residuals(x, active)/system.res_ref, axis=1)
+
+        for it in range(maxiter+1):
+            done = (norm[active] < atol) | (norm[active] < rtol*norm0[active])
+            converged[active[done]] = True
+            active = active[~done & np.isfinite(norm[active])]
+            if active.size == 0 or it == maxiter:
+                break
+
+            y = lu.solve(-residuals(x, active).T).T
+            Uy = np.einsum('jnk,jn->jk', U[active], y)
+            x[active] += y - np.einsum('jnk,jkl,jl->jn', Z[active], S_inv[active], Uy)
+            iterations[active] += 1
+            norm[active] = np.linalg.norm(residuals(x, active)/system.res_ref, axis=1)
+
+    for j, outage in enumerate(outages):
+        if outage.islanded:
+            continue
+        outage.converged = converged[j]
+        outage.iterations = iterations[j]
+        outage.norm = norm[j]
+        outage.x = x[j]
+        _violations(system, outage, x[j], V_limits, ratings)
+
+    return sorted(outages, key=lambda outage: -outage.severity)
+
+def _islanded(system, outage):
+    """
+    Returns True if removing the line of an outage leaves buses that are not connected,
+    through lines or converters, to a slack or DC generator.
+    """
+    nx = system.num_unknowns
+    edges = []
+    for kind, idx in [('ACline', system.acl), ('DCline', system.dcl)]:
+        keep = np.arange(len(idx[0])) != (outage.index if kind == outage.kind else -1)
+        edges.append((idx[0][keep], idx[-2 if kind == 'ACline' else 1][keep]))
+    edges.append((system.conv[0], system.conv[2]))
+    f = np.concatenate([e[0] for e in edges])
+    t = np.concatenate([e[1] for e in edges])
+    _, label = connected_components(sp.coo_matrix((np.ones(f.size), (f, t)), shape=(nx, nx)), directed=False)
+
+    buses = np.array([system.index[name] for name in system.Vbase])
+    sources = np.concatenate([system.gen[0][system.gen_slack], system.dcgen[0]])
+    return not np.all(np.isin(label[buses], label[sources]))
+
+def _violations(system, outage, x, V_limits, ratings):
+
+    V = {}
+    for name, Vbase in system.Vbase.items():
+        if name.startswith('Vr_'):
+            bus = name[3:]
+            V[bus] = abs(x[system.index[name]] + x[system.index['Vi_'+bus]]*1j)/Vbase
+        else:
+            bus = name[2:]
+            V[bus] = abs(x[system.index[name]])/Vbase
+    outage.V = V
+    Vm = np.array(list(V.values()))
+    outage.V_min, outage.V_max = Vm.min(), Vm.max()
+
+    loading = {}
+    for kind, idx, par in [('ACline', system.acl, system.acl_par), ('DCline', system.dcl, system.dcl_par)]:
+        for k, (name, options, p) in enumerate(system.elements[kind]):
+            if name not in ratings or (kind == outage.kind and k == outage.index):
+                continue
+            if kind == 'ACline':
+                fr, fi, tr, ti = [a[k] for a in idx]
+                Z = system.params[par[0][k]][0] + system.params[par[1][k]][0]*1j
+                I = ((x[fr] + x[fi]*1j) - (x[tr] + x[ti]*1j))/Z
+            else:
+                f, t = [a[k] for a in idx]
+                I = (x[f] - x[t])/system.params[par[k]][0]
+            loading[name] = abs(I)/ratings[name]
+    outage.loading = loading
+    if loading:
+        outage.max_loading = max(loading.values())
+
+    if not outage.converged:
+        outage.severity = np.inf
+        return
+
+    V_min, V_max = V_limits
+    overload = sum(max(l - 1.0, 0.0) for l in loading.values())
+    outage.severity = float(np.sum(np.maximum(V_min - Vm, 0.0) + np.maximum(Vm - V_max, 0.0)) + overload)
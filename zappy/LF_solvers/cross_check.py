@@ -0,0 +1,41 @@
+import numpy as np
+
+from openmdao.api import Problem
+
+from zappy.LF_elements.builder import LoadFlowNetwork
+from zappy.LF_solvers.system import LoadFlowSystem
+from zappy.LF_solvers.newton import newton_solve
+
+def cross_check(topology, num_nodes=1, atol=1e-8, rtol=1e-10, maxiter=20):
+    """
+    Solves a topology with both the OpenMDAO model (LoadFlowNetwork) and the standalone
+    Newton solver and returns a dict with the largest absolute difference of every
+    unknown of the standalone system, relative to the base voltage for the bus voltages
+    and in A for the generator and converter currents.
+    """
+    prob = Problem(reports=None)
+    prob.model.add_subsystem('sys', LoadFlowNetwork(num_nodes=num_nodes, topology=topology), promotes=['*'])
+    prob.set_solver_print(level=-1)
+    prob.setup(check=False)
+    prob.final_setup()
+
+    newton = prob.model.sys.nonlinear_solver
+    newton.options['atol'] = atol
+    newton.options['rtol'] = rtol
+    newton.options['maxiter'] = maxiter
+    prob.run_model()
+
+    system = LoadFlowSystem(topology, num_nodes=num_nodes)
+    result = newton_solve(system, atol=atol, rtol=rtol, maxiter=maxiter)
+
+    diff = {}
+    for name in system.names:
+        scale = system.Vbase.get(name, 1.0)
+        diff[name] = np.max(abs(prob[name] - result[name]))/scale
+    return diff
+
+if __name__ == "__main__":
+    from zappy.LF_examples.topology_example import TOPOLOGY
+
+    for name, d in sorted(cross_check(TOPOLOGY).items()):
+        print(name, d)
@@ -0,0 +1,105 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+from zappy.LF_solvers.system import LoadFlowSystem
+
+class WarmStartDatabase(object):
+    """
+    Store of converged load flow states indexed by their load and set point values,
+    which gives new operating points the solution of their nearest stored neighbours as
+    the start of Newton's method.
+
+    The features are the parameters of a LoadFlowSystem given by params, by default the
+    load powers and the generator set points, scaled by their values in the topology
+    (their magnitude, or 1 for a zero value). The guess for a new operating point is the
+    state of the nearest stored point (k=1) or the inverse distance weighted mean of the
+    states of the k nearest ones. New points are searched linearly until there are enough
+    of them to rebuild the KD-tree, so the database can learn after every solve.
+    """
+    def __init__(self, topology, params=None, k=1, rebuild_ratio=0.1):
+        system = LoadFlowSystem(topology)
+        if params is None:
+            params = [n for names in system.acload_par + (system.dcload_par,) + system.gen_par
+                      for n in names]
+            params += system.dcgen_par
+        unknown = [name for name in params if name not in system.params]
+        if unknown:
+            raise ValueError('Unknown parameters: {}.'.format(', '.join(unknown)))
+
+        self.key = system.key
+        self.params = list(params)
+        nominal = np.abs(np.array([system.params[name][0] for name in self.params], dtype=float))
+        self.scale = np.where(nominal > 0.0, nominal, 1.0)
+        self.k = k
+        self.rebuild_ratio = rebuild_ratio
+
+        self._tree = None
+        self._states = np.zeros((0, system.num_unknowns))
+        self._pending = []
+
+    def features(self, system):
+        """
+        Returns the scaled features of every node of a LoadFlowSystem.
+        """
+        if system.key != self.key:
+            raise ValueError('The system does not have the topology of the database.')
+        return system._stack(self.params)/self.scale
+
+    def __len__(self):
+        return self._states.shape[0] + sum(f.shape[0] for f, x in self._pending)
+
+    def add(self, system, x, converged=True):
+        """
+        Stores the states x of the nodes of a LoadFlowSystem that converged.
+        """
+        keep = np.broadcast_to(converged, (system.num_nodes,))
+        if np.any(keep):
+            self._pending.append((self.features(system)[keep], np.array(x)[keep]))
+
+        n_tree = self._states.shape[0]
+        if len(self) - n_tree > max(self.rebuild_ratio*n_tree, 16):
+            self._rebuild()
+
+    def _rebuild(self):
+        F = [self._tree.data] if self._tree is not None else []
+        F += [f for f, x in self._pending]
+        self._states = np.concatenate([self._states] + [x for f, x in self._pending])
+        self._tree = cKDTree(np.concatenate(F))
+        self._pending = []
+
+    def _query(self, F, k):
+        n = F.shape[0]
+        dist = np.zeros((n, 0))
+        states = np.zeros((n, 0, self._states.shape[1]))
+        if self._tree is not None:
+            kt = min(k, self._tree.n)
+            d, i = self._tree.query(F, k=kt)
+            d, i = d.reshape(n, kt), i.reshape(n, kt)
+            dist, states = d, self._states[i]
+        if self._pending:
+            Fp = np.concatenate([f for f, x in self._pending])
+            Xp = np.concatenate([x for f, x in self._pending])
+            d = np.linalg.norm(F[:, np.newaxis] - Fp[np.newaxis], axis=2)
+            dist = np.concatenate([dist, d], axis=1)
+            states = np.concatenate([states, np.broadcast_to(Xp, (n,) + Xp.shape)], axis=1)
+
+        order = np.argsort(dist, axis=1)[:, :k]
+        rows = np.arange(n)[:, np.newaxis]
+        return dist[rows, order], states[rows, order]
+
+    def guess(self, system):
+        """
+        Returns a start for Newton's method for every node of a LoadFlowSystem from the
+        nearest stored states, or the flat start while the database is empty.
+        """
+        if len(self) == 0:
+            return system.initial_guess()
+
+        dist, states = self._query(self.features(system), self.k)
+        with np.errstate(divide='ignore'):
+            w = 1.0/dist
+        exact = ~np.isfinite(w)
+        # an exact match takes all the weight
+        w = np.where(np.any(exact, axis=1, keepdims=True), exact, w)
+        w /= w.sum(axis=1, keepdims=True)
+        return np.einsum('nk,nkx->nx', w, states)
@@ -0,0 +1,159 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from zappy.LF_solvers.newton import LoadFlowResult, batched_newton_solve
+
+class DecoupledModel(object):
+    """
+    Constant matrices of the fast-decoupled load flow of an AC LoadFlowSystem (XB
+    variant): B' from the line reactances for the angles of all buses but the slack buses
+    and B'' from the line susceptances for the magnitudes of the buses without a generator,
+    each factorized once for all the nodes as block diagonal matrices. The columns of B'
+    are scaled by the Vbase of their bus, which takes the place of the voltage magnitudes
+    in dP/|V| = B' |V| dtheta.
+    """
+    def __init__(self, system):
+        nn = system.num_nodes
+        bus = dict((ir, k) for k, (ir, ii) in enumerate(system.ac_buses))
+        nb = len(bus)
+        self.Vr = np.array([ir for ir, ii in system.ac_buses], dtype=int)
+        self.Vi = np.array([ii for ir, ii in system.ac_buses], dtype=int)
+        self.Vbase = np.array([system.Vbase[system.names[ir]] for ir in self.Vr])
+
+        fr, fi, tr, ti = system.acl
+        self.f = np.array([bus[i] for i in fr], dtype=int)
+        self.t = np.array([bus[i] for i in tr], dtype=int)
+        self.load_bus = np.array([bus[i] for i in system.acload[0]], dtype=int)
+        self.gen_bus = np.array([bus[i] for i in system.gen[0]], dtype=int)
+
+        slack = np.zeros(nb, dtype=bool)
+        slack[self.gen_bus[system.gen_slack]] = True
+        controlled = np.zeros(nb, dtype=bool)
+        controlled[self.gen_bus] = True
+        self.pv = np.flatnonzero(~slack)   # buses with an angle unknown
+        self.pq = np.flatnonzero(~controlled)  # buses with a magnitude unknown
+
+        R, X = system._stack(system.acl_par[0]), system._stack(system.acl_par[1])
+        self.B1 = self._factorize(1.0/X, self.pv, nn, nb, self.Vbase)
+        self.B2 = self._factorize(-(1.0/(R + X*1j)).imag, self.pq, nn, nb, np.ones(nb))
+
+    def _factorize(self, b, buses, nn, nb, scale):
+        """
+        Factorizes the block diagonal matrix of the susceptances b of the lines, reduced
+        to the given buses, with its columns multiplied by scale.
+        """
+        f, t = self.f, self.t
+        rows = np.concatenate([f, t, f, t])
+        cols = np.concatenate([f, t, t, f])
+        keep = np.full(nb, -1)
+        keep[buses] = np.arange(buses.size)
+        mask = (keep[rows] >= 0) & (keep[cols] >= 0)
+        rows, cols = keep[rows[mask]], keep[cols[mask]]
+
+        n = buses.size
+        k = n*np.arange(nn)[:, np.newaxis]
+        data = np.concatenate([b, b, -b, -b], axis=1)[:, mask]*scale[buses][cols]
+        B = sp.csc_matrix((data.ravel(), ((rows + k).ravel(), (cols + k).ravel())), shape=(nn*n, nn*n))
+        return splu(B) if n else None
+
+def decoupled_model(system):
+    """
+    Returns the DecoupledModel of a LoadFlowSystem with only AC buses, lines, loads and
+    generators (at most one per bus) and no zero line reactance, or None for any other
+    system.
+    """
+    if len(system.dc_buses) or len(system.conv[0]) or len(system.dcgen[0]) or not np.any(system.gen_slack):
+        return None
+    if len(set(system.gen[0])) != len(system.gen[0]):
+        return None
+    if any(np.any(system.params[name] == 0.0) for name in system.acl_par[1]):
+        return None
+    model = DecoupledModel(system)
+    return model if model.pv.size else None
+
+def _state(system, model, V):
+    """
+    Returns the unknowns for the bus voltages V: the generator currents are those that
+    balance the currents of their bus.
+    """
+    nn, nb = V.shape
+    R, X = system._stack(system.acl_par[0]), system._stack(system.acl_par[1])
+    I_line = (V[:, model.f] - V[:, model.t])/(R + X*1j)
+    I = np.zeros_like(V)
+    np.add.at(I.T, model.f, I_line.T)
+    np.add.at(I.T, model.t, -I_line.T)
+
+    S_load = system._stack(system.acload_par[0]) + system._stack(system.acload_par[1])*1j
+    I_load = np.zeros_like(V)
+    np.add.at(I_load.T, model.load_bus, (S_load/V[:, model.load_bus]).conjugate().T)
+
+    x = np.zeros((nn, system.num_unknowns))
+    x[:, model.Vr], x[:, model.Vi] = V.real, V.imag
+    I_gen = -(I + I_load)[:, model.gen_bus]
+    x[:, system.gen[2]], x[:, system.gen[3]] = I_gen.real, I_gen.imag
+    return x, V*I.conjugate()
+
+def decoupled_solve(system, x0=None, atol=1e-8, rtol=1e-10, maxiter=50):
+    """
+    Solves an AC LoadFlowSystem (see decoupled_model) with the fast-decoupled method:
+    every iteration corrects the bus angles for the active power mismatch with B' and
+    then the magnitudes for the reactive power mismatch with B'', using the factors of
+    the constant matrices. The iterations are cheap but converge linearly, best for high
+    X/R ratios. The residual norm and the converged solution are those of the full system,
+    so the results match newton_solve to the tolerance. Other systems are solved with
+    batched_newton_solve instead.
+    """
+    model = decoupled_model(system)
+    if model is None:
+        return batched_newton_solve(system, x0=x0, atol=atol, rtol=rtol, maxiter=maxiter)
+
+    nn = system.num_nodes
+    x = system.initial_guess() if x0 is None else np.array(x0, dtype=float)
+    V = x[:, model.Vr] + x[:, model.Vi]*1j
+
+    # set points: the slack voltages and the magnitudes of the P-V buses
+    Vm, val = system._stack(system.gen_par[0]), system._stack(system.gen_par[1])
+    slack = system.gen_slack
+    Vg = np.where(slack, Vm*np.exp(np.radians(val)*1j), Vm*np.exp(np.angle(V[:, model.gen_bus])*1j))
+    V[:, model.gen_bus] = Vg
+
+    # power flowing from every bus into the lines
+    S_spec = np.zeros((nn, V.shape[1]), dtype=complex)
+    S_load = system._stack(system.acload_par[0]) + system._stack(system.acload_par[1])*1j
+    np.add.at(S_spec.T, model.load_bus, -S_load.T)
+    pv_gen = ~slack
+    np.add.at(S_spec.T, model.gen_bus[pv_gen], -val[:, pv_gen].T)
+
+    pv, pq = model.pv, model.pq
+    iterations = np.zeros(nn, dtype=int)
+    with np.errstate(all='ignore'):
+        x, S = _state(system, model, V)
+        norm = norm0 = np.linalg.norm(system.residuals(x)/system.res_ref, axis=1)
+        converged = (norm < atol) | (norm < rtol*norm0)
+        active = ~converged & np.isfinite(norm)
+
+        for it in range(maxiter):
+            if not np.any(active):
+                break
+            keep = active[:, np.newaxis]
+
+            Vmag, theta = abs(V), np.angle(V)
+            dP = (S_spec - S).real[:, pv]/Vmag[:, pv]
+            theta[:, pv] += np.where(keep, model.B1.solve(dP.ravel()).reshape(nn, -1), 0.0)
+            V = Vmag*np.exp(theta*1j)
+
+            if pq.size:
+                x, S = _state(system, model, V)
+                dQ = (S_spec - S).imag[:, pq]/Vmag[:, pq]
+                Vmag[:, pq] += np.where(keep, model.B2.solve(dQ.ravel()).reshape(nn, -1), 0.0)
+                V = Vmag*np.exp(theta*1j)
+
+            x, S = _state(system, model, V)
+            norm = np.where(active, np.linalg.norm(system.residuals(x)/system.res_ref, axis=1), norm)
+            iterations += active
+
+            converged = (norm < atol) | (norm < rtol*norm0)
+            active = ~converged & np.isfinite(norm)
+
+        return LoadFlowResult(system, x, converged, iterations, norm)
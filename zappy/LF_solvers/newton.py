@@ -0,0 +1,148 @@
+import numpy as np
+
+from zappy.LF_solvers.system import LoadFlowSystem
+
+class LoadFlowResult(object):
+    """
+    Solution of a LoadFlowSystem. Values are looked up by their promoted name in
+    the equivalent OpenMDAO model, e.g. result['Vr_1'] or result['Gen1.P_out']. A
+    solution with generator powers outside their bounds is not converged (see
+    LoadFlowSystem.within_limits).
+    """
+    def __init__(self, system, x, converged, iterations, norm):
+        self.system = system
+        self.x = x
+        self.iterations = iterations
+        self.norm = norm
+        self.values = system.values(x)
+
+        within = system.within_limits(self.values)
+        self.converged = converged & within if np.ndim(converged) else converged and bool(np.all(within))
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+def newton_solve(system, x0=None, atol=1e-8, rtol=1e-10, maxiter=20):
+    """
+    Solves a LoadFlowSystem with Newton's method using a sparse direct solve of the
+    full Jacobian in every iteration.
+
+    Convergence is checked on the norm of the residuals scaled by the same res_ref
+    values the OpenMDAO elements use, so atol and rtol have the same meaning as the
+    options of the NewtonSolver in the examples.
+    """
+    x = system.initial_guess() if x0 is None else np.array(x0, dtype=float)
+    shape = x.shape
+
+    r = system.residuals(x)
+    norm0 = norm = np.linalg.norm(r/system.res_ref)
+    it = 0
+    converged = norm < atol
+
+    while not converged and it < maxiter:
+        J = system.jacobian(x)
+        dx = system.factorize(J).solve(-r.ravel())
+        x = x + dx.reshape(shape)
+        it += 1
+
+        r = system.residuals(x)
+        norm = np.linalg.norm(r/system.res_ref)
+        converged = norm < atol or norm < rtol*norm0
+
+    return LoadFlowResult(system, x, converged, it, norm)
+
+def batched_newton_solve(system, x0=None, atol=1e-8, rtol=1e-10, maxiter=20):
+    """
+    Solves every node of a LoadFlowSystem as an independent load flow.
+
+    Convergence is tracked for each node: a node stops iterating as soon as its own
+    scaled residual norm meets atol or rtol, and only the Jacobian blocks of the nodes
+    that are still active are assembled and factorized. Nodes whose residuals become
+    non-finite are frozen as failed. The result holds per node arrays of the
+    convergence flag, the number of iterations and the final residual norm.
+    """
+    x = system.initial_guess() if x0 is None else np.array(x0, dtype=float)
+    nn, nx = x.shape
+
+    with np.errstate(all='ignore'):
+        norm = np.linalg.norm(system.residuals(x)/system.res_ref, axis=1)
+    norm0 = norm.copy()
+    iterations = np.zeros(nn, dtype=int)
+    converged = norm < atol
+    active = np.flatnonzero(~converged & np.isfinite(norm))
+
+    for it in range(maxiter):
+        if active.size == 0:
+            break
+
+        with np.errstate(all='ignore'):
+            r = system.residuals(x, nodes=active)
+            J = system.jacobian(x, nodes=active)
+            dx = system.factorize(J).solve(-r.ravel()).reshape(active.size, nx)
+
+            if not np.all(np.isfinite(dx)):
+                # a singular block spoils the solve of the whole stack, so solve the blocks one by one
+                for k in range(active.size):
+                    block = slice(k*nx, (k+1)*nx)
+                    dx[k] = system.factorize(J[block, block]).solve(-r[k])
+
+            x[active] += dx
+            iterations[active] += 1
+
+            norm[active] = np.linalg.norm(system.residuals(x, nodes=active)/system.res_ref, axis=1)
+
+        done = (norm[active] < atol) | (norm[active] < rtol*norm0[active])
+        converged[active[done]] = True
+
+        active = active[~done & np.isfinite(norm[active])]
+
+    with np.errstate(all='ignore'):
+        return LoadFlowResult(system, x, converged, iterations, norm)
+
+def solve_load_flow(topology, num_nodes=1, batched=False, init='flat', cache=None, database=None, method='newton',
+                    **kwargs):
+    """
+    Builds a LoadFlowSystem for a topology description and solves it, either as one
+    stacked system or node by node (batched=True). With init='linear' Newton's method
+    starts from LoadFlowSystem.linear_guess instead of the flat start, and with
+    init='sweep' from a few backward/forward sweeps (see sweep_guess). method='sweep' or
+    'decoupled' solves with sweep_solve or decoupled_solve instead of Newton's method.
+
+    With a SolutionCache, a case that was solved before starts from its stored solution,
+    so it only costs the evaluation of the residuals that confirms it has converged (or
+    the iterations to a tighter tolerance). Converged solutions are stored in the cache.
+    Otherwise, with a WarmStartDatabase the solve starts from the stored solutions of the
+    nearest operating points, and the converged nodes are added to the database.
+    """
+    if init not in ('flat', 'linear', 'sweep'):
+        raise ValueError("init must be 'flat', 'linear' or 'sweep', but '{}' was given.".format(init))
+    if method not in ('newton', 'sweep', 'decoupled'):
+        raise ValueError("method must be 'newton', 'sweep' or 'decoupled', but '{}' was given.".format(method))
+
+    system = LoadFlowSystem(topology, num_nodes=num_nodes)
+    stored = None
+    if cache is not None and kwargs.get('x0') is None:
+        kwargs['x0'] = stored = cache.get(system)
+    if database is not None and len(database) and kwargs.get('x0') is None:
+        kwargs['x0'] = database.guess(system)
+    if init == 'linear' and kwargs.get('x0') is None:
+        kwargs['x0'] = system.linear_guess()
+    if init == 'sweep' and kwargs.get('x0') is None:
+        from zappy.LF_solvers.sweep import sweep_guess  # sweep builds on this module
+        kwargs['x0'] = sweep_guess(system)
+    if method == 'sweep':
+        from zappy.LF_solvers.sweep import sweep_solve
+        result = sweep_solve(system, **kwargs)
+    elif method == 'decoupled':
+        from zappy.LF_solvers.decoupled import decoupled_solve
+        result = decoupled_solve(system, **kwargs)
+    elif batched:
+        result = batched_newton_solve(system, **kwargs)
+    else:
+        result = newton_solve(system, **kwargs)
+
+    if cache is not None and np.all(result.converged) and (stored is None or np.any(result.iterations)):
+        cache.put(system, result.x)
+    if database is not None and stored is None:
+        database.add(system, result.x, result.converged)
+    return result
@@ -0,0 +1,131 @@
+import copy
+from collections.abc import Mapping
+
+import numpy as np
+
+from zappy.LF_solvers.system import LoadFlowSystem
+from zappy.LF_solvers.newton import batched_newton_solve
+
+def _chunks(profile, num_nodes):
+    """
+    Yields dicts with the values of num_nodes time points of a profile (fewer only for
+    the last one), which is either a mapping of parameter names to 1-D arrays of the same
+    length (e.g. memmaps) or an iterable of such mappings. The pieces of an iterable are
+    buffered up to num_nodes points, so the chunks do not depend on how it is split.
+    """
+    parts = [profile] if isinstance(profile, Mapping) else profile
+    names = None
+    buffer, size = [], 0
+    for part in parts:
+        lengths = set(np.shape(val)[0] for val in part.values())
+        if len(lengths) != 1:
+            raise ValueError('All the arrays of a profile must have the same length.')
+        if names is None:
+            names = list(part)
+        elif set(part) != set(names):
+            raise ValueError('All the pieces of a profile must have the same parameters.')
+
+        n = lengths.pop()
+        start = 0
+        while start < n:
+            take = min(num_nodes - size, n - start)
+            buffer.append(dict((name, np.asarray(part[name][start:start+take], dtype=float)) for name in names))
+            size += take
+            start += take
+            if size == num_nodes:
+                yield dict((name, np.concatenate([b[name] for b in buffer])) for name in names)
+                buffer, size = [], 0
+
+    if size:
+        yield dict((name, np.concatenate([b[name] for b in buffer])) for name in names)
+
+def _pad(val, num_nodes):
+    """
+    Returns val (of the time points of a chunk) padded to num_nodes with its last point.
+    """
+    return np.concatenate([val, np.repeat(val[-1:], num_nodes - len(val), axis=0)])
+
+def _trim(result, n):
+    """
+    Returns a copy of a LoadFlowResult with only its first n time points.
+    """
+    trimmed = copy.copy(result)
+    trimmed.x = result.x[:n]
+    trimmed.converged = result.converged[:n]
+    trimmed.iterations = result.iterations[:n]
+    trimmed.norm = result.norm[:n]
+    trimmed.values = dict((name, val[:n]) for name, val in result.values.items())
+    return trimmed
+
+def stream_load_flow(topology, profile, num_nodes=1000, init='flat', **kwargs):
+    """
+    Solves a long time series of a topology description in chunks of num_nodes time
+    points and yields (start, result) for every chunk, where start is the index of its
+    first time point and result its LoadFlowResult.
+
+    profile maps parameter names (e.g. 'Load2:P') to arrays over time, or is an iterator
+    of such mappings, so the full profile never has to be in memory. Only one chunk is
+    solved and stored at a time, all with the same LoadFlowSystem: a shorter last chunk
+    is padded with its last time point and its result trimmed. The first chunk starts
+    from the flat or linear (init) guess and every following chunk from the last
+    converged state of the previous one, which is close to its own solution for a smooth
+    profile. Time points that do not converge from there are solved again from the init
+    guess. kwargs are passed to batched_newton_solve.
+    """
+    if init not in ('flat', 'linear'):
+        raise ValueError("init must be 'flat' or 'linear', but '{}' was given.".format(init))
+
+    system = None
+    state = None
+    start = 0
+    for chunk in _chunks(profile, num_nodes):
+        n = len(next(iter(chunk.values())))
+        if system is None:
+            # only a profile shorter than num_nodes makes a smaller system
+            system = LoadFlowSystem(topology, num_nodes=n)
+        nn = system.num_nodes
+        for name, val in chunk.items():
+            if name not in system.params:
+                raise ValueError("'{}' is not a parameter of the topology.".format(name))
+            system.params[name] = _pad(val, nn)
+
+        def cold_start():
+            return system.linear_guess() if init == 'linear' else system.initial_guess()
+
+        x0 = cold_start() if state is None else np.repeat(state[np.newaxis], nn, axis=0)
+        result = batched_newton_solve(system, x0=x0, **kwargs)
+
+        failed = ~result.converged
+        if state is not None and np.any(failed):
+            x0 = result.x
+            x0[failed] = cold_start()[failed]
+            result = batched_newton_solve(system, x0=x0, **kwargs)
+
+        if n < nn:
+            result = _trim(result, n)
+        converged = np.flatnonzero(result.converged)
+        if converged.size:
+            state = result.x[converged[-1]].copy()
+
+        yield start, result
+        start += n
+
+def write_load_flow(topology, profile, out, num_nodes=1000, init='flat', **kwargs):
+    """
+    Solves a time series like stream_load_flow and writes the values of every chunk into
+    out, a mapping of output names (e.g. 'Vr_1', 'Gen1.P_out' or 'converged') to arrays
+    over time such as memmaps from numpy.lib.format.open_memmap. Returns the indices of
+    the time points that did not converge, whose outputs are NaN.
+    """
+    failed = []
+    for start, result in stream_load_flow(topology, profile, num_nodes=num_nodes, init=init, **kwargs):
+        stop = start + result.x.shape[0]
+        ok = result.converged
+        failed.append(start + np.flatnonzero(~ok))
+        for name, arr in out.items():
+            if name == 'converged':
+                arr[start:stop] = ok
+            else:
+                arr[start:stop] = np.where(ok, result[name], np.nan)
+
+    return np.concatenate(failed) if failed else np.zeros(0, dtype=int)
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+class JacobianStructure(object):
+    """
+    The symbolic part of the Jacobian of a LoadFlowSystem, which only depends on the
+    structure of its topology: the (rows, cols) of the entries of one block in the order
+    they are evaluated, the CSC index arrays of one block, the map from the evaluated
+    entries to the CSC entries (duplicates are summed) and a fill-reducing column ordering,
+    which is computed at the first factorization.
+    """
+    def __init__(self, rows, cols, size):
+        self.rows = rows
+        self.cols = cols
+        self.size = size
+
+        # sort the entries by column and row and merge the duplicates
+        order = np.lexsort((rows, cols))
+        keys = cols[order]*size + rows[order]
+        unique, first = np.unique(keys, return_index=True)
+        position = np.empty(rows.size, dtype=int)
+        position[order] = np.searchsorted(unique, keys)
+
+        self.nnz = unique.size
+        self.indices = unique % size
+        self.indptr = np.searchsorted(unique // size, np.arange(size+1))
+        self.sum = sp.csr_matrix((np.ones(rows.size), (np.arange(rows.size), position)),
+                                 shape=(rows.size, self.nnz))
+        self.perm_c = None
+
+    def matrix(self, data):
+        """
+        Returns the block diagonal CSC matrix with one block per row of data, the
+        values of the evaluated entries of each block.
+        """
+        n = data.shape[0]
+        nx, nnz = self.size, self.nnz
+        k = np.arange(n)[:, np.newaxis]
+
+        indices = (self.indices + nx*k).ravel()
+        indptr = np.append((self.indptr[:-1] + nnz*k).ravel(), n*nnz)
+        return sp.csc_matrix((np.asarray(self.sum.T @ data.T).T.ravel(), indices, indptr), shape=(n*nx, n*nx))
+
+    def factorize(self, J):
+        """
+        Returns the LU factorization of a block diagonal Jacobian with this structure,
+        with the columns of every block in the cached fill-reducing order.
+        """
+        nx = self.size
+        n = J.shape[0] // nx
+
+        if self.perm_c is None:
+            try:
+                self.perm_c = splu(J[:nx, :nx], permc_spec='COLAMD').perm_c
+            except RuntimeError:
+                pass  # singular first block, the ordering is computed at the next factorization
+        if self.perm_c is None:
+            return Factorization(J, None)
+
+        # splu factorizes J*Pc, whose column perm_c[i] is column i of J
+        perm = (np.argsort(self.perm_c) + nx*np.arange(n)[:, np.newaxis]).ravel()
+        return Factorization(J[:, perm], perm)
+
+class Factorization(object):
+    """
+    The LU factors of a Jacobian whose columns were permuted by perm. A singular
+    matrix gives non-finite solutions, like spsolve does.
+    """
+    def __init__(self, J, perm):
+        self.perm = perm
+        self.shape = J.shape
+        try:
+            self.lu = splu(J, permc_spec='NATURAL' if perm is not None else 'COLAMD')
+        except RuntimeError:
+            self.lu = None
+
+    def solve(self, b):
+        if self.lu is None:
+            return np.full(np.shape(b), np.nan)
+        y = self.lu.solve(b)
+        if self.perm is None:
+            return y
+        x = np.empty_like(y)
+        x[self.perm] = y
+        return x
+
+class StructureCache(object):
+    """
+    Least recently used cache of JacobianStructure objects, keyed by the structure of
+    a topology (see topology_key), that holds at most maxsize entries.
+    """
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """
+        Returns the structure stored for key, or the one returned by build() after storing it.
+        """
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        self.misses += 1
+        structure = self._cache[key] = build()
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return structure
+
+    def clear(self):
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+STRUCTURES = StructureCache()
@@ -0,0 +1,168 @@
+import numpy as np
+
+from zappy.LF_solvers.newton import LoadFlowResult, batched_newton_solve
+from zappy.LF_solvers.structure import StructureCache
+
+FEEDERS = StructureCache()
+
+class RadialFeeder(object):
+    """
+    Tree of a radial AC LoadFlowSystem, rooted at its slack generator.
+
+    parent and parent_line are the bus upstream of every bus and the line between them (-1
+    for the root), and levels the buses at every depth below the root. The current of the
+    line into a bus is the sum of the load currents of the buses downstream of it, summed
+    level by level from the deepest, and the voltages follow level by level from the root.
+    """
+    def __init__(self, system, root, parent_line, order):
+        self.root = root
+        self.order = order
+        n_bus = len(system.ac_buses)
+
+        self.parent = -np.ones(n_bus, dtype=int)
+        self.parent_line = -np.ones(n_bus, dtype=int)
+        depth = np.zeros(n_bus, dtype=int)
+        for b in order[1:]:
+            self.parent[b], self.parent_line[b] = parent_line[b]
+            depth[b] = depth[self.parent[b]] + 1
+        by_depth = np.array(order, dtype=int)[np.argsort(depth[order], kind='stable')]
+        self.levels = np.split(by_depth, np.cumsum(np.bincount(depth)))[1:-1]
+
+        bus = dict((ir, k) for k, (ir, ii) in enumerate(system.ac_buses))
+        self.Vr = np.array([ir for ir, ii in system.ac_buses], dtype=int)
+        self.Vi = np.array([ii for ir, ii in system.ac_buses], dtype=int)
+        self.load_bus = np.array([bus[ir] for ir in system.acload[0]], dtype=int)
+
+def radial_feeder(system):
+    """
+    Returns the RadialFeeder of a LoadFlowSystem with AC buses, lines and loads and a
+    single slack generator whose lines form a tree, or None for any other system. The
+    result is cached for the structure of the topology.
+    """
+    return FEEDERS.get(system.key, lambda: _radial_feeder(system))
+
+def _radial_feeder(system):
+
+    if (len(system.dc_buses) or len(system.conv[0]) or len(system.dcgen[0])
+            or len(system.gen[0]) != 1 or not system.gen_slack[0]):
+        return None
+
+    bus = dict((ir, k) for k, (ir, ii) in enumerate(system.ac_buses))
+    n_bus = len(bus)
+    fr, fi, tr, ti = system.acl
+    if len(fr) != n_bus - 1:
+        return None
+
+    neighbours = [[] for _ in range(n_bus)]
+    for e, (f, t) in enumerate(zip(fr, tr)):
+        neighbours[bus[f]].append((bus[t], e))
+        neighbours[bus[t]].append((bus[f], e))
+
+    root = bus[system.gen[0][0]]
+    parent_line = {root: None}
+    order = [root]
+    for b in order:
+        for c, e in neighbours[b]:
+            if c not in parent_line:
+                parent_line[c] = (b, e)
+                order.append(c)
+    if len(order) != n_bus:
+        return None  # a disconnected part implies a loop elsewhere
+
+    return RadialFeeder(system, root, parent_line, order)
+
+def _load_currents(system, feeder, V):
+
+    S = system._stack(system.acload_par[0]) + system._stack(system.acload_par[1])*1j
+    I_load = np.zeros_like(V)
+    np.add.at(I_load.T, feeder.load_bus, ((S/V[:, feeder.load_bus]).conjugate()).T)
+    return I_load
+
+def _forward(system, feeder, V, I_load):
+    """
+    Returns the bus voltages for the line currents that supply I_load (the backward
+    sweep) and the voltage drops of the lines (the forward sweep).
+    """
+    Z = system._stack(system.acl_par[0]) + system._stack(system.acl_par[1])*1j
+
+    # the current into every bus, which is the current of its parent line
+    I_bus = I_load.copy()
+    for level in reversed(feeder.levels):
+        np.add.at(I_bus.T, feeder.parent[level], I_bus[:, level].T)
+
+    V_new = np.empty_like(V)
+    V_new[:, feeder.root] = V[:, feeder.root]
+    for level in feeder.levels:
+        V_new[:, level] = V_new[:, feeder.parent[level]] - Z[:, feeder.parent_line[level]]*I_bus[:, level]
+    return V_new
+
+def _state(system, feeder, V, I_load):
+
+    x = np.zeros((system.num_nodes, system.num_unknowns))
+    x[:, feeder.Vr], x[:, feeder.Vi] = V.real, V.imag
+    # the lines have no shunt elements, so the slack generator supplies all the load currents
+    I_gen = -I_load.sum(axis=1)
+    x[:, system.gen[2][0]], x[:, system.gen[3][0]] = I_gen.real, I_gen.imag
+    return x
+
+def sweep_solve(system, x0=None, atol=1e-8, rtol=1e-10, maxiter=50):
+    """
+    Solves a radial LoadFlowSystem (see radial_feeder) with backward/forward sweeps:
+    the load currents at the present voltages are summed up the tree into line currents,
+    then the voltages are updated down the tree from the slack bus. A sweep is one pass
+    over the levels of the tree each way and needs no factorization. Convergence is
+    checked for every node on the scaled residual norm, like batched_newton_solve, which
+    solves the systems that are not radial instead.
+    """
+    feeder = radial_feeder(system)
+    if feeder is None:
+        return batched_newton_solve(system, x0=x0, atol=atol, rtol=rtol, maxiter=maxiter)
+
+    nn = system.num_nodes
+    Vm = system._stack(system.gen_par[0])[:, 0]
+    theta = system._stack(system.gen_par[1])[:, 0]
+    V_slack = Vm*np.exp(np.radians(theta)*1j)
+    if x0 is None:
+        V = np.repeat(V_slack[:, np.newaxis], len(feeder.Vr), axis=1)
+    else:
+        V = x0[:, feeder.Vr] + x0[:, feeder.Vi]*1j
+        # the sweeps keep the voltage of the root, which the slack generator sets
+        V[:, feeder.root] = V_slack
+
+    iterations = np.zeros(nn, dtype=int)
+    with np.errstate(all='ignore'):
+        I_load = _load_currents(system, feeder, V)
+        x = _state(system, feeder, V, I_load)
+        norm = norm0 = np.linalg.norm(system.residuals(x)/system.res_ref, axis=1)
+        converged = (norm < atol) | (norm < rtol*norm0)
+        active = ~converged & np.isfinite(norm)
+
+        for it in range(maxiter):
+            if not np.any(active):
+                break
+
+            V_new = _forward(system, feeder, V, I_load)
+            I_new = _load_currents(system, feeder, V_new)
+            x_new = _state(system, feeder, V_new, I_load)
+            norm_new = np.linalg.norm(system.residuals(x_new)/system.res_ref, axis=1)
+
+            keep = active[:, np.newaxis]
+            V = np.where(keep, V_new, V)
+            I_load = np.where(keep, I_new, I_load)
+            x = np.where(keep, x_new, x)
+            norm = np.where(active, norm_new, norm)
+            iterations += active
+
+            converged = (norm < atol) | (norm < rtol*norm0)
+            active = ~converged & np.isfinite(norm)
+
+        return LoadFlowResult(system, x, converged, iterations, norm)
+
+def sweep_guess(system, sweeps=3):
+    """
+    Returns a start for Newton's method from a few sweeps for a radial system, or from
+    LoadFlowSystem.linear_guess for any other system.
+    """
+    if radial_feeder(system) is None:
+        return system.linear_guess()
+    return sweep_solve(system, atol=0.0, rtol=0.0, maxiter=sweeps).x
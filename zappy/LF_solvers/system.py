@@ -0,0 +1,530 @@
+import warnings
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import spsolve, MatrixRankWarning
+
+from zappy.LF_elements.builder import build_layout, topology_key
+from zappy.LF_solvers.structure import JacobianStructure, STRUCTURES
+
+class LoadFlowSystem(object):
+    """
+    Assembles the residuals of ACbus, DCbus, ACline, DCline, ACload, DCload, ACgenerator,
+    DCgenerator and Converter for a topology description into one sparse system of equations.
+
+    The unknowns are the bus voltages, the generator currents and the converter currents,
+    i.e. the implicit states of the OpenMDAO model without the P/Q bookkeeping states,
+    which are computed from the solution afterwards. Variable and parameter names are the
+    promoted names used by LoadFlowNetwork for the same topology, e.g. 'Vr_1', 'LG1:Ir'
+    or 'Load2:P'. All equations are vectorized over num_nodes and the Jacobian of the
+    stacked system is block diagonal, one block per node.
+
+    The Q_min/Q_max and P_min/P_max of the generators are not equations but bounds that
+    the line search of the OpenMDAO model keeps the powers within, so a solution outside
+    them is not a converged one (see within_limits).
+    """
+
+    def __init__(self, topology, num_nodes=1):
+
+        self.topology = topology
+        self.num_nodes = nn = num_nodes
+        self.key = topology_key(topology)
+        self.layout = layout = build_layout(topology)
+
+        self.params = {}
+        for name, units, section, index, key, default in layout['params']:
+            val = topology[section][index].get(key, default)
+            if val is None:
+                raise ValueError("'{}' must be given for {}[{}].".format(key, section, index))
+            self.params[name] = val*np.ones(nn)
+
+        names = []
+        res_ref = []
+        def unknown(name, ref):
+            names.append(name)
+            res_ref.append(ref)
+            return len(names)-1
+
+        self.Vbase = {}
+        self.ac_buses = []
+        self.dc_buses = []
+        elements = dict((kind, []) for kind in ['ACline', 'DCline', 'ACload', 'DCload', 'ACgenerator', 'DCgenerator', 'Converter'])
+
+        for kind, name, options, promotes in layout['subsystems']:
+            p = dict(v for v in promotes if isinstance(v, tuple))
+
+            if kind == 'ACbus':
+                Ibase = options['Sbase']/options['Vbase']
+                self.ac_buses.append((unknown(p['Vr'], Ibase), unknown(p['Vi'], Ibase)))
+                self.Vbase[p['Vr']] = options['Vbase']
+            elif kind == 'DCbus':
+                self.dc_buses.append(unknown(p['V'], options['Sbase']/options['Vbase']))
+                self.Vbase[p['V']] = options['Vbase']
+            elif kind in elements:
+                elements[kind].append((name, options, p))
+            else:
+                raise ValueError('LoadFlowSystem does not model {} elements, solve the topology with '
+                                 'LoadFlowNetwork instead.'.format(kind))
+
+        gens = elements['ACgenerator']
+        for name, options, p in gens:
+            unknown(p['Ir_out'], options['Vbase'])
+            unknown(p['Ii_out'], options['Sbase'] if options['mode'] == 'P-V' else 1.0)
+        for name, options, p in elements['DCgenerator']:
+            unknown(p['I_out'], options['Vbase'])
+        for name, options, p in elements['Converter']:
+            unknown(p['I_dc'], options['Vdcbase'])
+            unknown(p['Ir_ac'], options['Sbase'])
+            unknown(p['Ii_ac'], 1.0)
+
+        index = dict((n, i) for i, n in enumerate(names))
+        self.names = names
+        self.index = index
+        self.num_unknowns = len(names)
+        self.res_ref = np.array(res_ref)
+
+        def idx(elems, *keys):
+            return [np.array([index[p[k]] for _, _, p in elems], dtype=int) for k in keys]
+
+        def par(elems, key):
+            return [p[key] for _, _, p in elems]
+
+        self.elements = elements
+        e = elements
+
+        # index arrays of the bus (rows and voltage columns) and element unknowns
+        self.acl = idx(e['ACline'], 'Vr_in', 'Vi_in', 'Vr_out', 'Vi_out')
+        self.acl_par = par(e['ACline'], 'R'), par(e['ACline'], 'X')
+        self.dcl = idx(e['DCline'], 'V_in', 'V_out')
+        self.dcl_par = par(e['DCline'], 'R')
+        self.acload = idx(e['ACload'], 'Vr_in', 'Vi_in')
+        self.acload_par = par(e['ACload'], 'P'), par(e['ACload'], 'Q')
+        self.dcload = idx(e['DCload'], 'V_in')
+        self.dcload_par = par(e['DCload'], 'P')
+
+        self.gen = idx(gens, 'Vr_out', 'Vi_out', 'Ir_out', 'Ii_out')
+        self.gen_slack = np.array([options['mode'] == 'Slack' for _, options, _ in gens], dtype=bool)
+        self.gen_par = (par(gens, 'Vm_bus'),
+                        [p.get('thetaV_bus', p.get('P_bus')) for _, _, p in gens])
+        self.dcgen = idx(e['DCgenerator'], 'V_out', 'I_out')
+        self.dcgen_par = par(e['DCgenerator'], 'V_bus')
+
+        self.conv = idx(e['Converter'], 'Vr_ac', 'Vi_ac', 'V_dc', 'I_dc', 'Ir_ac', 'Ii_ac')
+        self.conv_lead = np.array([options['mode'] == 'Lead' for _, options, _ in e['Converter']], dtype=bool)
+        self.conv_par = [par(e['Converter'], k) for k in ('Ksc', 'M', 'eff', 'PF')]
+
+        # the bounded generator powers, as (name, lower, upper)
+        self.limits = [(name+'.Q_out', options['Q_min'], options['Q_max']) for name, options, p in gens]
+        self.limits += [(name+'.P_out', options['P_min'], options['P_max']) for name, options, p in e['DCgenerator']]
+        self.limits = [(name, lower, upper) for name, lower, upper in self.limits if lower is not None or upper is not None]
+
+        self._structure = None
+
+    def _stack(self, names, nodes=None):
+        """
+        Returns the parameters with the given names as an array of shape (num_nodes, len(names)),
+        or only the rows of the given nodes.
+        """
+        if len(names) == 0:
+            val = np.zeros((self.num_nodes, 0))
+        else:
+            val = np.array([self.params[n] for n in names]).T
+        return val if nodes is None else val[nodes]
+
+    def initial_guess(self):
+        """
+        Returns the flat start used by the guess_nonlinear methods of the OpenMDAO elements.
+        """
+        nn = self.num_nodes
+        x = np.zeros((nn, self.num_unknowns))
+
+        for name, Vbase in self.Vbase.items():
+            x[:, self.index[name]] = Vbase
+
+        Vr, Vi, Ir, Ii = self.gen
+        if len(Ir):
+            P = np.where(self.gen_slack,
+                         self._stack([p.get('P_guess', p.get('P_bus')) for _, _, p in self.elements['ACgenerator']]),
+                         self._stack(self.gen_par[1]))
+            S = P + P*(1.0/0.95**2-1)**0.5*1j
+            I = (S/(x[:, Vr] + x[:, Vi]*1j)).conjugate()
+            x[:, Ir] = I.real
+            x[:, Ii] = I.imag
+
+        V, I = self.dcgen
+        if len(I):
+            P = self._stack([p['P_guess'] for _, _, p in self.elements['DCgenerator']])
+            x[:, I] = P/x[:, V]
+
+        Vr, Vi, Vdc, Idc, Ir, Ii = self.conv
+        if len(Ir):
+            conv = self.elements['Converter']
+            P_ac = self._stack([p['P_ac_guess'] for _, _, p in conv])
+            P_dc = self._stack([p['P_dc_guess'] for _, _, p in conv])
+            PF = self._stack(self.conv_par[3])
+            S = P_ac + P_ac*(1.0/PF**2-1)**0.5*1j
+            I = (S/(x[:, Vr] + x[:, Vi]*1j)).conjugate()
+            x[:, Ir] = I.real
+            x[:, Ii] = I.imag
+            x[:, Idc] = P_dc/x[:, Vdc]
+
+        return x
+
+    def linear_guess(self, nodes=None):
+        """
+        Returns a start for Newton's method from a linear approximation of the network:
+        loads draw a constant current at the nominal voltage of their bus, generators and
+        converters deliver their power at nominal voltage, and the voltages they control
+        are taken in phase with their bus (slack generators at their angle). The lines are
+        kept exact. Nodes whose linear system is singular get the flat start instead.
+        """
+        x0 = self.initial_guess()
+        if nodes is not None:
+            x0 = x0[nodes]
+        nn, nx = x0.shape
+        b = np.zeros_like(x0)
+        rows, cols, data = [], [], []
+
+        def stack(names):
+            return self._stack(names, nodes)
+
+        def add(i, j, val):
+            i, j = np.broadcast_arrays(i, j)
+            rows.append(i)
+            cols.append(j)
+            data.append(np.broadcast_to(val, (nn, i.size)))
+
+        # AC lines
+        fr, fi, tr, ti = self.acl
+        with np.errstate(all='ignore'):
+            Y = 1.0/(stack(self.acl_par[0]) + stack(self.acl_par[1])*1j)
+        for (ar, ai), (br, bi), s in [((fr, fi), (fr, fi), 1), ((fr, fi), (tr, ti), -1),
+                                      ((tr, ti), (tr, ti), 1), ((tr, ti), (fr, fi), -1)]:
+            add(ar, br, s*Y.real)
+            add(ar, bi, -s*Y.imag)
+            add(ai, br, s*Y.imag)
+            add(ai, bi, s*Y.real)
+
+        # DC lines
+        f, t = self.dcl
+        G = 1.0/stack(self.dcl_par)
+        add(f, f, G)
+        add(f, t, -G)
+        add(t, t, G)
+        add(t, f, -G)
+
+        # AC loads: constant current at the nominal voltage
+        br, bi = self.acload
+        I = ((stack(self.acload_par[0]) + stack(self.acload_par[1])*1j)/x0[:, br]).conjugate()
+        np.add.at(b.T, br, -I.real.T)
+        np.add.at(b.T, bi, -I.imag.T)
+
+        # DC loads
+        bus, = self.dcload
+        np.add.at(b.T, bus, -(stack(self.dcload_par)/x0[:, bus]).T)
+
+        # AC generators: Vr = Vm and Vm*Ir = P_bus (P-V), V = Vm at thetaV (Slack)
+        br, bi, gr, gi = self.gen
+        Vm, val = stack(self.gen_par[0]), stack(self.gen_par[1])
+        slack = self.gen_slack
+        add(br, gr, 1.0)
+        add(bi, gi, 1.0)
+        add(gr, br, 1.0)
+        add(gi, bi, np.where(slack, 1.0, 0.0))
+        add(gi, gr, np.where(slack, 0.0, Vm))
+        b[:, gr] = np.where(slack, Vm*np.cos(np.radians(val)), Vm)
+        b[:, gi] = np.where(slack, Vm*np.sin(np.radians(val)), val)
+
+        # DC generators
+        bus, g = self.dcgen
+        add(bus, g, 1.0)
+        add(g, bus, 1.0)
+        b[:, g] = stack(self.dcgen_par)
+
+        # Converters: Vr_ac = Ksc*M*V_dc, the power balance and the power factor at nominal voltage,
+        # with the direction of the flow taken from the power guesses
+        br, bi, bdc, cdc, cr, ci = self.conv
+        Ksc, M, eff, PF = [stack(n) for n in self.conv_par]
+        conv = self.elements['Converter']
+        ac_to_dc = abs(stack([p['P_ac_guess'] for _, _, p in conv])) > abs(stack([p['P_dc_guess'] for _, _, p in conv]))
+        theta = np.where(self.conv_lead, np.arccos(PF), -np.arccos(PF))
+        add(br, cr, 1.0)
+        add(bi, ci, 1.0)
+        add(bdc, cdc, 1.0)
+        add(cdc, br, 1.0)
+        add(cdc, bdc, -Ksc*M)
+        add(cr, cr, np.where(ac_to_dc, eff, 1.0)*x0[:, br])
+        add(cr, cdc, np.where(ac_to_dc, 1.0, eff)*x0[:, bdc])
+        add(ci, ci, 1.0)
+        add(ci, cr, np.tan(theta))
+
+        rows = np.concatenate([i.ravel() for i in rows])
+        cols = np.concatenate([j.ravel() for j in cols])
+        data = np.concatenate([d.reshape(nn, -1) for d in data], axis=1)
+        offset = nx*np.arange(nn)[:, np.newaxis]
+        A = sp.csc_matrix((data.ravel(), ((rows+offset).ravel(), (cols+offset).ravel())), shape=(nn*nx, nn*nx))
+
+        with np.errstate(all='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', MatrixRankWarning)
+            x = spsolve(A, b.ravel()).reshape(nn, nx)
+
+            # the linear model gives the powers of the P-V generators and converters at nominal
+            # voltage; their currents are rotated with the solved voltages so that the power
+            # factors (and the quadrant of the converter angle) are kept
+            def rotate(ir, ii, br, bi, Vnom, mask=True):
+                V = x[:, br] + x[:, bi]*1j
+                I = np.where(mask, (Vnom*(x[:, ir] - x[:, ii]*1j)/V).conjugate(), x[:, ir] + x[:, ii]*1j)
+                x[:, ir] = I.real
+                x[:, ii] = I.imag
+
+            br, bi, gr, gi = self.gen
+            rotate(gr, gi, br, bi, Vm, ~slack)
+            br, bi, bdc, cdc, cr, ci = self.conv
+            rotate(cr, ci, br, bi, x0[:, br])
+            x[:, cdc] *= x0[:, bdc]/x[:, bdc]
+
+        failed = ~np.all(np.isfinite(x), axis=1)
+        x[failed] = x0[failed]
+        return x
+
+    def residuals(self, x, nodes=None):
+        """
+        Returns the residuals of all equations, shape (num_nodes, num_unknowns).
+        Only the residuals of the given nodes are evaluated if nodes is not None.
+        """
+        r, _ = self._evaluate(x, nodes, jacobian=False)
+        return r
+
+    def jacobian(self, x, nodes=None):
+        """
+        Returns the block diagonal Jacobian of the stacked system as a CSC matrix.
+        Only the blocks of the given nodes are assembled if nodes is not None.
+        """
+        _, data = self._evaluate(x, nodes, jacobian=True)
+        return self.structure().matrix(data)
+
+    def factorize(self, J):
+        """
+        Returns the LU factorization of a Jacobian of this system, e.g. factorize(J).solve(b),
+        reusing the column ordering of the earlier factorizations of the same topology.
+        """
+        return self.structure().factorize(J)
+
+    def pattern(self):
+        """
+        Returns the (rows, cols) of the nonzero entries of one Jacobian block.
+        """
+        structure = self.structure()
+        return structure.rows, structure.cols
+
+    def structure(self):
+        """
+        Returns the JacobianStructure of the system. It is shared through STRUCTURES by all
+        systems whose topologies only differ in parameter values.
+        """
+        if self._structure is None:
+            def build():
+                rows, cols = self._evaluate(self.initial_guess(), jacobian=True, pattern=True)
+                return JacobianStructure(rows, cols, self.num_unknowns)
+            self._structure = STRUCTURES.get(self.key, build)
+        return self._structure
+
+    def _evaluate(self, x, nodes=None, jacobian=True, pattern=False):
+
+        if nodes is not None:
+            x = x[nodes]
+        nn = x.shape[0]
+        r = np.zeros_like(x)
+        rows, cols, data = [], [], []
+
+        def stack(names):
+            return self._stack(names, nodes)
+
+        def add(i, j, val):
+            if jacobian:
+                i, j = np.broadcast_arrays(i, j)
+                rows.append(i)
+                cols.append(j)
+                data.append(np.broadcast_to(val, (nn, i.size)))
+
+        def V(ir, ii):
+            return x[:, ir] + x[:, ii]*1j
+
+        # AC lines: current leaving each end into the line
+        fr, fi, tr, ti = self.acl
+        Y = 1.0/(stack(self.acl_par[0]) + stack(self.acl_par[1])*1j)
+        I = Y*(V(fr, fi)-V(tr, ti))
+        np.add.at(r.T, fr, I.real.T)
+        np.add.at(r.T, fi, I.imag.T)
+        np.add.at(r.T, tr, -I.real.T)
+        np.add.at(r.T, ti, -I.imag.T)
+        for (ar, ai), (br, bi), s in [((fr, fi), (fr, fi), 1), ((fr, fi), (tr, ti), -1),
+                                      ((tr, ti), (tr, ti), 1), ((tr, ti), (fr, fi), -1)]:
+            add(ar, br, s*Y.real)
+            add(ar, bi, -s*Y.imag)
+            add(ai, br, s*Y.imag)
+            add(ai, bi, s*Y.real)
+
+        # DC lines
+        f, t = self.dcl
+        G = 1.0/stack(self.dcl_par)
+        I = G*(x[:, f]-x[:, t])
+        np.add.at(r.T, f, I.T)
+        np.add.at(r.T, t, -I.T)
+        add(f, f, G)
+        add(f, t, -G)
+        add(t, t, G)
+        add(t, f, -G)
+
+        # AC loads: I = conj(S/V)
+        br, bi = self.acload
+        S = stack(self.acload_par[0]) + stack(self.acload_par[1])*1j
+        Vb = V(br, bi)
+        I = (S/Vb).conjugate()
+        np.add.at(r.T, br, I.real.T)
+        np.add.at(r.T, bi, I.imag.T)
+        dI_dVr = -S.conjugate()/Vb.conjugate()**2
+        dI_dVi = 1j*S.conjugate()/Vb.conjugate()**2
+        add(br, br, dI_dVr.real)
+        add(br, bi, dI_dVi.real)
+        add(bi, br, dI_dVr.imag)
+        add(bi, bi, dI_dVi.imag)
+
+        # DC loads: I = P/V
+        b, = self.dcload
+        P = stack(self.dcload_par)
+        np.add.at(r.T, b, (P/x[:, b]).T)
+        add(b, b, -P/x[:, b]**2)
+
+        # AC generators
+        br, bi, gr, gi = self.gen
+        Vm, val = stack(self.gen_par[0]), stack(self.gen_par[1])
+        slack = self.gen_slack
+        Vr, Vi, Ir, Ii = x[:, br], x[:, bi], x[:, gr], x[:, gi]
+        Vmag = (Vr**2 + Vi**2)**0.5
+        np.add.at(r.T, br, Ir.T)
+        np.add.at(r.T, bi, Ii.T)
+        add(br, gr, 1.0)
+        add(bi, gi, 1.0)
+
+        r[:, gr] = Vm - Vmag
+        add(gr, br, -Vr/Vmag)
+        add(gr, bi, -Vi/Vmag)
+
+        r[:, gi] = np.where(slack, val - np.degrees(np.arctan2(Vi, Vr)), val - (Vr*Ir + Vi*Ii))
+        add(gi, br, np.where(slack, np.degrees(Vi/Vmag**2), -Ir))
+        add(gi, bi, np.where(slack, np.degrees(-Vr/Vmag**2), -Ii))
+        add(gi, gr, np.where(slack, 0.0, -Vr))
+        add(gi, gi, np.where(slack, 0.0, -Vi))
+
+        # DC generators
+        b, g = self.dcgen
+        np.add.at(r.T, b, x[:, g].T)
+        add(b, g, 1.0)
+        r[:, g] = stack(self.dcgen_par) - x[:, b]
+        add(g, b, -1.0)
+
+        # Converters
+        br, bi, bdc, cdc, cr, ci = self.conv
+        Ksc, M, eff, PF = [stack(n) for n in self.conv_par]
+        Vr, Vi, Vdc, Idc, Ir, Ii = [x[:, k] for k in self.conv]
+        np.add.at(r.T, br, Ir.T)
+        np.add.at(r.T, bi, Ii.T)
+        np.add.at(r.T, bdc, Idc.T)
+        add(br, cr, 1.0)
+        add(bi, ci, 1.0)
+        add(bdc, cdc, 1.0)
+
+        Vmag = (Vr**2 + Vi**2)**0.5
+        r[:, cdc] = Vmag - Ksc*M*Vdc
+        add(cdc, br, Vr/Vmag)
+        add(cdc, bi, Vi/Vmag)
+        add(cdc, bdc, -Ksc*M)
+
+        P_ac = Vr*Ir + Vi*Ii
+        Q_ac = Vi*Ir - Vr*Ii
+        P_dc = Vdc*Idc
+        ac_to_dc = abs(P_ac) > abs(P_dc)
+        r[:, cr] = np.where(ac_to_dc, P_ac*eff + P_dc, P_ac + P_dc*eff)
+        k_ac = np.where(ac_to_dc, eff, 1.0)
+        k_dc = np.where(ac_to_dc, 1.0, eff)
+        add(cr, br, k_ac*Ir)
+        add(cr, bi, k_ac*Ii)
+        add(cr, cr, k_ac*Vr)
+        add(cr, ci, k_ac*Vi)
+        add(cr, bdc, k_dc*Idc)
+        add(cr, cdc, k_dc*Vdc)
+
+        theta = np.where(self.conv_lead, np.arccos(PF), -np.arccos(PF))
+        r[:, ci] = theta - np.arctan2(Q_ac, P_ac)
+        Sm2 = P_ac**2 + Q_ac**2
+        add(ci, br, -(P_ac*-Ii - Q_ac*Ir)/Sm2)
+        add(ci, bi, -(P_ac*Ir - Q_ac*Ii)/Sm2)
+        add(ci, cr, -(P_ac*Vi - Q_ac*Vr)/Sm2)
+        add(ci, ci, -(P_ac*-Vr - Q_ac*Vi)/Sm2)
+
+        if not jacobian:
+            return r, None
+        if pattern:
+            return np.concatenate([i.ravel() for i in rows]), np.concatenate([j.ravel() for j in cols])
+        return r, np.concatenate([d.reshape(nn, -1) for d in data], axis=1)
+
+    def within_limits(self, values):
+        """
+        Returns for every node whether the bounded generator powers in values, the dict
+        returned by values, are within their bounds.
+        """
+        ok = np.ones(self.num_nodes, dtype=bool)
+        for name, lower, upper in self.limits:
+            if lower is not None:
+                ok &= values[name] >= lower
+            if upper is not None:
+                ok &= values[name] <= upper
+        return ok
+
+    def values(self, x):
+        """
+        Returns a dict with the solved unknowns and the derived currents and powers,
+        using the promoted and absolute names of the equivalent OpenMDAO model.
+        """
+        out = dict((name, x[:, i]) for i, name in enumerate(self.names))
+
+        def V(name_r, name_i):
+            return out[name_r] + out[name_i]*1j
+
+        for name, options, p in self.elements['ACline']:
+            I = (V(p['Vr_in'], p['Vi_in']) - V(p['Vr_out'], p['Vi_out']))/(self.params[p['R']] + self.params[p['X']]*1j)
+            out[p['Ir_in']], out[p['Ii_in']] = I.real, I.imag
+            out[p['Ir_out']], out[p['Ii_out']] = -I.real, -I.imag
+            S_in = V(p['Vr_in'], p['Vi_in'])*I.conjugate()
+            S_out = -V(p['Vr_out'], p['Vi_out'])*I.conjugate()
+            out[name+'.P_in'], out[name+'.Q_in'] = S_in.real, S_in.imag
+            out[name+'.P_out'], out[name+'.Q_out'] = S_out.real, S_out.imag
+            out[name+'.P_loss'], out[name+'.Q_loss'] = (S_in+S_out).real, (S_in+S_out).imag
+
+        for name, options, p in self.elements['DCline']:
+            I = (out[p['V_in']] - out[p['V_out']])/self.params[p['R']]
+            out[p['I_in']], out[p['I_out']] = I, -I
+            out[name+'.P_in'], out[name+'.P_out'] = out[p['V_in']]*I, -out[p['V_out']]*I
+            out[name+'.P_loss'] = out[name+'.P_in'] + out[name+'.P_out']
+
+        for name, options, p in self.elements['ACload']:
+            I = ((self.params[p['P']] + self.params[p['Q']]*1j)/V(p['Vr_in'], p['Vi_in'])).conjugate()
+            out[p['Ir_in']], out[p['Ii_in']] = I.real, I.imag
+
+        for name, options, p in self.elements['DCload']:
+            out[p['I_in']] = self.params[p['P']]/out[p['V_in']]
+
+        for name, options, p in self.elements['ACgenerator']:
+            S = V(p['Vr_out'], p['Vi_out'])*V(p['Ir_out'], p['Ii_out']).conjugate()
+            out[name+'.P_out'], out[name+'.Q_out'] = S.real, S.imag
+
+        for name, options, p in self.elements['DCgenerator']:
+            out[name+'.P_out'] = out[p['V_out']]*out[p['I_out']]
+
+        for name, options, p in self.elements['Converter']:
+            S = V(p['Vr_ac'], p['Vi_ac'])*V(p['Ir_ac'], p['Ii_ac']).conjugate()
+            out[name+'.P_ac'], out[name+'.Q_ac'] = S.real, S.imag
+            out[name+'.P_dc'] = out[p['V_dc']]*out[p['I_dc']]
+
+        return out
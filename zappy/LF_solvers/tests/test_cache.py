@@ -0,0 +1,65 @@
+import unittest
+import copy
+import os
+import tempfile
+import numpy as np
+
+from zappy.LF_solvers.newton import solve_load_flow
+from zappy.LF_solvers.cache import SolutionCache
+from zappy.LF_examples.topology_example import TOPOLOGY
+
+
+class SolutionCacheTestCase(unittest.TestCase):
+
+    def test_hit(self):
+
+        with tempfile.TemporaryDirectory() as path:
+            cache = SolutionCache(path, maxsize=2)
+            ref = solve_load_flow(TOPOLOGY, cache=cache)
+            self.assertGreater(ref.iterations, 0)
+            self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 1, 1))
+
+            # a new cache on the same directory finds the solution
+            cache = SolutionCache(path, maxsize=2)
+            result = solve_load_flow(TOPOLOGY, cache=cache)
+            self.assertEqual(cache.hits, 1)
+            self.assertEqual(result.iterations, 0)
+            np.testing.assert_allclose(result.x, ref.x)
+
+            # the stored solution is refined to a tighter tolerance
+            result = solve_load_flow(TOPOLOGY, cache=cache, atol=1e-12, rtol=1e-14)
+            self.assertEqual(cache.hits, 2)
+            self.assertLessEqual(result.norm, 1e-12)
+
+            # any change of a parameter is a miss
+            variant = copy.deepcopy(TOPOLOGY)
+            variant['loads'][0]['P'] *= 1.0 + 1e-12
+            self.assertIsNone(cache.get(solve_load_flow(variant).system))
+
+    def test_eviction(self):
+
+        with tempfile.TemporaryDirectory() as path:
+            cache = SolutionCache(path, maxsize=2)
+            variants = []
+            for k, P in enumerate([1.8e6, 2.0e6, 2.2e6]):
+                variant = copy.deepcopy(TOPOLOGY)
+                variant['loads'][0]['P'] = P
+                variants.append(variant)
+                solve_load_flow(variant, cache=cache)
+                if k == 1:
+                    # the first case is used again, so the second one is the least recently used
+                    solve_load_flow(variants[0], cache=cache)
+
+            self.assertEqual(len(cache), 2)
+            self.assertIsNone(cache.get(solve_load_flow(variants[1]).system))
+            self.assertIsNotNone(cache.get(solve_load_flow(variants[0]).system))
+
+            self.assertEqual(sorted(f for f in os.listdir(path) if f.endswith('.use')),
+                             sorted(f[:-4]+'.use' for f in os.listdir(path) if f.endswith('.npy')))
+
+            cache.clear()
+            self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
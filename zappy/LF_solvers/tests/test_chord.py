@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+
+from openmdao.api import Problem
+
+from zappy.LF_elements.builder import LoadFlowNetwork
+from zappy.LF_solvers.chord import ChordNewtonSolver
+from zappy.LF_examples.topology_example import TOPOLOGY
+
+
+class ChordNewtonSolverTestCase(unittest.TestCase):
+
+    def sweep(self, reuse_jacobian, **options):
+        prob = Problem(reports=None)
+        prob.model.add_subsystem('sys', LoadFlowNetwork(num_nodes=2, topology=TOPOLOGY, reuse_jacobian=reuse_jacobian),
+                                 promotes=['*'])
+        prob.set_solver_print(level=-1)
+        prob.setup(check=False)
+        prob.final_setup()
+
+        newton = prob.model.sys.nonlinear_solver
+        newton.options['atol'] = 1e-8
+        newton.options['rtol'] = 1e-10
+        newton.options['maxiter'] = 20
+        for name, val in options.items():
+            newton.options[name] = val
+
+        V = []
+        iterations = 0
+        for P in [2.0e6, 2.1e6, 2.2e6]:
+            prob['Load2:P'] = P
+            prob.run_model()
+            V.append(prob['Vr_7'].copy())
+            iterations += newton._iter_count
+        return newton, np.array(V), iterations
+
+    def test_sweep(self):
+
+        newton, V_ref, factorizations = self.sweep(False)
+        chord, V, iterations = self.sweep(True)
+
+        self.assertIsInstance(chord, ChordNewtonSolver)
+        np.testing.assert_allclose(V, V_ref, rtol=1e-8)
+        self.assertLess(chord.num_factorizations, 0.7*factorizations)
+
+    def test_no_reuse_across_solves(self):
+
+        chord, V, iterations = self.sweep(True, reuse_across_solves=False, max_reuse=0)
+        self.assertEqual(chord.num_factorizations, iterations)
+
+
+if __name__ == "__main__":
+    unittest.main()
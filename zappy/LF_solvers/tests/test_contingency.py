@@ -0,0 +1,78 @@
+import unittest
+import copy
+import numpy as np
+
+from zappy.LF_solvers.system import LoadFlowSystem
+from zappy.LF_solvers.newton import newton_solve
+from zappy.LF_solvers.contingency import screen_contingencies
+
+# meshed AC network with a radial feeder (buses 5 and 6) and a DC ring behind a converter
+MESH = {
+    'Vbase': 4160., 'Vdcbase': 6800., 'Sbase': 10.0e6,
+    'buses': {'1': {'type': 'AC'}, '2': {'type': 'AC'}, '3': {'type': 'AC'}, '4': {'type': 'AC'}, '5': {'type': 'AC'},
+              '6': {'type': 'AC'}, '7': {'type': 'DC'}, '8': {'type': 'DC'}, '9': {'type': 'DC'}},
+    'lines': [
+        {'from': '1', 'to': '2', 'R': 0.2, 'X': 0.4},
+        {'from': '2', 'to': '3', 'R': 0.25, 'X': 0.5},
+        {'from': '3', 'to': '4', 'R': 0.2, 'X': 0.35},
+        {'from': '4', 'to': '1', 'R': 0.3, 'X': 0.5},
+        {'from': '1', 'to': '3', 'R': 0.35, 'X': 0.6},
+        {'from': '4', 'to': '5', 'R': 0.1, 'X': 0.2},
+        {'from': '5', 'to': '6', 'R': 0.1, 'X': 0.2},
+        {'from': '7', 'to': '8', 'R': 0.3},
+        {'from': '8', 'to': '9', 'R': 0.3},
+        {'from': '9', 'to': '7', 'R': 0.4},
+    ],
+    'generators': [{'bus': '1', 'mode': 'Slack', 'Vm': 4300., 'P_guess': -3.0e6},
+                   {'bus': '3', 'mode': 'P-V', 'Vm': 4250., 'P': -1.0e6}],
+    'loads': [{'bus': '2', 'P': 1.0e6, 'Q': 0.3e6}, {'bus': '4', 'P': 0.8e6, 'Q': 0.2e6},
+              {'bus': '6', 'P': 0.3e6, 'Q': 0.1e6}, {'bus': '8', 'P': 0.3e6}, {'bus': '9', 'P': 0.2e6}],
+    'converters': [{'ac_bus': '5', 'dc_bus': '7', 'mode': 'Lead', 'M': 0.99, 'Ksc': 0.611764706, 'eff': 0.98,
+                    'PF': 0.95, 'P_ac_guess': 0.5e6, 'P_dc_guess': -0.5e6}],
+}
+
+
+class ContingencyTestCase(unittest.TestCase):
+
+    def test_screening(self):
+
+        outages = screen_contingencies(MESH, V_limits=(0.99, 1.05), ratings={'Line1_2': 230.0, 'Line2_3': 300.0})
+        self.assertEqual(len(outages), len(MESH['lines']))
+
+        # the radial feeder islands bus 6 (and bus 5 with the DC ring)
+        islanded = sorted(o.name for o in outages if o.islanded)
+        self.assertEqual(islanded, ['Line4_5', 'Line5_6'])
+        self.assertEqual([o.name for o in outages[:2]], ['Line4_5', 'Line5_6'])
+
+        severity = [o.severity for o in outages]
+        self.assertEqual(severity, sorted(severity, reverse=True))
+        # losing a parallel path overloads Line1_2, losing Line3_4 (and Line4_1) drops the voltage of bus 4
+        self.assertEqual([o.name for o in outages[2:5]], ['Line2_3', 'Line4_1', 'Line3_4'])
+        self.assertGreater(outages[2].max_loading, 1.0)
+        self.assertLess(outages[4].V_min, 0.99)
+        self.assertEqual(outages[-1].severity, 0.0)
+
+        # every other outage matches a solve of the topology without the line
+        base = LoadFlowSystem(MESH)
+        for outage in outages[2:]:
+            self.assertTrue(outage.converged, outage.name)
+            topology = copy.deepcopy(MESH)
+            del topology['lines'][[k for k, line in enumerate(MESH['lines'])
+                                   if 'Line{}_{}'.format(line['from'], line['to']) == outage.name][0]]
+            system = LoadFlowSystem(topology)
+            ref = newton_solve(system)
+            for name in system.Vbase:
+                np.testing.assert_allclose(outage.x[base.index[name]], ref[name][0], rtol=1e-8, err_msg=outage.name)
+
+    def test_branches(self):
+
+        outages = screen_contingencies(MESH, branches=['Line7_8'], maxiter=1)
+        self.assertEqual(len(outages), 1)
+        self.assertEqual(outages[0].iterations, 1)
+
+        with self.assertRaises(ValueError):
+            screen_contingencies(MESH, branches=['Line1_5'])
+
+
+if __name__ == "__main__":
+    unittest.main()
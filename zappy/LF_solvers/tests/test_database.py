@@ -0,0 +1,56 @@
+import unittest
+import copy
+import numpy as np
+
+from zappy.LF_solvers.system import LoadFlowSystem
+from zappy.LF_solvers.newton import solve_load_flow
+from zappy.LF_solvers.database import WarmStartDatabase
+from zappy.LF_examples.topology_example import TOPOLOGY
+
+
+class WarmStartDatabaseTestCase(unittest.TestCase):
+
+    def test_monte_carlo(self):
+
+        db = WarmStartDatabase(TOPOLOGY, k=2)
+        self.assertIn('Load2:P', db.params)
+        self.assertIn('Gen2:P_bus', db.params)
+
+        rng = np.random.RandomState(0)
+        flat = warm = 0
+        for k in range(40):
+            variant = copy.deepcopy(TOPOLOGY)
+            variant['loads'][0]['P'] = rng.uniform(1.6e6, 2.4e6)
+            variant['loads'][4]['Q'] = rng.uniform(0.3e6, 0.7e6)
+            result = solve_load_flow(variant, database=db)
+            self.assertTrue(result.converged)
+            if k >= 20:
+                warm += result.iterations
+                flat += solve_load_flow(variant).iterations
+
+        self.assertEqual(len(db), 40)
+        self.assertIsNotNone(db._tree) # rebuilt after the first points
+        self.assertLess(warm, 0.7*flat)
+
+    def test_guess(self):
+
+        db = WarmStartDatabase(TOPOLOGY, params=['Load2:P'], k=2)
+        system = LoadFlowSystem(TOPOLOGY, num_nodes=2)
+        np.testing.assert_allclose(db.guess(system), system.initial_guess())
+
+        system.params['Load2:P'] = np.array([1.0e6, 3.0e6])
+        x = np.array([np.ones(system.num_unknowns), 3.0*np.ones(system.num_unknowns)])
+        db.add(system, x, converged=np.array([True, True]))
+
+        # an exact match is returned as is, other points are interpolated
+        system.params['Load2:P'] = np.array([3.0e6, 2.5e6])
+        guess = db.guess(system)
+        np.testing.assert_allclose(guess[0], 3.0)
+        np.testing.assert_allclose(guess[1], 2.5)
+
+        with self.assertRaises(ValueError):
+            WarmStartDatabase(TOPOLOGY, params=['Load99:P'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import numpy as np
+
+from zappy.LF_solvers.system import LoadFlowSystem
+from zappy.LF_solvers.newton import newton_solve, batched_newton_solve, solve_load_flow
+from zappy.LF_solvers.decoupled import decoupled_solve, decoupled_model
+from zappy.LF_examples.topology_example import TOPOLOGY
+
+# meshed AC network with a high X/R ratio, a slack and a P-V generator
+RING = {
+    'Vbase': 4160., 'Sbase': 10.0e6,
+    'buses': dict((str(i), {'type': 'AC'}) for i in range(1, 7)),
+    'lines': [
+        {'from': '1', 'to': '2', 'R': 0.05, 'X': 0.4},
+        {'from': '2', 'to': '3', 'R': 0.06, 'X': 0.5},
+        {'from': '3', 'to': '4', 'R': 0.04, 'X': 0.35},
+        {'from': '4', 'to': '1', 'R': 0.05, 'X': 0.5},
+        {'from': '1', 'to': '3', 'R': 0.07, 'X': 0.6},
+        {'from': '4', 'to': '5', 'R': 0.02, 'X': 0.2},
+        {'from': '5', 'to': '6', 'R': 0.02, 'X': 0.2},
+    ],
+    'generators': [{'bus': '1', 'mode': 'Slack', 'Vm': 4300., 'P_guess': -3.0e6},
+                   {'bus': '3', 'mode': 'P-V', 'Vm': 4250., 'P': -1.0e6}],
+    'loads': [{'bus': '2', 'P': 1.0e6, 'Q': 0.3e6}, {'bus': '4', 'P': 0.8e6, 'Q': 0.2e6},
+              {'bus': '5', 'P': 0.5e6, 'Q': 0.1e6}, {'bus': '6', 'P': 0.3e6, 'Q': 0.1e6}],
+}
+
+
+class DecoupledTestCase(unittest.TestCase):
+
+    def test_ring(self):
+
+        system = LoadFlowSystem(RING, num_nodes=3)
+        system.params['Load2:P'] = np.array([0.5e6, 1.0e6, 2.0e6])
+        system.params['Line1_2:X'] = np.array([0.4, 0.3, 0.5])
+        self.assertIsNotNone(decoupled_model(system))
+
+        result = decoupled_solve(system, atol=1e-10)
+        ref = batched_newton_solve(system, atol=1e-10)
+        self.assertTrue(np.all(result.converged))
+        self.assertTrue(np.all(result.iterations > ref.iterations)) # linear convergence
+        for name in ['Vr_6', 'Vi_6', 'LG2:Ir', 'LG2:Ii', 'Gen1.P_out', 'Gen2.Q_out']:
+            np.testing.assert_allclose(result[name], ref[name], rtol=1e-7, atol=1e-4)
+
+        # the P-V generator holds its set points
+        np.testing.assert_allclose(result['Gen2.P_out'], -1.0e6)
+        np.testing.assert_allclose((result['Vr_3']**2 + result['Vi_3']**2)**0.5, 4250.)
+
+    def test_solve_load_flow(self):
+
+        result = solve_load_flow(RING, method='decoupled')
+        self.assertTrue(result.converged)
+        np.testing.assert_allclose(result.x, newton_solve(LoadFlowSystem(RING)).x, rtol=1e-6, atol=1e-3)
+
+        # hybrid networks fall back to Newton's method
+        system = LoadFlowSystem(TOPOLOGY)
+        self.assertIsNone(decoupled_model(system))
+        np.testing.assert_allclose(decoupled_solve(system).x, newton_solve(system).x)
+
+        with self.assertRaises(ValueError):
+            solve_load_flow(RING, method='gauss-seidel')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+import numpy as np
+
+from openmdao.api import Problem
+
+from zappy.LF_solvers.system import LoadFlowSystem
+from zappy.LF_solvers.newton import newton_solve, batched_newton_solve, solve_load_flow
+from zappy.LF_solvers.cross_check import cross_check
+from zappy.LF_examples.load_flow_example1 import Example
+from zappy.LF_examples.topology_example import TOPOLOGY
+
+# load_flow_example1 (per unit values, three operating points) as a topology description
+EXAMPLE1 = {
+    'Vbase': 1.0, 'Sbase': 1.0,
+    'buses': {'1': {'type': 'AC'}, '2': {'type': 'AC'}, '3': {'type': 'AC'}},
+    'lines': [
+        {'from': '1', 'to': '2', 'R': np.array([0.02, 0.01, 0.015]), 'X': np.array([0.04, 0.05, 0.03])},
+        {'from': '1', 'to': '3', 'R': np.array([0.01, 0.02, 0.025]), 'X': np.array([0.03, 0.02, 0.015])},
+        {'from': '2', 'to': '3', 'R': np.array([0.0125, 0.015, 0.02]), 'X': np.array([0.025, 0.03, 0.015])},
+    ],
+    'generators': [{'bus': '1', 'mode': 'Slack', 'Vm': 1.05, 'thetaV': 0.0, 'P_guess': -4.0}],
+    'loads': [
+        {'bus': '2', 'P': np.array([2.566, 2.45, 2.6]), 'Q': np.array([1.102, 1.2, 1.05])},
+        {'bus': '3', 'P': np.array([1.386, 1.55, 1.2]), 'Q': np.array([0.452, 0.6, 0.5])},
+    ],
+}
+
+
+class LoadFlowSystemTestCase(unittest.TestCase):
+
+    def test_example1(self):
+
+        prob = Problem(reports=None)
+        prob.model.add_subsystem('sys', Example(num_nodes=3), promotes=['*'])
+        prob.set_solver_print(level=-1)
+        prob.setup(check=False)
+        prob.final_setup()
+        newton = prob.model.sys.nonlinear_solver
+        newton.options['atol'] = 1e-10
+        newton.options['rtol'] = 1e-10
+        newton.options['maxiter'] = 20
+        prob['Vr_1'] = 1.05
+        prob['Vr_2'] = 1.0
+        prob['Vr_3'] = 1.0
+        prob.run_model()
+
+        result = solve_load_flow(EXAMPLE1, num_nodes=3, atol=1e-10)
+        self.assertTrue(result.converged)
+
+        names = ['Vr_1', 'Vi_1', 'Vr_2', 'Vi_2', 'Vr_3', 'Vi_3', 'LG1:Ir', 'LG1:Ii', 'LL2:Ir', 'LL3:Ii',
+                 'Gen1.P_out', 'Gen1.Q_out']
+        for name, ref in list(zip(names, names)) + [('L1_2:Ir', 'L12:Ir'), ('L3_2:Ii', 'L32:Ii')]:
+            np.testing.assert_allclose(result[name], prob[ref], rtol=1e-6, atol=1e-6)
+
+    def test_13bus(self):
+
+        diff = cross_check(TOPOLOGY)
+        for name, d in diff.items():
+            self.assertLess(d, 1e-5, name)
+
+    def test_jacobian(self):
+
+        system = LoadFlowSystem(TOPOLOGY, num_nodes=2)
+        system.params['Load2:P'] = np.array([2.0e6, 1.0e6])
+        system.params['Gen2:P_bus'] = np.array([-2.5e6, -1.0e6])
+
+        x = newton_solve(system, maxiter=2).x
+        J = system.jacobian(x).toarray()
+
+        J_fd = np.zeros_like(J)
+        for k in range(x.size):
+            h = 1e-6*max(1.0, abs(x.flat[k]))
+            xp, xm = x.copy(), x.copy()
+            xp.flat[k] += h
+            xm.flat[k] -= h
+            J_fd[:, k] = (system.residuals(xp) - system.residuals(xm)).ravel()/(2*h)
+
+        np.testing.assert_allclose(J, J_fd, rtol=1e-5, atol=1e-5)
+
+    def test_batched(self):
+
+        nn = 6
+        system = LoadFlowSystem(TOPOLOGY, num_nodes=nn)
+        system.params['Load2:P'] = np.linspace(0.5e6, 3.0e6, nn)
+        system.params['Load2:P'][2] = 1.0e9 # no solution
+        x0 = system.initial_guess()
+        x0[4] = 0.0 # singular starting point
+
+        result = batched_newton_solve(system, x0=x0)
+        np.testing.assert_array_equal(result.converged, [True, True, False, True, False, True])
+        self.assertEqual(result.iterations[4], 0)
+
+        # the converged nodes match an independent solve of each point
+        for i in np.flatnonzero(result.converged):
+            single = LoadFlowSystem(TOPOLOGY, num_nodes=1)
+            single.params['Load2:P'] = system.params['Load2:P'][i:i+1]
+            ref = newton_solve(single)
+            np.testing.assert_allclose(result.x[i], ref.x[0], rtol=1e-8, atol=1e-6)
+            self.assertEqual(result.iterations[i], ref.iterations)
+
+    def test_limits(self):
+
+        # Gen2 needs Q_out = -0.50e6 at the solution, which is above this Q_max
+        topology = dict(TOPOLOGY, generators=[dict(gen) for gen in TOPOLOGY['generators']])
+        topology['generators'][1]['Q_max'] = -0.6e6
+        system = LoadFlowSystem(topology, num_nodes=2)
+        self.assertIn(('Gen2.Q_out', -0.75e6, -0.6e6), system.limits)
+
+        result = newton_solve(system)
+        self.assertLess(result.norm, 1e-8)
+        self.assertFalse(result.converged)
+        np.testing.assert_array_equal(batched_newton_solve(system).converged, [False, False])
+        self.assertTrue(newton_solve(LoadFlowSystem(TOPOLOGY)).converged)
+
+    def test_linear_guess(self):
+
+        system = LoadFlowSystem(TOPOLOGY, num_nodes=3)
+        system.params['Load2:P'] = np.array([0.5e6, 2.0e6, 3.0e6])
+
+        flat = batched_newton_solve(system)
+        linear = batched_newton_solve(system, x0=system.linear_guess())
+        self.assertTrue(np.all(linear.converged))
+        self.assertTrue(np.all(linear.iterations < flat.iterations))
+        np.testing.assert_allclose(linear.x, flat.x, rtol=1e-6, atol=1e-6)
+
+        # the slack voltage is exact and a singular node gets the flat start
+        x = system.linear_guess()
+        np.testing.assert_allclose(x[:, system.index['Vr_1']], system.params['Gen1:Vm_bus'])
+        system.params['Line1_2:R'][1] = system.params['Line1_2:X'][1] = 0.0
+        x = system.linear_guess()
+        np.testing.assert_array_equal(x[1], system.initial_guess()[1])
+
+        result = solve_load_flow(TOPOLOGY, init='linear')
+        self.assertTrue(result.converged)
+        self.assertLess(result.iterations, solve_load_flow(TOPOLOGY).iterations)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+
+from zappy.LF_solvers.system import LoadFlowSystem
+from zappy.LF_solvers.newton import batched_newton_solve
+from zappy.LF_solvers.streaming import stream_load_flow, write_load_flow
+from zappy.LF_examples.topology_example import TOPOLOGY
+
+
+class StreamLoadFlowTestCase(unittest.TestCase):
+
+    def setUp(self):
+        t = np.linspace(0.0, 1.0, 25)
+        self.profile = {'Load2:P': 2.0e6 + 0.5e6*np.sin(2*np.pi*t), 'Load7:Q': 0.5e6 + 0.2e6*t}
+
+        system = LoadFlowSystem(TOPOLOGY, num_nodes=25)
+        system.params.update(self.profile)
+        self.ref = batched_newton_solve(system)
+        self.assertTrue(np.all(self.ref.converged))
+
+    def test_stream(self):
+
+        chunks = list(stream_load_flow(TOPOLOGY, self.profile, num_nodes=10))
+        self.assertEqual([start for start, result in chunks], [0, 10, 20])
+        self.assertEqual(chunks[-1][1].x.shape[0], 5)
+
+        Vr = np.concatenate([result['Vr_7'] for start, result in chunks])
+        np.testing.assert_allclose(Vr, self.ref['Vr_7'], rtol=1e-8)
+
+        # the warm started chunks need fewer iterations than the flat start
+        iterations = [result.iterations.mean() for start, result in chunks]
+        self.assertLess(iterations[1], self.ref.iterations.mean())
+
+    def test_write(self):
+
+        # the profile arrives as an iterator of pieces and the results go to memmaps
+        pieces = iter([dict((name, val[:12]) for name, val in self.profile.items()),
+                       dict((name, val[12:]) for name, val in self.profile.items())])
+        with tempfile.TemporaryDirectory() as tmp:
+            out = dict((name, np.lib.format.open_memmap(os.path.join(tmp, name.replace(':', '_')+'.npy'),
+                                                        mode='w+', shape=(25,), dtype=dtype))
+                       for name, dtype in [('Vr_7', float), ('Gen1.P_out', float), ('converged', bool)])
+            failed = write_load_flow(TOPOLOGY, pieces, out, num_nodes=8)
+
+            self.assertEqual(failed.size, 0)
+            self.assertTrue(np.all(out['converged']))
+            for name in ['Vr_7', 'Gen1.P_out']:
+                np.testing.assert_allclose(out[name], self.ref[name], rtol=1e-8)
+            del out
+
+    def test_pieces(self):
+
+        # irregular pieces are solved in chunks of num_nodes points with a single system
+        bounds = [0, 3, 10, 11, 25]
+        pieces = [dict((name, val[i:j]) for name, val in self.profile.items()) for i, j in zip(bounds[:-1], bounds[1:])]
+        chunks = list(stream_load_flow(TOPOLOGY, iter(pieces), num_nodes=8))
+
+        self.assertEqual([start for start, result in chunks], [0, 8, 16, 24])
+        self.assertEqual([result.x.shape[0] for start, result in chunks], [8, 8, 8, 1])
+        self.assertEqual(len(set(id(result.system) for start, result in chunks)), 1)
+        self.assertEqual(chunks[-1][1].system.num_nodes, 8)
+
+        Vr = np.concatenate([result['Vr_7'] for start, result in chunks])
+        np.testing.assert_allclose(Vr, self.ref['Vr_7'], rtol=1e-8)
+        self.assertTrue(np.all(np.concatenate([result.converged for start, result in chunks])))
+
+        with self.assertRaises(ValueError):
+            list(stream_load_flow(TOPOLOGY, iter([{'Load2:P': np.ones(3)}, {'Load7:Q': np.ones(3)}])))
+
+    def test_unknown_parameter(self):
+
+        with self.assertRaises(ValueError):
+            list(stream_load_flow(TOPOLOGY, {'Load99:P': np.ones(3)}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import copy
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from zappy.LF_solvers.system import LoadFlowSystem
+from zappy.LF_solvers.structure import StructureCache, STRUCTURES
+from zappy.LF_examples.topology_example import TOPOLOGY
+
+
+class StructureCacheTestCase(unittest.TestCase):
+
+    def test_shared_structure(self):
+
+        system = LoadFlowSystem(TOPOLOGY, num_nodes=3)
+        variant = copy.deepcopy(TOPOLOGY)
+        variant['loads'][0]['P'] *= 2.0
+        other = LoadFlowSystem(variant, num_nodes=5)
+        self.assertIs(system.structure(), other.structure())
+
+        # the cached assembly sums the duplicate entries like a COO matrix would
+        x = system.initial_guess()
+        x[:, 1] += 10.0
+        rows, cols = system.pattern()
+        _, data = system._evaluate(x)
+        nx = system.num_unknowns
+        offset = nx*np.arange(3)[:, np.newaxis]
+        J_ref = sp.coo_matrix((data.ravel(), ((rows+offset).ravel(), (cols+offset).ravel())), shape=(3*nx, 3*nx))
+        J = system.jacobian(x)
+        np.testing.assert_allclose(J.toarray(), J_ref.toarray())
+
+        b = np.arange(3*nx, dtype=float)
+        np.testing.assert_allclose(J @ system.factorize(J).solve(b), b, atol=1e-6)
+
+        # a singular Jacobian gives a non-finite solution
+        self.assertFalse(np.all(np.isfinite(system.factorize(0.0*J).solve(b))))
+
+    def test_fill_reducing_order(self):
+
+        system = LoadFlowSystem(TOPOLOGY, num_nodes=4)
+        J = system.jacobian(system.initial_guess())
+
+        # the cached ordering is as good as a fresh COLAMD ordering of the whole matrix
+        lu = system.factorize(J).lu
+        ref = splu(J.tocsc(), permc_spec='COLAMD')
+        self.assertLessEqual(lu.L.nnz + lu.U.nnz, ref.L.nnz + ref.U.nnz)
+
+    def test_eviction(self):
+
+        cache = StructureCache(maxsize=2)
+        for key in ['a', 'b', 'a', 'c', 'b']:
+            cache.get(key, lambda: object())
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 4)) # 'b' was evicted by 'c'
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertLessEqual(len(STRUCTURES), STRUCTURES.maxsize)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import copy
+import numpy as np
+
+from openmdao.api import Problem
+
+from zappy.LF_elements.builder import LoadFlowNetwork
+from zappy.LF_solvers.system import LoadFlowSystem
+from zappy.LF_solvers.newton import newton_solve, batched_newton_solve, solve_load_flow
+from zappy.LF_solvers.sweep import sweep_solve, radial_feeder
+from zappy.LF_solvers.database import WarmStartDatabase
+from zappy.LF_examples.topology_example import TOPOLOGY
+
+
+def feeder(n, seed=0):
+    # random radial feeder: every bus hangs off one of the five buses before it
+    rng = np.random.RandomState(seed)
+    return {
+        'Vbase': 4160.0, 'Sbase': 1.0e6,
+        'buses': dict((str(i), {'type': 'AC'}) for i in range(n)),
+        'lines': [{'from': str(rng.randint(max(0, i-5), i)), 'to': str(i), 'R': 0.01*rng.uniform(1, 3), 'X': 0.008}
+                  for i in range(1, n)],
+        'generators': [{'bus': '0', 'mode': 'Slack', 'Vm': 4160.0, 'thetaV': 0.0, 'P_guess': -1.0e6}],
+        'loads': [{'bus': str(i), 'P': 2.0e3*rng.uniform(0.5, 2.0), 'Q': 5.0e2} for i in range(1, n)],
+    }
+
+
+class SweepTestCase(unittest.TestCase):
+
+    def test_feeder(self):
+
+        topology = feeder(60)
+        system = LoadFlowSystem(topology, num_nodes=3)
+        system.params['Load5:P'] = np.array([1.0e3, 2.0e4, 5.0e4])
+        self.assertIsNotNone(radial_feeder(system))
+
+        result = sweep_solve(system, atol=1e-10)
+        ref = batched_newton_solve(system, atol=1e-10)
+        self.assertTrue(np.all(result.converged))
+        for name in ['Vr_59', 'Vi_59', 'LG1:Ir', 'Gen1.P_out', 'Line0_1.P_loss']:
+            np.testing.assert_allclose(result[name], ref[name], rtol=1e-8, atol=1e-6)
+
+        # the residual norm of the sweep is the norm of the system
+        np.testing.assert_allclose(result.norm, np.linalg.norm(system.residuals(result.x)/system.res_ref, axis=1),
+                                   rtol=1e-6, atol=1e-11)
+
+    def test_guess(self):
+
+        topology = feeder(60)
+        flat = solve_load_flow(topology, atol=1e-10)
+        sweep = solve_load_flow(topology, init='sweep', atol=1e-10)
+        self.assertLess(sweep.iterations, flat.iterations)
+        # Vi_0 of the slack bus is zero up to roundoff, which rtol alone can not compare
+        np.testing.assert_allclose(sweep.x, flat.x, rtol=1e-8, atol=1e-10)
+
+        prob = Problem(reports=None)
+        prob.model.add_subsystem('sys', LoadFlowNetwork(num_nodes=1, topology=topology, initializer='sweep'),
+                                 promotes=['*'])
+        prob.set_solver_print(level=-1)
+        prob.setup(check=False)
+        prob.run_model()
+        self.assertLessEqual(prob.model.sys.nonlinear_solver._iter_count, 1)
+        np.testing.assert_allclose(prob['Vr_59'], flat['Vr_59'], rtol=1e-6)
+
+    def test_start(self):
+
+        # a start off the solution, with the slack bus at the wrong voltage
+        system = LoadFlowSystem(feeder(30))
+        x0 = system.initial_guess()*0.97
+        result = sweep_solve(system, x0=x0, atol=1e-10)
+        ref = newton_solve(system, atol=1e-10)
+        self.assertTrue(np.all(result.converged))
+        np.testing.assert_allclose(result.norm, np.linalg.norm(system.residuals(result.x)/system.res_ref, axis=1))
+        self.assertLess(result.norm[0], 1e-10)
+        np.testing.assert_allclose(result['Vr_0'], 4160.0)
+        np.testing.assert_allclose(result['Vr_29'], ref['Vr_29'], rtol=1e-8)
+
+        # the stored solutions of other slack voltages as the start
+        topology = feeder(30)
+        db = WarmStartDatabase(topology)
+        for Vm in [4000.0, 4100.0]:
+            variant = copy.deepcopy(topology)
+            variant['generators'][0]['Vm'] = Vm
+            solve_load_flow(variant, database=db, method='sweep')
+        result = solve_load_flow(topology, database=db, method='sweep')
+        self.assertTrue(np.all(result.converged))
+        np.testing.assert_allclose(result['Vr_0'], 4160.0)
+
+    def test_chain(self):
+
+        # a deep feeder, every bus hangs off the one before it
+        n = 4000
+        topology = feeder(n)
+        for i, line in enumerate(topology['lines']):
+            line['from'], line['R'], line['X'] = str(i), 1.0e-4, 5.0e-5
+        system = LoadFlowSystem(topology, num_nodes=2)
+        system.params['Load5:P'] = np.array([1.0e3, 2.0e4])
+
+        feeder_ = radial_feeder(system)
+        self.assertEqual(len(feeder_.levels), n - 1)
+        result = sweep_solve(system, atol=1e-10)
+        ref = batched_newton_solve(system)
+        self.assertTrue(np.all(result.converged))
+        np.testing.assert_allclose(result['Vr_'+str(n-1)], ref['Vr_'+str(n-1)], rtol=1e-8)
+
+    def test_meshed(self):
+
+        # a loop or other elements fall back to Newton's method
+        topology = feeder(20)
+        topology['lines'].append({'from': '3', 'to': '17', 'R': 0.02, 'X': 0.01})
+        for topo in [topology, TOPOLOGY]:
+            system = LoadFlowSystem(topo)
+            self.assertIsNone(radial_feeder(system))
+            result = sweep_solve(system)
+            np.testing.assert_allclose(result.x, newton_solve(system).x)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,19 +1,24 @@
+import numpy as np
+
 from openmdao.api import ImplicitComponent
 
 class Node(ImplicitComponent):
 
     def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int)
         self.options.declare('connect_names', default=['in', 'out'], desc='names of electrical connections to the node')
 
     def setup(self):
 
+        nn = self.options['num_nodes']
         connect_names = self.options['connect_names']
+        ar = np.arange(nn)
 
-        self.add_output('V', val=1.0, units='V', desc='voltage at node')
+        self.add_output('V', val=np.ones(nn), units='V', desc='voltage at node')
 
         for name in connect_names:
-            self.add_input(name+':I', val=0.0, units='A', desc='current from connection')
-            self.declare_partials('V', name+':I')
+            self.add_input(name+':I', val=np.zeros(nn), units='A', desc='current from connection')
+            self.declare_partials('V', name+':I', rows=ar, cols=ar, val=1.0)
 
     def apply_nonlinear(self, inputs, outputs, resids):
 
@@ -22,10 +27,3 @@ class Node(ImplicitComponent):
 
         for name in connect_names:
             resids['V'] += inputs[name+':I']
-
-    def linearize(self, inputs, outputs, J):
-
-        connect_names = self.options['connect_names']
-
-        for name in connect_names:
-            J['V', name+':I'] = 1.0
\ No newline at end of file
@@ -1,17 +1,25 @@
+import numpy as np
+
 from openmdao.api import ExplicitComponent
 
 class Resistor(ExplicitComponent):
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int)
+
     def setup(self):
 
-        self.add_input('V_in', val=0.0, units='V', desc='voltage on one end of the resistor')
-        self.add_input('V_out', val=0.0, units='V', desc='voltage at the other end of the resistor')
-        self.add_input('R', val=0.0, units='ohm', desc='resistance')
+        nn = self.options['num_nodes']
+
+        self.add_input('V_in', val=np.zeros(nn), units='V', desc='voltage on one end of the resistor')
+        self.add_input('V_out', val=np.zeros(nn), units='V', desc='voltage at the other end of the resistor')
+        self.add_input('R', val=np.ones(nn), units='ohm', desc='resistance')
 
-        self.add_output('I_in', val=0.0, units='A', desc='current entering the resistor')
-        self.add_output('I_out', val=0.0, units='A', desc='current leaving the resistor')
+        self.add_output('I_in', val=np.zeros(nn), units='A', desc='current entering the resistor')
+        self.add_output('I_out', val=np.zeros(nn), units='A', desc='current leaving the resistor')
 
-        self.declare_partials('*', '*')
+        ar = np.arange(nn)
+        self.declare_partials('*', '*', rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
 
@@ -43,7 +51,7 @@ if __name__ == '__main__':
     des_vars.add_output('R', 5.0, units='ohm')
 
     p.setup(check=False)
-    p.run()
+    p.run_model()
 
     print(p['I_in'], p['I_out'])
 
@@ -0,0 +1,195 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+
+from openmdao.api import ImplicitComponent
+
+def incidence_matrix(nodes, resistors):
+    """
+    Builds the sparse (resistor, node) incidence matrix of a list of (from_node, to_node)
+    resistors, with +1 at the from node and -1 at the to node of every resistor.
+    """
+    idx = dict((name, i) for i, name in enumerate(nodes))
+    for ends in resistors:
+        for name in ends:
+            if name not in idx:
+                raise ValueError("node '{}' is not defined in the network.".format(name))
+        if ends[0] == ends[1]:
+            raise ValueError("resistor {} connects node '{}' to itself.".format(tuple(ends), ends[0]))
+
+    nr = len(resistors)
+    f = np.array([idx[r[0]] for r in resistors], dtype=int)
+    t = np.array([idx[r[1]] for r in resistors], dtype=int)
+    rows = np.concatenate([np.arange(nr), np.arange(nr)])
+    vals = np.concatenate([np.ones(nr), -np.ones(nr)])
+
+    return sp.coo_matrix((vals, (rows, np.concatenate([f, t]))), shape=(nr, len(nodes))).tocsr()
+
+def _pattern(rows, cols, res, vals, n_cols, n_res):
+    """
+    Returns the unique (row, col) entries of a sparse matrix that is the sum of the given
+    entries, each the conductance of resistor res times vals, and the sparse matrix that
+    maps the n_res conductances to the data of those entries.
+    """
+    key, inv = np.unique(rows*n_cols + cols, return_inverse=True)
+    M = sp.csr_matrix((vals, (inv, res)), shape=(key.size, n_res))
+    return key // n_cols, key % n_cols, M
+
+class ResistorNetwork(ImplicitComponent):
+    """
+    Solves a linear resistor network by nodal analysis, G*V = I, in place of one Node per
+    node and one Resistor per resistor.
+
+    The voltages of the free nodes are the output V and the voltages of the fixed nodes
+    (at least one in every connected part of the network) are the input V_fixed. The input
+    I is the current injected into every free node and R the resistance of every resistor,
+    all indexed by (node, position in the option list). The sparsity of the conductance
+    matrix G is found once in setup. For every new R, G is factorized once, for all the
+    nodes as a block diagonal matrix, and the factors are reused by solve_linear for the
+    derivatives with respect to R, I and V_fixed.
+    """
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int)
+        self.options.declare('nodes', types=list, desc='Names of the nodes whose voltage is solved for')
+        self.options.declare('fixed', default=[], types=list, desc='Names of the nodes whose voltage is given')
+        self.options.declare('resistors', types=list, desc='List of (from_node, to_node) tuples')
+
+    def setup(self):
+
+        nn = self.options['num_nodes']
+        nodes, fixed = self.options['nodes'], self.options['fixed']
+        nf, nr = len(nodes), len(self.options['resistors'])
+
+        self.A = A = incidence_matrix(nodes + fixed, self.options['resistors'])
+        n_parts, part = connected_components(A.T @ A, directed=False)
+        grounded = np.zeros(n_parts, dtype=bool)
+        grounded[part[nf:]] = True
+        if not np.all(grounded[part[:nf]]):
+            floating = [n for n, p in zip(nodes, part) if not grounded[p]]
+            raise ValueError('nodes {} are not connected to a fixed node.'.format(', '.join(floating)))
+
+        self.add_input('R', val=np.ones((nn, nr)), units='ohm', desc='Resistance of every resistor')
+        self.add_input('I', val=np.zeros((nn, nf)), units='A', desc='Current injected into every free node')
+        if fixed:
+            self.add_input('V_fixed', val=np.zeros((nn, len(fixed))), units='V', desc='Voltage of every fixed node')
+        self.add_output('V', val=np.zeros((nn, nf)), units='V', res_units='A', desc='Voltage of every free node')
+
+        # the entries of G = A.T*diag(1/R)*A, split into the free and fixed columns
+        idx = dict((name, i) for i, name in enumerate(nodes + fixed))
+        f = np.array([idx[r[0]] for r in self.options['resistors']], dtype=int)
+        t = np.array([idx[r[1]] for r in self.options['resistors']], dtype=int)
+        rows = np.concatenate([f, t, f, t])
+        cols = np.concatenate([f, t, t, f])
+        res = np.tile(np.arange(nr), 4)
+        sign = np.concatenate([np.ones(2*nr), -np.ones(2*nr)])
+
+        k = np.arange(nn)[:, np.newaxis]
+        free = (rows < nf) & (cols < nf)
+        r, c, self._M_free = _pattern(rows[free], cols[free], res[free], sign[free], nf, nr)
+        self._rows, self._cols = (r + nf*k).ravel(), (c + nf*k).ravel()
+        self.declare_partials('V', 'V', rows=self._rows, cols=self._cols)
+
+        self.declare_partials('V', 'I', rows=np.arange(nn*nf), cols=np.arange(nn*nf), val=-1.0)
+
+        if fixed:
+            nx = len(fixed)
+            mixed = (rows < nf) & (cols >= nf)
+            r, c, self._M_fixed = _pattern(rows[mixed], cols[mixed] - nf, res[mixed], sign[mixed], nx, nr)
+            self.declare_partials('V', 'V_fixed', rows=(r + nf*k).ravel(), cols=(c + nx*k).ravel())
+
+        # resistor e changes the residuals of its free ends only
+        end_node, end_res = np.concatenate([f, t]), np.tile(np.arange(nr), 2)
+        self._end_sign = np.concatenate([np.ones(nr), -np.ones(nr)])[end_node < nf]
+        self._end_node, self._end_res = end_node[end_node < nf], end_res[end_node < nf]
+        self.declare_partials('V', 'R', rows=(self._end_node + nf*k).ravel(), cols=(self._end_res + nr*k).ravel())
+
+        self._lu = None
+        self._lu_R = None
+
+    def _voltages(self, inputs, outputs):
+        if self.options['fixed']:
+            return np.concatenate([outputs['V'], inputs['V_fixed']], axis=1)
+        return outputs['V']
+
+    def _factorize(self, R):
+        """
+        Returns the LU factors of the block diagonal conductance matrix for the
+        resistances R, refactorizing only when R has changed.
+        """
+        if self._lu is None or not np.array_equal(R, self._lu_R):
+            n = R.shape[0]*len(self.options['nodes'])
+            data = (self._M_free @ (1.0/R).T).T.ravel()
+            self._lu = splu(sp.csc_matrix((data, (self._rows, self._cols)), shape=(n, n)))
+            self._lu_R = R.copy()
+        return self._lu
+
+    def apply_nonlinear(self, inputs, outputs, resids):
+
+        nf = len(self.options['nodes'])
+        I_res = (self.A @ self._voltages(inputs, outputs).T).T/inputs['R']
+        resids['V'] = (self.A.T @ I_res.T).T[:, :nf] - inputs['I']
+
+    def solve_nonlinear(self, inputs, outputs):
+
+        nf = len(self.options['nodes'])
+        lu = self._factorize(inputs['R'])
+
+        # the currents into the resistors from the free nodes at zero voltage
+        outputs['V'] = 0.0
+        I_res = (self.A @ self._voltages(inputs, outputs).T).T/inputs['R']
+        I0 = (self.A.T @ I_res.T).T[:, :nf]
+        outputs['V'] = lu.solve((inputs['I'] - I0).ravel()).reshape(-1, nf)
+
+    def linearize(self, inputs, outputs, J):
+
+        g = 1.0/inputs['R']
+        self._factorize(inputs['R'])
+
+        J['V', 'V'] = (self._M_free @ g.T).T.ravel()
+        if self.options['fixed']:
+            J['V', 'V_fixed'] = (self._M_fixed @ g.T).T.ravel()
+
+        dV = (self.A @ self._voltages(inputs, outputs).T).T
+        J['V', 'R'] = -(self._end_sign*(g**2*dV)[:, self._end_res]).ravel()
+
+    def solve_linear(self, d_outputs, d_residuals, mode):
+
+        nf = len(self.options['nodes'])
+        if mode == 'fwd':
+            d_outputs['V'] = self._lu.solve(d_residuals['V'].ravel()).reshape(-1, nf)
+        else:
+            d_residuals['V'] = self._lu.solve(d_outputs['V'].ravel(), trans='T').reshape(-1, nf)
+
+    def currents(self):
+        """
+        Returns the current through every resistor, from its from node to its to node, as
+        an array of shape (num_nodes, number of resistors), at the present solution.
+        """
+        V = self.get_val('V')
+        if self.options['fixed']:
+            V = np.concatenate([V, self.get_val('V_fixed')], axis=1)
+        return (self.A @ V.T).T/self.get_val('R')
+
+if __name__ == "__main__":
+    from openmdao.api import Problem, Group, IndepVarComp
+
+    p = Problem()
+    p.model = Group()
+    des_vars = p.model.add_subsystem('des_vars', IndepVarComp(), promotes=['*'])
+
+    # Example 2.8 in Electrical Engineering by Hambley, see NV_examples/example1.py
+    des_vars.add_output('R', np.array([[10.0, 5.0, 10.0, 5.0, 20.0]]), units='ohm')
+    des_vars.add_output('I', np.array([[0.0, 10.0, 0.0]]), units='A')
+
+    resistors = [('0', '1'), ('1', '2'), ('2', '3'), ('0', '3'), ('1', '3')]
+    p.model.add_subsystem('net', ResistorNetwork(nodes=['1', '2', '3'], fixed=['0'], resistors=resistors),
+                          promotes=['*'])
+
+    p.setup(check=False)
+    p.run_model()
+
+    print('V', p['V'])
+    print('I', p.model.net.currents())
+
+    p.check_partials(compact_print=True)
@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+
+from openmdao.api import Problem
+from openmdao.utils.assert_utils import assert_check_partials
+
+from zappy.NV_elements.node import Node
+from zappy.NV_elements.resistor import Resistor
+from zappy.NV_elements.thermal_mass import ThermalMass
+from zappy.NV_elements.wire import Wire, WirePerf
+
+NN = 3
+
+WIRE = {'length': [1.0, 2.0, 5.0], 'dia': [0.01, 0.005, 0.02], 'density': 8960., 'I_in': [20., -10., 150.],
+        'V_in': 50., 'P_in': 1000., 'rho': 1.72e-8, 'T_f': 300., 'T_b': [400., 310., 290.], 'h': 7., 'c_p': 385.}
+
+
+def run(comp, values):
+    prob = Problem(reports=None)
+    prob.model.add_subsystem('comp', comp, promotes=['*'])
+    prob.set_solver_print(level=-1)
+    prob.setup(check=False, force_alloc_complex=True)
+    for name, val in values.items():
+        prob[name] = val
+    prob.run_model()
+    return prob
+
+
+class NVElementsTestCase(unittest.TestCase):
+
+    def assert_partials(self, comp, values):
+        prob = run(comp, values)
+        data = prob.check_partials(method='cs', compact_print=True, out_stream=None)
+        assert_check_partials(data, atol=1e-8, rtol=1e-8)
+
+    def test_partials(self):
+
+        self.assert_partials(Node(num_nodes=NN, connect_names=['a', 'b', 'c']),
+                             {'a:I': [1., 2., 3.], 'b:I': [-1., 0., 4.], 'c:I': 2.})
+        self.assert_partials(Resistor(num_nodes=NN), {'V_in': [10., 0., -3.], 'V_out': [9., 5., 1.], 'R': [5., 0.1, 2.]})
+        self.assert_partials(ThermalMass(num_nodes=NN), {'h': [10., 5., 0.], 'T_b': [350., 300., 250.],
+                                                         'Qdot_in': [100., 0., 50.], 'mass': [1., 2., 3.]})
+        self.assert_partials(Wire(num_nodes=NN), WIRE)
+
+    def test_thermal_mass(self):
+
+        prob = run(ThermalMass(num_nodes=2), {'T_b': [400., 250.], 'T_f': 300., 'h': 7., 'mass': 5., 'c_p': 48.})
+
+        # a body hotter than the fluid loses heat and cools down
+        np.testing.assert_allclose(prob['Qdot_out'], [700., -350.])
+        np.testing.assert_allclose(prob['dTdt'], [-700./240., 350./240.])
+
+    def test_vectorized_wire(self):
+
+        prob = run(Wire(num_nodes=NN), WIRE)
+
+        for i in range(NN):
+            point = dict((name, np.broadcast_to(val, NN)[i]) for name, val in WIRE.items())
+            single = run(Wire(num_nodes=1), point)
+            for name in ['R', 'V_out', 'P_out', 'Qdot_elec', 'dTdt']:
+                np.testing.assert_allclose(prob[name][i], single[name][0], rtol=1e-12)
+
+    def test_wire_perf(self):
+
+        prob = run(WirePerf(num_nodes=NN), dict((name, WIRE[name]) for name in ['length', 'dia', 'I_in', 'V_in', 'P_in', 'rho']))
+
+        R = 4.0*1.72e-8*np.array(WIRE['length'])/(np.pi*np.array(WIRE['dia'])**2)
+        I = np.array(WIRE['I_in'])
+        np.testing.assert_allclose(prob['R'], R)
+        np.testing.assert_allclose(prob['V_out'], 50. - I*R)
+        np.testing.assert_allclose(prob['Qdot_elec'], I**2*R)
+        np.testing.assert_allclose(prob['P_out'], 1000. - prob['Qdot_elec'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import importlib
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import spsolve
+
+from openmdao.api import Problem, IndepVarComp
+from openmdao.utils.assert_utils import assert_check_partials
+
+from zappy.NV_elements.resistor_network import ResistorNetwork
+
+
+UNITS = {'R': 'ohm', 'I': 'A', 'V_fixed': 'V'}
+
+
+def build(nodes, fixed, resistors, values, num_nodes=1):
+    prob = Problem(reports=None)
+    des_vars = prob.model.add_subsystem('des_vars', IndepVarComp(), promotes=['*'])
+    for name, val in values.items():
+        des_vars.add_output(name, val, units=UNITS[name])
+    prob.model.add_subsystem('net', ResistorNetwork(num_nodes=num_nodes, nodes=nodes, fixed=fixed, resistors=resistors),
+                             promotes=['*'])
+    prob.set_solver_print(level=-1)
+    prob.setup(check=False, force_alloc_complex=True)
+    prob.run_model()
+    return prob
+
+
+def solve_example(module):
+    Example = importlib.import_module('zappy.NV_examples.'+module).Example
+
+    prob = Problem(reports=None)
+    prob.model.add_subsystem('sys', Example(), promotes=['*'])
+    prob.set_solver_print(level=-1)
+    prob.setup(check=False)
+    prob.run_model()
+    return prob
+
+
+class ResistorNetworkTestCase(unittest.TestCase):
+
+    def test_example1(self):
+
+        ref = solve_example('example1')
+
+        resistors = [('0', '1'), ('1', '2'), ('2', '3'), ('0', '3'), ('1', '3')]
+        prob = build(['1', '2', '3'], ['0'], resistors,
+                     {'R': np.array([[10., 5., 10., 5., 20.]]), 'I': np.array([[0., 10., 0.]])})
+
+        for i in range(3):
+            np.testing.assert_allclose(prob['V'][0, i], ref['V_{}'.format(i+1)][0], rtol=1e-10)
+        currents = prob.model.net.currents()
+        for i in range(5):
+            np.testing.assert_allclose(currents[0, i], ref['R{}.I_out'.format(i+1)][0], rtol=1e-10)
+
+    def test_example2(self):
+
+        ref = solve_example('example2')
+
+        resistors = [('1', '3'), ('1', '2'), ('2', '3'), ('0', '2'), ('0', '3')]
+        prob = build(['2', '3'], ['0', '1'], resistors,
+                     {'R': np.array([[10., 2., 10., 5., 5.]]), 'V_fixed': np.array([[0., 10.]])})
+
+        np.testing.assert_allclose(prob['V'][0], [ref['V_2'][0], ref['V_3'][0]], rtol=1e-10)
+
+    def test_derivatives(self):
+
+        resistors = [('0', '1'), ('1', '2'), ('2', '3'), ('0', '3'), ('1', '3'), ('4', '2')]
+        values = {'R': np.array([[10., 5., 10., 5., 20., 1.], [1., 2., 3., 4., 5., 6.]]),
+                  'I': np.array([[0., 10., 0.], [1., -2., 3.]]),
+                  'V_fixed': np.array([[0., 5.], [1., 0.]])}
+        prob = build(['1', '2', '3'], ['0', '4'], resistors, values, num_nodes=2)
+
+        data = prob.check_partials(method='cs', compact_print=True, out_stream=None)
+        assert_check_partials(data, atol=1e-10, rtol=1e-10)
+
+        data = prob.check_totals(of=['V'], wrt=['R', 'I', 'V_fixed'], method='cs', out_stream=None)
+        for key, val in data.items():
+            self.assertLess(val['rel error'].forward, 1e-10, key)
+
+    def test_factorization_reuse(self):
+
+        prob = build(['1', '2'], ['0'], [('0', '1'), ('1', '2'), ('0', '2')], {'R': np.array([[1., 2., 3.]])})
+        net = prob.model.net
+        lu = net._lu
+
+        prob['I'] = np.array([[1., 2.]])
+        prob.run_model()
+        prob.compute_totals(of=['V'], wrt=['I'])
+        self.assertIs(net._lu, lu)
+
+        prob['R'] = np.array([[1., 2., 4.]])
+        prob.run_model()
+        self.assertIsNot(net._lu, lu)
+
+    def test_grid(self):
+
+        # a 100x100 mesh grounded at one corner with a current drawn at the other
+        n = 100
+        name = lambda i, j: '{}_{}'.format(i, j)
+        resistors = [(name(i, j), name(i+1, j)) for i in range(n-1) for j in range(n)]
+        resistors += [(name(i, j), name(i, j+1)) for i in range(n) for j in range(n-1)]
+        nodes = [name(i, j) for i in range(n) for j in range(n) if (i, j) != (0, 0)]
+        R = 1.0 + np.arange(len(resistors)) % 7 * 0.1
+        I = np.zeros(len(nodes))
+        I[-1] = -1.0
+
+        prob = build(nodes, [name(0, 0)], resistors, {'R': R[np.newaxis], 'I': I[np.newaxis]})
+
+        idx = dict((b, k) for k, b in enumerate(nodes))
+        f = np.array([idx.get(r[0], -1) for r in resistors])
+        t = np.array([idx.get(r[1], -1) for r in resistors])
+        G = sp.lil_matrix((len(nodes), len(nodes)))
+        for a, b, g in zip(f, t, 1.0/R):
+            for p, q in [(a, b), (b, a)]:
+                if p >= 0:
+                    G[p, p] += g
+                    if q >= 0:
+                        G[p, q] -= g
+        np.testing.assert_allclose(prob['V'][0], spsolve(G.tocsc(), I), rtol=1e-10, atol=1e-12)
+
+    def test_bad_network(self):
+
+        with self.assertRaises(ValueError) as cm:
+            build(['1', '2', '3'], ['0'], [('0', '1'), ('2', '3')], {})
+        self.assertEqual(str(cm.exception), 'nodes 2, 3 are not connected to a fixed node.')
+
+        with self.assertRaises(ValueError) as cm:
+            build(['1'], ['0'], [('0', '1'), ('1', '5')], {})
+        self.assertEqual(str(cm.exception), "node '5' is not defined in the network.")
+
+
+if __name__ == "__main__":
+    unittest.main()
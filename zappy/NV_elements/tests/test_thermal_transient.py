@@ -0,0 +1,96 @@
+import unittest
+import numpy as np
+
+from openmdao.api import Problem
+from openmdao.utils.assert_utils import assert_check_partials
+
+from zappy.NV_elements.thermal_transient import ThermalTransient
+from zappy.NV_elements.wire import Wire
+
+
+def run(comp, values):
+    prob = Problem(reports=None)
+    prob.model.add_subsystem('comp', comp, promotes=['*'])
+    prob.set_solver_print(level=-1)
+    prob.setup(check=False, force_alloc_complex=True)
+    for name, val in values.items():
+        prob[name] = val
+    prob.run_model()
+    return prob
+
+
+def exact(t, T0=300., T_f=273., Qdot=100., h=7., area=1., mass=5., c_p=48.):
+    T_inf = T_f + Qdot/(h*area)
+    return T_inf + (T0 - T_inf)*np.exp(-h*area*t/(mass*c_p))
+
+
+class ThermalTransientTestCase(unittest.TestCase):
+
+    def error(self, method, nn):
+        t = np.linspace(0.0, 300.0, nn)
+        prob = run(ThermalTransient(num_nodes=nn, method=method),
+                   {'time': t, 'T_initial': 300., 'T_f': 273., 'Qdot_in': 100., 'h': 7., 'mass': 5., 'c_p': 48.})
+        return np.max(abs(prob['T'] - exact(t)))
+
+    def test_convergence(self):
+
+        # first order for implicit Euler, second order for the trapezoidal rule
+        self.assertAlmostEqual(self.error('implicit_euler', 51)/self.error('implicit_euler', 101), 2.0, delta=0.1)
+        self.assertAlmostEqual(self.error('trapezoidal', 51)/self.error('trapezoidal', 101), 4.0, delta=0.1)
+        self.assertLess(self.error('trapezoidal', 101), 1e-2)
+
+    def test_derivatives(self):
+
+        nn = 6
+        values = {'time': [0., 10., 25., 30., 60., 100.], 'T_initial': 320., 'T_f': [273., 280., 290., 280., 275., 270.],
+                  'Qdot_in': [100., 200., 0., 50., 400., 10.], 'h': [7., 8., 9., 10., 5., 7.], 'area': [1., 1., 1.1, 1.2, 1., 0.9],
+                  'mass': [5., 5., 5., 4., 4., 4.], 'c_p': [48., 48., 50., 50., 52., 52.]}
+
+        for method in ['implicit_euler', 'trapezoidal']:
+            prob = run(ThermalTransient(num_nodes=nn, method=method), values)
+
+            data = prob.check_partials(method='cs', compact_print=True, out_stream=None)
+            assert_check_partials(data, atol=1e-8, rtol=1e-8)
+
+            for mode in ['fwd', 'rev']:
+                prob.setup(check=False, force_alloc_complex=True, mode=mode)
+                for name, val in values.items():
+                    prob[name] = val
+                prob.run_model()
+                data = prob.check_totals(of=['T'], wrt=['T_initial', 'Qdot_in', 'h', 'time'], method='cs', out_stream=None)
+                for key, val in data.items():
+                    self.assertLess(val['rel error'].forward, 1e-8, key)
+
+    def test_single_point(self):
+
+        for mode in ['fwd', 'rev']:
+            prob = Problem(reports=None)
+            prob.model.add_subsystem('comp', ThermalTransient(num_nodes=1), promotes=['*'])
+            prob.set_solver_print(level=-1)
+            prob.setup(check=False, force_alloc_complex=True, mode=mode)
+            prob['T_initial'] = 320.
+            prob['Qdot_in'] = 100.
+            prob.run_model()
+
+            # the temperature is the initial one
+            self.assertEqual(prob['T'][0], 320.)
+            totals = prob.compute_totals(of=['T'], wrt=['T_initial', 'Qdot_in'])
+            self.assertEqual(totals['T', 'T_initial'][0, 0], 1.0)
+            self.assertEqual(totals['T', 'Qdot_in'][0, 0], 0.0)
+
+    def test_wire(self):
+
+        nn = 201
+        values = {'time': np.linspace(0.0, 2.0e4, nn), 'T_initial': 300., 'length': 1.0, 'dia': 0.001,
+                  'density': 8960., 'I_in': 20., 'rho': 1.72e-8, 'T_f': 300., 'h': 10., 'c_p': 385.}
+        prob = run(Wire(num_nodes=nn, transient=True, method='trapezoidal'), values)
+
+        # the wire heats up from the initial temperature towards its steady state
+        T_inf = 300. + prob['Qdot_elec'][0]/(10.*prob['area'][0])
+        self.assertEqual(prob['T'][0], 300.)
+        self.assertGreater(prob['T'][1], prob['T'][0])
+        np.testing.assert_allclose(prob['T'][-1], T_inf, rtol=1e-4)
+
+
+if __name__ == "__main__":
+    unittest.main()
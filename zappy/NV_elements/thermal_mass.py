@@ -1,3 +1,5 @@
+import numpy as np
+
 from openmdao.api import ExplicitComponent
 
 
@@ -6,44 +8,50 @@ class ThermalMass(ExplicitComponent):
     Calculates the the convective heat transfer and temperture rise of an object.
     """
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int)
+
     def setup(self):
 
-        self.add_input('area', val=1.0, units='m**2', desc='Surface area for convective heat transfer')
-        self.add_input('mass', val=1.0, units='kg', desc='Mass of the object')
-        self.add_input('T_f', val=300.0, units='K', desc='Temperature of fluid used in convective heat transfer')
-        self.add_input('T_b', val=300.0, units='K', desc='Temperature of the body')
-        self.add_input('h', val=0.0, units='W/(m**2*K)', desc='Heat transfer coefficient')
-        self.add_input('c_p', val=1.0, units='J/(K*kg)', desc='Specific heat capacity of the object')
-        self.add_input('Qdot_in', val=0.0, units='W', desc='Heat generated by the object')
+        nn = self.options['num_nodes']
 
-        self.add_output('Qdot_out', val=0.0, units='W', desc='Heat lost by the object due to convection')
-        self.add_output('dTdt', val=0.0, units='K/s', desc='Rate of temperature change of object')
+        self.add_input('area', val=np.ones(nn), units='m**2', desc='Surface area for convective heat transfer')
+        self.add_input('mass', val=np.ones(nn), units='kg', desc='Mass of the object')
+        self.add_input('T_f', val=300.0*np.ones(nn), units='K', desc='Temperature of fluid used in convective heat transfer')
+        self.add_input('T_b', val=300.0*np.ones(nn), units='K', desc='Temperature of the body')
+        self.add_input('h', val=np.zeros(nn), units='W/(m**2*K)', desc='Heat transfer coefficient')
+        self.add_input('c_p', val=np.ones(nn), units='J/(K*kg)', desc='Specific heat capacity of the object')
+        self.add_input('Qdot_in', val=np.zeros(nn), units='W', desc='Heat generated by the object')
 
-        self.declare_partials('Qdot_out', ['h', 'area', 'T_f', 'T_b'])
-        self.declare_partials('dTdt', '*')
+        self.add_output('Qdot_out', val=np.zeros(nn), units='W', desc='Heat lost by the object due to convection')
+        self.add_output('dTdt', val=np.zeros(nn), units='K/s', desc='Rate of temperature change of object')
+
+        ar = np.arange(nn)
+        self.declare_partials('Qdot_out', ['h', 'area', 'T_f', 'T_b'], rows=ar, cols=ar)
+        self.declare_partials('dTdt', '*', rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
-        
-        outputs['Qdot_out'] = inputs['h']*inputs['area']*(inputs['T_f']-inputs['T_b'])
+
+        outputs['Qdot_out'] = inputs['h']*inputs['area']*(inputs['T_b']-inputs['T_f'])
         outputs['dTdt'] = (inputs['Qdot_in']-outputs['Qdot_out'])/(inputs['mass']*inputs['c_p'])
 
     def compute_partials(self, inputs, J):
 
-        J['Qdot_out', 'h'] = inputs['area']*(inputs['T_f']-inputs['T_b'])
-        J['Qdot_out', 'area'] = inputs['h']*(inputs['T_f']-inputs['T_b'])
-        J['Qdot_out', 'T_f'] = inputs['h']*inputs['area']
-        J['Qdot_out', 'T_b'] = -inputs['h']*inputs['area']
+        J['Qdot_out', 'h'] = inputs['area']*(inputs['T_b']-inputs['T_f'])
+        J['Qdot_out', 'area'] = inputs['h']*(inputs['T_b']-inputs['T_f'])
+        J['Qdot_out', 'T_f'] = -inputs['h']*inputs['area']
+        J['Qdot_out', 'T_b'] = inputs['h']*inputs['area']
 
         J['dTdt', 'Qdot_in'] = 1.0/(inputs['mass']*inputs['c_p'])
-        J['dTdt', 'h'] = -inputs['area']*(inputs['T_f']-inputs['T_b'])/(inputs['mass']*inputs['c_p'])
-        J['dTdt', 'area'] = -inputs['h']*(inputs['T_f']-inputs['T_b'])/(inputs['mass']*inputs['c_p'])
-        J['dTdt', 'T_f'] = -inputs['h']*inputs['area']/(inputs['mass']*inputs['c_p'])
-        J['dTdt', 'T_b'] = inputs['h']*inputs['area']/(inputs['mass']*inputs['c_p'])
-        J['dTdt', 'mass'] = -(inputs['Qdot_in']-inputs['h']*inputs['area']*(inputs['T_f']-inputs['T_b']))/(inputs['mass']**2*inputs['c_p'])
-        J['dTdt', 'c_p'] = -(inputs['Qdot_in']-inputs['h']*inputs['area']*(inputs['T_f']-inputs['T_b']))/(inputs['mass']*inputs['c_p']**2)
+        J['dTdt', 'h'] = -inputs['area']*(inputs['T_b']-inputs['T_f'])/(inputs['mass']*inputs['c_p'])
+        J['dTdt', 'area'] = -inputs['h']*(inputs['T_b']-inputs['T_f'])/(inputs['mass']*inputs['c_p'])
+        J['dTdt', 'T_f'] = inputs['h']*inputs['area']/(inputs['mass']*inputs['c_p'])
+        J['dTdt', 'T_b'] = -inputs['h']*inputs['area']/(inputs['mass']*inputs['c_p'])
+        J['dTdt', 'mass'] = -(inputs['Qdot_in']-inputs['h']*inputs['area']*(inputs['T_b']-inputs['T_f']))/(inputs['mass']**2*inputs['c_p'])
+        J['dTdt', 'c_p'] = -(inputs['Qdot_in']-inputs['h']*inputs['area']*(inputs['T_b']-inputs['T_f']))/(inputs['mass']*inputs['c_p']**2)
 
 if __name__ == "__main__":
-    from openmdao.api import Problem, IndepVarComp
+    from openmdao.api import Problem, Group, IndepVarComp
 
     p = Problem()
     p.model = Group()
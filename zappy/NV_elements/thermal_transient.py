@@ -0,0 +1,172 @@
+import numpy as np
+from scipy.linalg import solve_banded
+
+from openmdao.api import ImplicitComponent
+
+PARAMS = ('Qdot_in', 'T_f', 'h', 'area', 'mass', 'c_p')
+
+class ThermalTransient(ImplicitComponent):
+    """
+    Integrates the temperature of an object with the heat balance of ThermalMass,
+    mass*c_p*dT/dt = Qdot_in - h*area*(T - T_f), over the time points of num_nodes.
+
+    Every step is implicit, with the rate at the end of the step (implicit Euler) or
+    the mean of the rates at both ends (trapezoidal). The heat balance is linear in T,
+    so the whole history is one lower bidiagonal system, solved in a single banded
+    solve. solve_linear solves with the same matrix for the derivatives.
+    """
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int)
+        self.options.declare('method', default='implicit_euler', values=['implicit_euler', 'trapezoidal'],
+                             desc='Integration scheme of the steps between the time points')
+
+    def setup(self):
+
+        nn = self.options['num_nodes']
+
+        self.add_input('time', val=np.arange(nn, dtype=float), units='s', desc='Time of every point')
+        self.add_input('T_initial', val=300.0, units='K', desc='Temperature of the object at the first point')
+        self.add_input('area', val=np.ones(nn), units='m**2', desc='Surface area for convective heat transfer')
+        self.add_input('mass', val=np.ones(nn), units='kg', desc='Mass of the object')
+        self.add_input('T_f', val=300.0*np.ones(nn), units='K', desc='Temperature of fluid used in convective heat transfer')
+        self.add_input('h', val=np.zeros(nn), units='W/(m**2*K)', desc='Heat transfer coefficient')
+        self.add_input('c_p', val=np.ones(nn), units='J/(K*kg)', desc='Specific heat capacity of the object')
+        self.add_input('Qdot_in', val=np.zeros(nn), units='W', desc='Heat generated by the object')
+
+        self.add_output('T', val=300.0*np.ones(nn), units='K', desc='Temperature of the object')
+
+        ar = np.arange(nn)
+        self.declare_partials('T', 'T', rows=np.concatenate([ar, ar[1:]]), cols=np.concatenate([ar, ar[:-1]]))
+        self.declare_partials('T', 'T_initial', rows=[0], cols=[0], val=-1.0)
+        self.declare_partials('T', 'time', rows=np.concatenate([ar[1:], ar[1:]]), cols=np.concatenate([ar[1:], ar[:-1]]))
+
+        # residual k depends on the parameters of point k, and of point k-1 for the trapezoidal rule
+        if self.options['method'] == 'trapezoidal':
+            rows, cols = np.concatenate([ar[1:], ar[1:]]), np.concatenate([ar[1:], ar[:-1]])
+        else:
+            rows, cols = ar[1:], ar[1:]
+        for name in PARAMS:
+            self.declare_partials('T', name, rows=rows, cols=cols)
+
+        self._ab = None
+
+    def _theta(self):
+        return 1.0 if self.options['method'] == 'implicit_euler' else 0.5
+
+    def _weights(self, inputs):
+        """
+        Returns the weights of the rates at the end and at the start of every step.
+        """
+        dt = np.diff(inputs['time'])
+        theta = self._theta()
+        return theta*dt, (1.0 - theta)*dt
+
+    def _rate(self, inputs, T):
+        return (inputs['Qdot_in'] - inputs['h']*inputs['area']*(T - inputs['T_f']))/(inputs['mass']*inputs['c_p'])
+
+    def _matrix(self, inputs):
+        """
+        Returns the banded form of the (constant in T) Jacobian with respect to T, for
+        solve_banded with one subdiagonal.
+        """
+        w1, w0 = self._weights(inputs)
+        k = inputs['h']*inputs['area']/(inputs['mass']*inputs['c_p'])
+        ab = np.zeros((2, len(k)), dtype=k.dtype)
+        ab[0] = 1.0
+        ab[0, 1:] += w1*k[1:]
+        ab[1, :-1] = -1.0 + w0*k[:-1]
+        return ab
+
+    def _solve(self, ab, b, transpose=False):
+        """
+        Solves with the banded matrix ab or its transpose. A single point is solved here,
+        since the 1 by 1 shortcut of solve_banded divides by the subdiagonal row.
+        """
+        if len(b) == 1:
+            return b/ab[0]
+        if transpose:
+            # the transpose moves the subdiagonal above the diagonal
+            abT = np.zeros_like(ab)
+            abT[0, 1:], abT[1] = ab[1, :-1], ab[0]
+            return solve_banded((0, 1), abT, b)
+        return solve_banded((1, 0), ab, b)
+
+    def apply_nonlinear(self, inputs, outputs, resids):
+
+        T = outputs['T']
+        w1, w0 = self._weights(inputs)
+        f = self._rate(inputs, T)
+
+        resids['T'][0] = T[0] - inputs['T_initial'][0]
+        resids['T'][1:] = T[1:] - T[:-1] - w1*f[1:] - w0*f[:-1]
+
+    def solve_nonlinear(self, inputs, outputs):
+
+        w1, w0 = self._weights(inputs)
+        # the rate at T = 0, the rest of it is in the matrix
+        f0 = self._rate(inputs, 0.0)
+
+        b = np.empty(len(f0), dtype=np.result_type(f0, inputs['T_initial']))
+        b[0] = inputs['T_initial'][0]
+        b[1:] = w1*f0[1:] + w0*f0[:-1]
+        outputs['T'] = self._solve(self._matrix(inputs), b)
+
+    def linearize(self, inputs, outputs, J):
+
+        T = outputs['T']
+        w1, w0 = self._weights(inputs)
+        f = self._rate(inputs, T)
+        C = inputs['mass']*inputs['c_p']
+        dT = T - inputs['T_f']
+
+        self._ab = ab = self._matrix(inputs)
+        J['T', 'T'] = np.concatenate([ab[0], ab[1, :-1]])
+
+        theta = self._theta()
+        rate = theta*f[1:] + (1.0 - theta)*f[:-1]
+        J['T', 'time'] = np.concatenate([-rate, rate])
+
+        df = {'Qdot_in': 1.0/C,
+              'T_f': inputs['h']*inputs['area']/C,
+              'h': -inputs['area']*dT/C,
+              'area': -inputs['h']*dT/C,
+              'mass': -f/inputs['mass'],
+              'c_p': -f/inputs['c_p']}
+        for name in PARAMS:
+            if self.options['method'] == 'trapezoidal':
+                J['T', name] = np.concatenate([-w1*df[name][1:], -w0*df[name][:-1]])
+            else:
+                J['T', name] = -w1*df[name][1:]
+
+    def solve_linear(self, d_outputs, d_residuals, mode):
+
+        if mode == 'fwd':
+            d_outputs['T'] = self._solve(self._ab, d_residuals['T'])
+        else:
+            d_residuals['T'] = self._solve(self._ab, d_outputs['T'], transpose=True)
+
+if __name__ == "__main__":
+    from openmdao.api import Problem, Group, IndepVarComp
+
+    nn = 11
+    p = Problem()
+    p.model = Group()
+    des_vars = p.model.add_subsystem('des_vars', IndepVarComp(), promotes=['*'])
+
+    des_vars.add_output('time', np.linspace(0.0, 600.0, nn), units='s')
+    des_vars.add_output('T_initial', 300.0, units='K')
+    des_vars.add_output('area', np.ones(nn), units='m**2')
+    des_vars.add_output('mass', 5.0*np.ones(nn), units='kg')
+    des_vars.add_output('T_f', 273.0*np.ones(nn), units='K')
+    des_vars.add_output('h', 7.0*np.ones(nn), units='W/(m**2*K)')
+    des_vars.add_output('c_p', 48.0*np.ones(nn), units='J/(K*kg)')
+    des_vars.add_output('Qdot_in', 100.0*np.ones(nn), units='W')
+
+    p.model.add_subsystem('tt', ThermalTransient(num_nodes=nn, method='trapezoidal'), promotes=['*'])
+
+    p.setup(check=False)
+    p.run_model()
+
+    print('T', p['T'])
+
+    p.check_partials(compact_print=True)
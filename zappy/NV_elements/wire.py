@@ -2,26 +2,33 @@ import numpy as np
 
 from openmdao.api import Group, ExplicitComponent
 
-from thermal_mass import ThermalMass
+from zappy.NV_elements.thermal_mass import ThermalMass
+from zappy.NV_elements.thermal_transient import ThermalTransient
 
 class WireMassVolume(ExplicitComponent):
     """
     Calculates the mass and volume of a wire.
     """
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int)
+
     def setup(self):
 
-        self.add_input('length', val=0.0, units='m', desc='Length of the wire')
-        self.add_input('dia', val=0.0, units='m', desc='Diameter of the wire')
-        self.add_input('density', val=0.0, units='kg/m**3', desc='Density of wire material')
-        
-        self.add_output('area', val=0.0, units='m**2', desc='Surface area of the wire')
-        self.add_output('volume', val=0.0, units='m**3', desc='Volume of the wire')
-        self.add_output('mass', val=0.0, units='kg', desc='Mass of the wire')
+        nn = self.options['num_nodes']
+
+        self.add_input('length', val=np.zeros(nn), units='m', desc='Length of the wire')
+        self.add_input('dia', val=np.zeros(nn), units='m', desc='Diameter of the wire')
+        self.add_input('density', val=np.zeros(nn), units='kg/m**3', desc='Density of wire material')
 
-        self.declare_partials('area', ['dia', 'length'])
-        self.declare_partials('volume', ['dia', 'length'])
-        self.declare_partials('mass', '*')
+        self.add_output('area', val=np.zeros(nn), units='m**2', desc='Surface area of the wire')
+        self.add_output('volume', val=np.zeros(nn), units='m**3', desc='Volume of the wire')
+        self.add_output('mass', val=np.zeros(nn), units='kg', desc='Mass of the wire')
+
+        ar = np.arange(nn)
+        self.declare_partials('area', ['dia', 'length'], rows=ar, cols=ar)
+        self.declare_partials('volume', ['dia', 'length'], rows=ar, cols=ar)
+        self.declare_partials('mass', '*', rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
 
@@ -45,29 +52,35 @@ class WirePerf(ExplicitComponent):
     """
     Calculates the performance of a wire
     """
-    
+
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int)
+
     def setup(self):
 
-        self.add_input('length', val=0.0, units='m', desc='Length of the wire')
-        self.add_input('I_in', val=0.0, units='A', desc='Current entering the wire')
-        self.add_input('V_in', val=0.0, units='V', desc='Voltage entering the wire')
-        self.add_input('P_in', val=0.0, units='W', desc='Power entering the wire')
-        self.add_input('rho', val=0.0, units='ohm*m', desc='Resistivity (resistance per length) of wire')
-        self.add_input('dia', val=0.0, units='m', desc='Diameter of the wire')
-
-        self.add_output('I_out', val=0.0, units='A', desc='Current exiting the wire')
-        self.add_output('V_out', val=0.0, units='V', desc='Voltage exiting the wire')
-        self.add_output('P_out', val=0.0, units='W', desc='Power exiting the wire')
-        self.add_output('Qdot_elec', val=0.0, units='W', desc='Heat generated by the wire')
-        self.add_output('R', val=0.0, units='ohm', desc='Resistance of full wire length')
-
-        self.declare_partials('R', ['rho', 'length', 'dia'])
-        self.declare_partials('I_out', 'I_in', val=1.0)
-        self.declare_partials('V_out', 'V_in', val=1.0)
-        self.declare_partials('V_out', ['I_in', 'rho', 'length', 'dia'])
-        self.declare_partials('P_out', 'P_in', val=1.0)
-        self.declare_partials('P_out', ['I_in', 'rho', 'length', 'dia'])
-        self.declare_partials('Qdot_elec', ['I_in', 'rho', 'length', 'dia'])
+        nn = self.options['num_nodes']
+
+        self.add_input('length', val=np.zeros(nn), units='m', desc='Length of the wire')
+        self.add_input('I_in', val=np.zeros(nn), units='A', desc='Current entering the wire')
+        self.add_input('V_in', val=np.zeros(nn), units='V', desc='Voltage entering the wire')
+        self.add_input('P_in', val=np.zeros(nn), units='W', desc='Power entering the wire')
+        self.add_input('rho', val=np.zeros(nn), units='ohm*m', desc='Resistivity (resistance per length) of wire')
+        self.add_input('dia', val=np.zeros(nn), units='m', desc='Diameter of the wire')
+
+        self.add_output('I_out', val=np.zeros(nn), units='A', desc='Current exiting the wire')
+        self.add_output('V_out', val=np.zeros(nn), units='V', desc='Voltage exiting the wire')
+        self.add_output('P_out', val=np.zeros(nn), units='W', desc='Power exiting the wire')
+        self.add_output('Qdot_elec', val=np.zeros(nn), units='W', desc='Heat generated by the wire')
+        self.add_output('R', val=np.zeros(nn), units='ohm', desc='Resistance of full wire length')
+
+        ar = np.arange(nn)
+        self.declare_partials('R', ['rho', 'length', 'dia'], rows=ar, cols=ar)
+        self.declare_partials('I_out', 'I_in', rows=ar, cols=ar, val=1.0)
+        self.declare_partials('V_out', 'V_in', rows=ar, cols=ar, val=1.0)
+        self.declare_partials('V_out', ['I_in', 'rho', 'length', 'dia'], rows=ar, cols=ar)
+        self.declare_partials('P_out', 'P_in', rows=ar, cols=ar, val=1.0)
+        self.declare_partials('P_out', ['I_in', 'rho', 'length', 'dia'], rows=ar, cols=ar)
+        self.declare_partials('Qdot_elec', ['I_in', 'rho', 'length', 'dia'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
 
@@ -75,14 +88,14 @@ class WirePerf(ExplicitComponent):
         outputs['I_out'] = inputs['I_in']
         outputs['V_out'] = inputs['V_in'] - inputs['I_in'] * outputs['R']
         outputs['P_out'] = inputs['P_in'] - inputs['I_in']**2 * outputs['R']
-        outputs['Qdot_elec'] = inputs['I_in'] * outputs['R']
+        outputs['Qdot_elec'] = inputs['I_in']**2 * outputs['R']
 
     def compute_partials(self, inputs, J):
 
         # cs_area = 4.0 / (np.pi * inputs['dia']**2)
         R = 4.0 / (np.pi * inputs['dia']**2) * inputs['rho'] * inputs['length']
         dR_drho = 4.0 / (np.pi * inputs['dia']**2) * inputs['length']
-        dR_dlen = 4.0 / (np.pi * inputs['dia']**2) * inputs['rho'] * inputs['length']
+        dR_dlen = 4.0 / (np.pi * inputs['dia']**2) * inputs['rho']
         dR_ddia = -8.0 * inputs['rho'] * inputs['length'] / (np.pi * inputs['dia']**3)
 
         J['R', 'rho'] = dR_drho
@@ -99,38 +112,43 @@ class WirePerf(ExplicitComponent):
         J['P_out', 'length'] = -inputs['I_in']**2 * dR_dlen
         J['P_out', 'dia'] = -inputs['I_in']**2 * dR_ddia
 
-        J['Qdot_elec', 'I_in'] = R
-        J['Qdot_elec', 'rho'] = inputs['I_in'] * dR_drho
-        J['Qdot_elec', 'length'] = inputs['I_in'] * dR_dlen
-        J['Qdot_elec', 'dia'] = inputs['I_in'] * dR_ddia
+        J['Qdot_elec', 'I_in'] = 2.0 * inputs['I_in'] * R
+        J['Qdot_elec', 'rho'] = inputs['I_in']**2 * dR_drho
+        J['Qdot_elec', 'length'] = inputs['I_in']**2 * dR_dlen
+        J['Qdot_elec', 'dia'] = inputs['I_in']**2 * dR_ddia
 
 class Wire(Group):
     """
     Group that models an electric wire.
+
+    With transient=True the thermal model integrates the wire temperature T over the
+    time points instead of giving the rate of change of a given temperature T_b.
     """
 
     def initialize(self):
-        self.metadata.declare('n', type_=int, default=1, desc='Number of analysis points')
-        self.metadata.declare('compute_thermal', default=True, desc='Flag to include thermal mass calculations')
+        self.options.declare('num_nodes', default=1, types=int, desc='Number of analysis points')
+        self.options.declare('compute_thermal', default=True, types=bool, desc='Flag to include thermal mass calculations')
+        self.options.declare('transient', default=False, types=bool, desc='Integrate the temperature over the time points')
+        self.options.declare('method', default='implicit_euler', values=['implicit_euler', 'trapezoidal'],
+                             desc='Integration scheme of the transient thermal model')
 
     def setup(self):
 
-        n = self.metadata['n']
+        nn = self.options['num_nodes']
+
+        self.add_subsystem('mv', WireMassVolume(num_nodes=nn), promotes=['*'])
+        self.add_subsystem('perf', WirePerf(num_nodes=nn), promotes=['*'])
 
-        self.add_subsystem('mv', WireMassVolume(), promotes=['*'])
-        self.add_subsystem('perf', WirePerf(), promotes=['*'])
+        if self.options['compute_thermal'] and self.options['transient']:
+            self.add_subsystem('therm', ThermalTransient(num_nodes=nn, method=self.options['method']),
+                            promotes_inputs=['time', 'T_initial', 'area', 'mass', 'T_f', 'h', 'c_p', ('Qdot_in', 'Qdot_elec')],
+                            promotes_outputs=['T'])
 
-        if self.metadata['compute_thermal']:
-            self.add_subsystem('therm', ThermalMass(), 
+        elif self.options['compute_thermal']:
+            self.add_subsystem('therm', ThermalMass(num_nodes=nn),
                             promotes_inputs=['area', 'mass', 'T_f', 'T_b', 'h', 'c_p', ('Qdot_in', 'Qdot_elec')],
                             promotes_outputs=['*'])
 
-            self.set_order(['mv', 'perf', 'therm'])
-
-        else:
-            self.set_order(['mv', 'perf'])
-
-
 
 if __name__ == "__main__":
     from openmdao.api import Problem, IndepVarComp
@@ -153,7 +171,7 @@ if __name__ == "__main__":
 
     # p.model.add_subsystem('mv', WireMassVolume(), promotes=['*'])
     # p.model.add_subsystem('perf', WirePerf(), promotes=['*'])
-    p.model.add_subsystem('wire', Wire(n=1), promotes=['*'])
+    p.model.add_subsystem('wire', Wire(num_nodes=1), promotes=['*'])
 
 
     p.setup(check=False)
@@ -3,3 +3,20 @@ from .LF_elements.line import ACline, DCline
 from .LF_elements.generator import ACgenerator, DCgenerator
 from .LF_elements.load import ACload, DCload
 from .LF_elements.converter import Converter
+from .LF_elements.line_bank import AClineBank, DClineBank
+from .LF_elements.network import ACNetwork, bus_indices
+from .LF_elements.thermal_line import ThermalACline, ThermalDCline
+from .LF_elements.builder import LoadFlowNetwork, load_topology
+from .LF_elements.warm_start import force_flat_start
+from .LF_solvers.system import LoadFlowSystem
+from .LF_solvers.newton import newton_solve, batched_newton_solve, solve_load_flow
+from .LF_solvers.chord import ChordNewtonSolver
+from .LF_solvers.contingency import screen_contingencies
+from .LF_solvers.streaming import stream_load_flow, write_load_flow
+from .LF_solvers.cache import SolutionCache
+from .LF_solvers.database import WarmStartDatabase
+from .LF_solvers.sweep import sweep_solve, radial_feeder
+from .LF_solvers.decoupled import decoupled_solve
+from .utils.profiling import ComponentProfiler
+from .utils.runner import ScenarioRunner
+from .utils.results import ResultStore, result_columns
@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+@contextmanager
+def locked(f):
+    """
+    Holds an exclusive lock on the open file f, with flock or on Windows on its first
+    bytes with msvcrt.locking.
+    """
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield  # released when f is closed
+        return
+    f.seek(0)
+    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 8)
+    try:
+        yield
+    finally:
+        f.flush()
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 8)
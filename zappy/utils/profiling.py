@@ -0,0 +1,155 @@
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+from openmdao.api import Group, DirectSolver
+from openmdao.core.component import Component
+
+METHODS = ('compute', 'compute_partials', 'apply_nonlinear', 'linearize', 'solve_nonlinear', 'guess_nonlinear')
+
+class ComponentProfiler(object):
+    """
+    Records call counts, cumulative wall time and (optionally) allocated bytes of the
+    hot-path methods of the components in a model, plus the factorizations and solves
+    of its DirectSolvers and the data transfers of its Groups.
+
+    The methods are wrapped on the instances while the profiler is started and restored
+    when it is stopped, so a model that is not being profiled runs the original code.
+    Start the profiler after setup, when the systems of the model exist::
+
+        prob.setup()
+        prob.final_setup()
+        with ComponentProfiler(prob.model) as prof:
+            prob.run_model()
+        prof.report()
+
+    With memory=True, tracemalloc measures the peak memory allocated within each call.
+    This slows the run down considerably, so only the byte counts should be read from
+    such a run.
+    """
+    def __init__(self, model, methods=METHODS, memory=False, zappy_only=True, solvers=True, transfers=True):
+        self.model = model
+        self.methods = methods
+        self.memory = memory
+        self.zappy_only = zappy_only
+        self.solvers = solvers
+        self.transfers = transfers
+
+        self.stats = defaultdict(lambda: [0, 0.0, 0])  # (type, method, pathname) -> [calls, time, bytes]
+        self._wrapped = []
+        self._started_tracemalloc = False
+        self._wall = 0.0
+        self._t0 = None
+
+    def _wrap(self, obj, method, kind, label, pathname):
+        func = getattr(obj, method)
+        stats = self.stats[(kind, label, pathname)]
+        memory = self.memory
+
+        def wrapper(*args, **kwargs):
+            if memory:
+                tracemalloc.reset_peak()
+                start = tracemalloc.get_traced_memory()[0]
+            st = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats[1] += time.perf_counter() - st
+                stats[0] += 1
+                if memory:
+                    stats[2] += tracemalloc.get_traced_memory()[1] - start
+
+        setattr(obj, method, wrapper)
+        self._wrapped.append((obj, method))
+
+    def start(self):
+        """
+        Wraps the methods of the components, solvers and groups of the model.
+        """
+        if self._wrapped:
+            raise RuntimeError('The profiler is already running.')
+
+        for system in self.model.system_iter(include_self=True, recurse=True):
+            if isinstance(system, Component):
+                if self.zappy_only and not type(system).__module__.startswith('zappy'):
+                    continue
+                for method in self.methods:
+                    if hasattr(system, method):
+                        self._wrap(system, method, type(system).__name__, method, system.pathname)
+
+            elif isinstance(system, Group):
+                if self.transfers:
+                    self._wrap(system, '_transfer', 'Group', 'transfer', system.pathname)
+                solver = system.linear_solver
+                if self.solvers and isinstance(solver, DirectSolver):
+                    self._wrap(solver, '_linearize', 'DirectSolver', 'factorize', system.pathname)
+                    self._wrap(solver, 'solve', 'DirectSolver', 'solve', system.pathname)
+
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+        self._t0 = time.perf_counter()
+
+    def stop(self):
+        """
+        Restores the original methods.
+        """
+        if self._t0 is not None:
+            self._wall += time.perf_counter() - self._t0
+            self._t0 = None
+
+        for obj, method in self._wrapped:
+            del obj.__dict__[method]
+        self._wrapped = []
+
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def summary(self, by='type'):
+        """
+        Returns a list of (name, method, calls, time, bytes) ranked by cumulative time.
+        With by='type' the instances of a component type are added up, with by='instance'
+        every system is listed by its pathname.
+        """
+        if by not in ('type', 'instance'):
+            raise ValueError("by must be 'type' or 'instance', but '{}' was given.".format(by))
+
+        totals = defaultdict(lambda: [0, 0.0, 0])
+        for (kind, method, path), (calls, t, nbytes) in self.stats.items():
+            if calls == 0:
+                continue
+            name = kind if by == 'type' else '{} ({})'.format(path or '<model>', kind)
+            entry = totals[(name, method)]
+            entry[0] += calls
+            entry[1] += t
+            entry[2] += nbytes
+
+        rows = [(name, method, calls, t, nbytes) for (name, method), (calls, t, nbytes) in totals.items()]
+        return sorted(rows, key=lambda row: -row[3])
+
+    def report(self, by='type', top=None, out_stream=sys.stdout):
+        """
+        Prints the ranked summary with the share of the profiled wall time of every entry.
+        """
+        rows = self.summary(by)[:top]
+        wall = self._wall + (time.perf_counter() - self._t0 if self._t0 is not None else 0.0)
+        width = max([len(row[0]) for row in rows] + [10])
+
+        print('{:{w}s} {:>17s} {:>8s} {:>11s} {:>11s} {:>7s} {:>12s}'.format(
+              'system', 'method', 'calls', 'total (s)', 'per call', '% wall', 'bytes', w=width), file=out_stream)
+        for name, method, calls, t, nbytes in rows:
+            share = 100.0*t/wall if wall > 0 else 0.0
+            print('{:{w}s} {:>17s} {:>8d} {:>11.4g} {:>11.4g} {:>7.1f} {:>12s}'.format(
+                  name, method, calls, t, t/calls, share, str(nbytes) if self.memory else '-', w=width),
+                  file=out_stream)
+        print('profiled wall time: {:.4g} s'.format(wall), file=out_stream)
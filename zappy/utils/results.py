@@ -0,0 +1,133 @@
+import os
+import json
+
+import numpy as np
+
+from zappy.utils.locking import locked
+
+def result_columns(topology):
+    """
+    Returns the names of the bus voltages, line currents and powers and generator and
+    converter outputs of a topology, in the order of LoadFlowSystem.values.
+    """
+    from zappy.LF_solvers.system import LoadFlowSystem
+
+    system = LoadFlowSystem(topology)
+    with np.errstate(all='ignore'):
+        values = system.values(system.initial_guess())
+    loads = set()
+    for kind in ['ACload', 'DCload']:
+        for name, options, p in system.elements[kind]:
+            loads.update(p[k] for k in ('Ir_in', 'Ii_in', 'I_in') if k in p)
+    return [name for name in values if name not in loads]
+
+class ResultStore(object):
+    """
+    Columnar store of load flow results on disk: one memory mapped array of shape
+    (capacity, num_nodes) per output, indexed by scenario and time node, in a directory
+    that also holds the column names (meta.json), the number of appended scenarios (count)
+    and whether each scenario has been written (done.npy).
+
+    Scenarios are only ever appended. append reserves its rows under a lock on the count
+    file and then writes them without a lock, so any number of processes can append to
+    the same store. store['Vr_1'] returns a read only view of the appended rows of a
+    column without copying it. The arrays are allocated at their full capacity when the
+    store is created, as sparse files on most file systems, so it can not grow afterwards.
+    """
+    def __init__(self, path, mode='r'):
+        if mode not in ('r', 'r+'):
+            raise ValueError("mode must be 'r' or 'r+', but '{}' was given.".format(mode))
+        self.path = path
+        self.mode = mode
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.columns = meta['columns']
+        self.num_nodes = meta['num_nodes']
+        self.capacity = meta['capacity']
+        self.dtype = np.dtype(meta['dtype'])
+        self._files = dict((name, 'c{}.npy'.format(k)) for k, name in enumerate(self.columns))
+        self._arrays = {}
+
+    @classmethod
+    def create(cls, path, columns, capacity, num_nodes=1, dtype=float):
+        """
+        Creates an empty store for capacity scenarios of num_nodes time nodes in the
+        directory path and returns it opened for appending. columns may be a topology
+        description, to store the outputs given by result_columns.
+        """
+        if isinstance(columns, dict):
+            columns = result_columns(columns)
+        columns = list(columns)
+        os.makedirs(path, exist_ok=True)
+        for k in range(len(columns)):
+            np.lib.format.open_memmap(os.path.join(path, 'c{}.npy'.format(k)), mode='w+',
+                                      dtype=dtype, shape=(capacity, num_nodes))
+        np.lib.format.open_memmap(os.path.join(path, 'done.npy'), mode='w+', dtype=bool, shape=(capacity,))
+        with open(os.path.join(path, 'count'), 'wb') as f:
+            f.write(np.int64(0).tobytes())
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'columns': columns, 'num_nodes': num_nodes, 'capacity': capacity,
+                       'dtype': np.dtype(dtype).str}, f)
+        return cls(path, mode='r+')
+
+    def _array(self, name):
+        if name not in self._arrays:
+            file = 'done.npy' if name is None else self._files[name]
+            self._arrays[name] = np.load(os.path.join(self.path, file), mmap_mode=self.mode)
+        return self._arrays[name]
+
+    def _reserve(self, n):
+        with open(os.path.join(self.path, 'count'), 'r+b') as f, locked(f):
+            start = int(np.frombuffer(f.read(8), dtype=np.int64)[0])
+            if start + n > self.capacity:
+                raise ValueError('The store is full ({} scenarios).'.format(self.capacity))
+            f.seek(0)
+            f.write(np.int64(start+n).tobytes())
+        return start
+
+    def append(self, values):
+        """
+        Appends scenarios and returns the index of the first one. values maps every column
+        to an array of shape (num_nodes,) for one scenario or (n, num_nodes) for n of them,
+        e.g. the values of a LoadFlowResult. Other keys are ignored.
+        """
+        if self.mode != 'r+':
+            raise ValueError('The store is open for reading only.')
+        missing = [name for name in self.columns if name not in values]
+        if missing:
+            raise ValueError('Missing columns: {}.'.format(', '.join(missing)))
+        data = [np.reshape(values[name], (-1, self.num_nodes)) for name in self.columns]
+        n = data[0].shape[0] if data else 0
+        if any(d.shape[0] != n for d in data):
+            raise ValueError('All the columns must have the same number of scenarios.')
+
+        start = self._reserve(n)
+        for name, d in zip(self.columns, data):
+            self._array(name)[start:start+n] = d
+        self._array(None)[start:start+n] = True
+        return start
+
+    def flush(self):
+        """
+        Writes the appended scenarios of this process to disk.
+        """
+        for arr in self._arrays.values():
+            if self.mode == 'r+':
+                arr.flush()
+
+    def __len__(self):
+        with open(os.path.join(self.path, 'count'), 'rb') as f:
+            return int(np.frombuffer(f.read(8), dtype=np.int64)[0])
+
+    @property
+    def done(self):
+        """
+        Whether each appended scenario has been written, appends of other processes may
+        still be in progress.
+        """
+        return self[None]
+
+    def __getitem__(self, name):
+        view = self._array(name)[:len(self)]
+        view.flags.writeable = False
+        return view
@@ -0,0 +1,212 @@
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from openmdao.api import Problem
+
+_WORKER = {}
+
+def build_problem(model, num_nodes=1):
+    """
+    Returns a set up Problem for a topology description (built as a LoadFlowNetwork) or
+    for a function build(group, num_nodes) that adds the model to a Group. Its nonlinear
+    solvers raise an AnalysisError when they do not converge.
+    """
+    prob = Problem(reports=None)
+    if isinstance(model, dict):
+        from zappy.LF_elements.builder import LoadFlowNetwork
+        prob.model.add_subsystem('sys', LoadFlowNetwork(num_nodes=num_nodes, topology=model), promotes=['*'])
+    else:
+        model(prob.model, num_nodes)
+    prob.set_solver_print(level=-1)
+    prob.setup(check=False)
+    prob.final_setup()
+    for system in prob.model.system_iter(include_self=True, recurse=True):
+        solver = system.nonlinear_solver
+        if solver is not None and 'err_on_non_converge' in solver.options:
+            solver.options['err_on_non_converge'] = True
+    return prob
+
+def default_outputs(topology):
+    """
+    Returns the bus voltages and the generator and converter powers of a topology.
+    """
+    from zappy.LF_solvers.system import LoadFlowSystem
+
+    system = LoadFlowSystem(topology)
+    outputs = list(system.Vbase) + ['Vi_'+name[3:] for name in system.Vbase if name.startswith('Vr_')]
+    for name, options, p in system.elements['ACgenerator']:
+        outputs += [name+'.P_out', name+'.Q_out']
+    for name, options, p in system.elements['DCgenerator']:
+        outputs += [name+'.P_out']
+    for name, options, p in system.elements['Converter']:
+        outputs += [name+'.P_ac', name+'.Q_ac', name+'.P_dc']
+    return outputs
+
+def _state_names(prob):
+    """
+    Returns the absolute names of all outputs of the model of a Problem, whose values are
+    the state that a run starts from.
+    """
+    return [name for name, meta in prob.model.list_outputs(val=False, out_stream=None)]
+
+def _init_worker(model, num_nodes):
+    _WORKER['prob'] = build_problem(model, num_nodes)
+    _WORKER['states'] = _state_names(_WORKER['prob'])
+    _WORKER['shm'] = {}
+    _WORKER['base'] = {}
+
+def _output_sizes(outputs):
+    prob = _WORKER['prob']
+    return [prob.get_val(name).size for name in outputs]
+
+def _run_scenarios(shm_name, shape, layout, rows, scenarios):
+    """
+    Runs scenarios on the Problem of the worker and writes the outputs into the rows of
+    the shared result array. Returns the error messages of the failed scenarios.
+
+    Every input set by an earlier scenario is reset to its value in the model before the
+    next scenario, and after a failed scenario the outputs are restored to the last
+    solution, so the results do not depend on which scenarios ran before.
+    """
+    prob = _WORKER['prob']
+    states = _WORKER['states']
+    base = _WORKER['base']
+    if shm_name not in _WORKER['shm']:
+        # results of an earlier run are no longer needed
+        for shm in _WORKER['shm'].values():
+            shm.close()
+        _WORKER['shm'] = {shm_name: shared_memory.SharedMemory(name=shm_name)}
+    out = np.ndarray(shape, dtype=float, buffer=_WORKER['shm'][shm_name].buf)
+
+    errors = {}
+    for row, scenario in zip(rows, scenarios):
+        start_point = [np.copy(prob.get_val(name)) for name in states]
+        try:
+            for name, val in base.items():
+                prob[name] = val
+            for name, val in scenario.items():
+                if name not in base:
+                    base[name] = np.copy(prob[name])
+                prob[name] = val
+            prob.run_model()
+            for name, start, size in layout:
+                out[row, start:start+size] = prob.get_val(name).ravel()
+        except Exception:
+            out[row] = np.nan
+            errors[row] = traceback.format_exc(limit=1)
+            for name, val in zip(states, start_point):
+                prob.set_val(name, val)
+    return errors
+
+class ScenarioResults(object):
+    """
+    Outputs of a batch of scenarios: results[name] has shape (num_scenarios, size of the
+    output) and errors maps the index of every failed scenario (with NaN outputs), including
+    those whose solver did not converge, to its error message.
+    """
+    def __init__(self, values, errors):
+        self.values = values
+        self.errors = errors
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+class ScenarioRunner(object):
+    """
+    Runs scenarios, dicts of input values such as {'Load2:P': 2.1e6, 'Line1_2:R': 0.2},
+    on a pool of worker processes that each set up the model once and then only call
+    run_model. The outputs are written by the workers into a shared memory array, so only
+    the scenarios and the error messages are pickled.
+
+    model is a topology description or a function build(group, num_nodes) (which must be
+    picklable unless the fork start method is used). outputs defaults to the bus voltages
+    and the generator and converter powers of a topology. With num_workers=0 the scenarios
+    run in this process. The inputs not set by a scenario keep their values in the model.
+    Since the models keep their previous solution as the start of the next run (see
+    warm_start), similar scenarios should be passed in a sensible order::
+
+        with ScenarioRunner(TOPOLOGY, num_workers=8) as runner:
+            results = runner.run([{'Load2:P': P} for P in np.linspace(1e6, 3e6, 1000)])
+        V = results['Vr_2']
+    """
+    def __init__(self, model, outputs=None, num_nodes=1, num_workers=None, chunksize=None):
+        if outputs is None:
+            if not isinstance(model, dict):
+                raise ValueError('outputs must be given unless the model is a topology description.')
+            outputs = default_outputs(model)
+
+        self.model = model
+        self.outputs = list(outputs)
+        self.num_nodes = num_nodes
+        self.num_workers = os.cpu_count() if num_workers is None else num_workers
+        self.chunksize = chunksize
+
+        # the model is only set up in this process when it runs the scenarios, otherwise
+        # the sizes of the outputs are taken from the Problem of a worker
+        self._pool = None
+        self._prob = None
+        self._base = {}
+        if self.num_workers > 0:
+            self._pool = ProcessPoolExecutor(self.num_workers, initializer=_init_worker,
+                                             initargs=(model, num_nodes))
+            sizes = self._pool.submit(_output_sizes, self.outputs).result()
+        else:
+            self._prob = build_problem(model, num_nodes)
+            self._states = _state_names(self._prob)
+            sizes = [self._prob.get_val(name).size for name in self.outputs]
+
+        self.layout = []
+        start = 0
+        for name, size in zip(self.outputs, sizes):
+            self.layout.append((name, start, size))
+            start += size
+        self.size = start
+
+    def run(self, scenarios):
+        """
+        Runs a list of scenarios and returns their ScenarioResults.
+        """
+        n = len(scenarios)
+        shape = (n, self.size)
+        shm = shared_memory.SharedMemory(create=True, size=max(n*self.size*8, 1))
+        try:
+            if self._pool is None:
+                _WORKER.update(prob=self._prob, states=self._states, shm={shm.name: shm},
+                               base=self._base)
+                errors = _run_scenarios(shm.name, shape, self.layout, range(n), scenarios)
+                _WORKER.clear()
+            else:
+                chunk = self.chunksize or max(1, -(-n // (4*self.num_workers)))
+                futures = [self._pool.submit(_run_scenarios, shm.name, shape, self.layout,
+                                             range(i, min(i+chunk, n)), scenarios[i:i+chunk])
+                           for i in range(0, n, chunk)]
+                errors = {}
+                for future in futures:
+                    errors.update(future.result())
+
+            out = np.ndarray(shape, dtype=float, buffer=shm.buf)
+            values = dict((name, out[:, start:start+size].copy()) for name, start, size in self.layout)
+            del out
+        finally:
+            shm.close()
+            shm.unlink()
+
+        return ScenarioResults(values, errors)
+
+    def close(self):
+        """
+        Shuts the worker processes down.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,62 @@
+import unittest
+from io import StringIO
+
+from openmdao.api import Problem
+
+from zappy.LF_elements.builder import LoadFlowNetwork
+from zappy.LF_examples.topology_example import TOPOLOGY
+from zappy.utils.profiling import ComponentProfiler
+
+
+class ComponentProfilerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.prob = Problem(reports=None)
+        self.prob.model.add_subsystem('sys', LoadFlowNetwork(num_nodes=2, topology=TOPOLOGY), promotes=['*'])
+        self.prob.set_solver_print(level=-1)
+        self.prob.setup(check=False)
+        self.prob.final_setup()
+
+    def test_counts(self):
+
+        with ComponentProfiler(self.prob.model) as prof:
+            self.prob.run_model()
+
+        rows = prof.summary()
+        times = [row[3] for row in rows]
+        self.assertEqual(times, sorted(times, reverse=True))
+
+        calls = dict(((name, method), n) for name, method, n, t, nbytes in rows)
+        self.assertEqual(calls['ACline', 'compute_partials'] % 9, 0) # nine AC lines in the topology
+        self.assertGreater(calls['Converter', 'apply_nonlinear'], 0)
+        self.assertGreater(calls['DirectSolver', 'factorize'], 0)
+        self.assertGreater(calls['Group', 'transfer'], 0)
+        self.assertNotIn('IndepVarComp', [row[0] for row in rows])
+
+        by_instance = dict(((name, method), n) for name, method, n, t, nbytes in prof.summary(by='instance'))
+        self.assertEqual(by_instance['sys.Line1_2 (ACline)', 'compute_partials'],
+                         calls['ACline', 'compute_partials'] // 9)
+
+        stream = StringIO()
+        prof.report(top=3, out_stream=stream)
+        self.assertEqual(len(stream.getvalue().splitlines()), 5)
+
+    def test_restore(self):
+
+        line = self.prob.model.sys.Line1_2
+        with ComponentProfiler(self.prob.model, memory=True) as prof:
+            self.assertIn('compute', line.__dict__)
+            self.prob.run_model()
+
+        self.assertNotIn('compute', line.__dict__)
+        self.assertNotIn('_transfer', self.prob.model.sys.__dict__)
+        self.assertGreater(sum(row[4] for row in prof.summary()), 0)
+
+        # nothing is recorded once the profiler is stopped
+        calls = sum(row[2] for row in prof.summary())
+        self.prob.run_model()
+        self.assertEqual(sum(row[2] for row in prof.summary()), calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from zappy.LF_solvers.system import LoadFlowSystem
+from zappy.LF_solvers.newton import batched_newton_solve
+from zappy.utils.results import ResultStore, result_columns
+from zappy.LF_examples.topology_example import TOPOLOGY
+
+
+def solve(path, P):
+    system = LoadFlowSystem(TOPOLOGY, num_nodes=3)
+    system.params['Load2:P'] = P*np.array([0.9, 1.0, 1.1])
+    result = batched_newton_solve(system)
+    store = ResultStore(path, mode='r+')
+    start = store.append(result.values)
+    store.flush()
+    return start, result['Vr_7']
+
+
+class ResultStoreTestCase(unittest.TestCase):
+
+    def test_workers(self):
+
+        columns = result_columns(TOPOLOGY)
+        for name in ['Vr_1', 'V_4', 'L1_2:Ir', 'Line1_2.P_in', 'Line4_5.P_loss', 'Gen1.Q_out', 'TX10.P_dc']:
+            self.assertIn(name, columns)
+        self.assertNotIn('LL2:Ir', columns) # load currents
+
+        loads = [1.6e6, 1.8e6, 2.0e6, 2.2e6]
+        with tempfile.TemporaryDirectory() as path:
+            store = ResultStore.create(path, TOPOLOGY, capacity=10, num_nodes=3)
+            with ProcessPoolExecutor(2) as pool:
+                out = list(pool.map(solve, [path]*len(loads), loads))
+
+            reader = ResultStore(path)
+            self.assertEqual(len(reader), 4)
+            self.assertTrue(np.all(reader.done))
+            self.assertEqual(sorted(start for start, V in out), [0, 1, 2, 3])
+            for start, V in out:
+                np.testing.assert_allclose(reader['Vr_7'][start], V)
+
+            # reads are views of the file and can not be written
+            self.assertFalse(reader['Vr_7'].flags.writeable)
+            with self.assertRaises(ValueError):
+                reader.append({})
+
+            # several scenarios at once
+            values = dict((name, np.ones((2, 3))) for name in columns)
+            self.assertEqual(store.append(values), 4)
+            np.testing.assert_allclose(reader['Gen1.P_out'][4:], 1.0)
+            with self.assertRaises(ValueError):
+                store.append(dict((name, np.ones((5, 3))) for name in columns))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import numpy as np
+
+from openmdao.api import Problem
+
+from zappy.LF_elements.builder import LoadFlowNetwork
+from zappy.LF_examples.topology_example import TOPOLOGY
+from zappy.utils.runner import ScenarioRunner
+
+
+class ScenarioRunnerTestCase(unittest.TestCase):
+
+    def test_workers(self):
+
+        scenarios = [{'Load2:P': P, 'Line1_2:R': 0.2} for P in [1.0e6, 1.5e6, 2.0e6, 2.5e6]]
+        scenarios.insert(2, {'Load99:P': 1.0e6}) # not an input of the model
+
+        with ScenarioRunner(TOPOLOGY, num_workers=2, chunksize=2) as runner:
+            results = runner.run(scenarios)
+            self.assertEqual(runner.size, len(runner.outputs)) # one node per output
+
+        with ScenarioRunner(TOPOLOGY, num_workers=0) as serial:
+            ref = serial.run(scenarios)
+
+        self.assertEqual(list(results.errors), [2])
+        self.assertIn('Load99:P', results.errors[2])
+        self.assertTrue(np.all(np.isnan(results['Vr_2'][2])))
+
+        # the workers warm start from other scenarios than the serial run, so the results
+        # only agree to the tolerance of the Newton solver
+        for name in ['Vr_2', 'Vi_7', 'V_4', 'Gen1.P_out', 'TX10.P_ac']:
+            self.assertEqual(results[name].shape, (5, 1))
+            np.testing.assert_allclose(results[name], ref[name], rtol=1e-4, atol=1e-2)
+
+        # the last scenario matches a model built for it
+        prob = Problem(reports=None)
+        prob.model.add_subsystem('sys', LoadFlowNetwork(num_nodes=1, topology=TOPOLOGY), promotes=['*'])
+        prob.set_solver_print(level=-1)
+        prob.setup(check=False)
+        prob['Load2:P'] = 2.5e6
+        prob['Line1_2:R'] = 0.2
+        prob.run_model()
+        np.testing.assert_allclose(results['Vr_2'][4], prob['Vr_2'], rtol=1e-5)
+
+    def test_order(self):
+
+        # the resistance set by the first scenario does not leak into the second one
+        with ScenarioRunner(TOPOLOGY, num_workers=0) as runner:
+            results = runner.run([{'Line1_2:R': 0.2}, {'Load2:P': 2.0e6}])
+            ref = runner.run([{'Load2:P': 2.0e6}])
+        np.testing.assert_allclose(results['Vr_2'][1], ref['Vr_2'][0], rtol=1e-5)
+        self.assertGreater(abs(results['Vr_2'][0, 0] - results['Vr_2'][1, 0]), 1.0)
+
+    def test_diverged(self):
+
+        scenarios = [{'Load2:P': 2.0e6}, {'Load2:P': 50.0e6}, {'Load2:P': 2.1e6}]
+        with ScenarioRunner(TOPOLOGY, num_workers=0) as runner:
+            with np.errstate(all='ignore'):
+                results = runner.run(scenarios)
+            ref = runner.run([scenarios[2]])
+
+        self.assertEqual(list(results.errors), [1])
+        self.assertIn('AnalysisError', results.errors[1])
+        self.assertTrue(np.all(np.isnan(results['Vr_2'][1])))
+
+        # the scenario after the failed one starts from the last solution
+        self.assertFalse(np.any(np.isnan(results['Vr_2'][2])))
+        np.testing.assert_allclose(results['Vr_2'][2], ref['Vr_2'][0], rtol=1e-5)
+
+    def test_outputs(self):
+
+        with self.assertRaises(ValueError):
+            ScenarioRunner(lambda group, nn: None, num_workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()